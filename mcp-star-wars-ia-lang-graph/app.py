@@ -1,6 +1,11 @@
-from flask import Flask, request, render_template
-from langchain_core.messages import HumanMessage
+from flask import Flask, make_response, request, render_template
+from langchain_core.messages import HumanMessage, ToolMessage
 from graph_builder import GraphBuilder, log
+from metrics import setup_metrics
+from logger import SAMPLED
+from tracing import setup_tracing
+from json_api import setup_json_api
+from response_cache import normalize_query, setup_response_cache
 
 class StarWarsAssistantApp:
     def __init__(self):
@@ -8,49 +13,77 @@ class StarWarsAssistantApp:
         # Instancia o construtor do grafo e obtém o grafo compilado
         graph_builder = GraphBuilder()
         self.app_graph = graph_builder.app_graph
+        setup_metrics(self.app, graph_builder.swapi_client)
+        setup_tracing(self.app)
+        self.response_cache = setup_response_cache(self.app)
+        setup_json_api(self.app, graph_builder.tools, query_handler=self.answer_query, response_cache=self.response_cache)
         self.app.route("/", methods=["GET", "POST"])(self.index)
 
+    def answer_query(self, query):
+        """
+        Executa o grafo para uma consulta e retorna a resposta final (`answer`), junto com a
+        ferramenta usada e o seu resultado estruturado (`tool` e `result`), quando houver.
+        `degraded` indica que a resposta é uma mensagem de erro ou saiu com dados incompletos.
+        """
+        log.info("Nova consulta recebida: '%s'", query)
+        # Monta o estado inicial para o grafo
+        initial_state = {"messages": [HumanMessage(content=query)]}
+
+        # Invoca o grafo para processar a consulta
+        log.info("---<Iniciando execução do Grafo>---")
+        final_state = self.app_graph.invoke(initial_state)
+        log.info("---<Execução do Grafo Concluída>---")
+
+        # Extrai a resposta final para o usuário
+        answer = {"answer": final_state['messages'][-1].content}
+        tool_messages = [m for m in final_state['messages'] if isinstance(m, ToolMessage)]
+        if tool_messages and getattr(tool_messages[-1], "artifact", None) is not None:
+            answer["tool"] = tool_messages[-1].name
+            answer["result"] = tool_messages[-1].artifact
+        # Erro em algum nó ou falha da SWAPI durante a ferramenta: resposta incompleta
+        if final_state.get("failed") or getattr(answer.get("result"), "degraded", False):
+            answer["degraded"] = True
+        log.info("Resposta final para o usuário: %s", answer['answer'])
+        return answer
+
     def index(self):
+        client_ip = request.remote_addr
+        log.info("Requisição %s de %s", request.method, client_ip, extra=SAMPLED)
+
+        # A consulta vem do formulário (POST) ou da URL (GET /?query=...), que navegadores e
+        # proxies podem guardar
+        query = request.values.get("query", "")
+        if not query.strip():
+            error_message = "Por favor, insira uma pergunta." if request.method == "POST" else None
+            return render_template("index.html", result=None, error_message=error_message, query=query)
+        return self.response_cache.respond(("index", normalize_query(query)), lambda: self._render_result(query))
+
+    def _render_result(self, query):
+        """Executa o grafo e renderiza a página; páginas de erro ou incompletas não vão para o cache."""
         result = None
-        query = ""
         error_message = None
+        degraded = False
+        try:
+            answer = self.answer_query(query)
+            result = answer["answer"]
+            degraded = answer.get("degraded", False)
 
-        client_ip = request.remote_addr
-        log.info(f"Requisição {request.method} de {client_ip}")
-
-        if request.method == "POST":
-            query = request.form.get("query", "")
-            
-            if not query:
-                error_message = "Por favor, insira uma pergunta."
-            else:
-                log.info(f"Nova consulta recebida: '{query}'")
-                try:
-                    # Monta o estado inicial para o grafo
-                    initial_state = {"messages": [HumanMessage(content=query)]}
-                    
-                    # Invoca o grafo para processar a consulta
-                    log.info("---<Iniciando execução do Grafo>---")
-                    final_state = self.app_graph.invoke(initial_state)
-                    log.info("---<Execução do Grafo Concluída>---")
-
-                    # Extrai a resposta final para o usuário
-                    result = final_state['messages'][-1].content
-                    log.info(f"Resposta final para o usuário: {result}")
-
-                except Exception as e:
-                    log.error(f"Erro inesperado durante a execução do grafo: {e}", exc_info=True)
-                    error_message = "Ocorreu um erro inesperado ao processar sua solicitação."
-
-        return render_template(
+        except Exception as e:
+            log.error("Erro inesperado durante a execução do grafo: %s", e, exc_info=True)
+            error_message = "Ocorreu um erro inesperado ao processar sua solicitação."
+
+        page = make_response(render_template(
             "index.html", 
             result=result,
             error_message=error_message,
             query=query
-        )
+        ))
+        page.cache_control.no_store = bool(error_message) or degraded
+        return page
 
     def run(self):
         log.info("Iniciando servidor Flask na porta 5000")
+        log.info("Servidor de desenvolvimento: para produção, use `python wsgi.py`")
         self.app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
 
 if __name__ == "__main__":
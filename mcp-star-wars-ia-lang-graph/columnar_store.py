@@ -0,0 +1,182 @@
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from logger import setup_logger
+from swapi_client import complete_results
+
+log = setup_logger('columnar_store')
+
+# Valores que a SWAPI usa para dados desconhecidos
+UNKNOWN_VALUES = {"", "unknown", "n/a", "none", "indefinite"}
+
+# A SWAPI deixa `species` vazio para a maioria dos humanos (ex: Luke Skywalker)
+HUMAN_SPECIES_ID = 1
+
+def parse_number(text) -> float:
+    """Converte os números em texto da SWAPI ("172", "1,358", "unknown") para float (NaN se desconhecido)."""
+    if isinstance(text, (int, float)):
+        return float(text)
+    text = str(text or "").strip().lower().replace(",", "")
+    if text in UNKNOWN_VALUES:
+        return math.nan
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
+
+def _numeric(records: List[dict], field: str) -> np.ndarray:
+    return np.fromiter((parse_number(r.get(field)) for r in records), dtype=np.float64, count=len(records))
+
+def _ref_id(url) -> int:
+    """ID de uma URL da SWAPI (-1 se ausente)."""
+    if not url:
+        return -1
+    return int(str(url).rstrip('/').rsplit('/', 1)[1])
+
+class Categorical:
+    """Coluna categórica: `codes[i]` indexa `categories` (-1 para desconhecido)."""
+    __slots__ = ("codes", "categories")
+
+    def __init__(self, values: Iterable[str]):
+        index = {}
+        codes = []
+        for value in values:
+            value = str(value or "").strip().lower()
+            if value in UNKNOWN_VALUES:
+                codes.append(-1)
+            else:
+                codes.append(index.setdefault(value, len(index)))
+        self.codes = np.array(codes, dtype=np.int32)
+        self.categories = list(index)
+
+    def mask(self, term: str) -> np.ndarray:
+        """Máscara das linhas cuja categoria contém `term` (ex: "arid" casa "arid, temperate")."""
+        term = term.strip().lower()
+        matching = [code for code, category in enumerate(self.categories) if term in category]
+        return np.isin(self.codes, matching)
+
+class ColumnarStore:
+    """
+    Colunas NumPy dos personagens e planetas para consultas vetorizadas.
+
+    Os campos numéricos (altura, massa, população, diâmetro, ...) viram arrays float64 com
+    NaN nos valores desconhecidos; gênero, clima e terreno viram colunas categóricas. As
+    referências (mundo natal, espécie) são guardadas como IDs inteiros (-1 se ausentes).
+    """
+
+    def __init__(self, people: List[dict], planets: List[dict], species: List[dict] = ()):
+        start_time = time.time()
+        self.people_ids = np.array([_ref_id(p.get("url")) for p in people], dtype=np.int32)
+        self.people_names = np.array([p.get("name", "") for p in people], dtype=object)
+        self.height = _numeric(people, "height")
+        self.mass = _numeric(people, "mass")
+        self.gender = Categorical(p.get("gender") for p in people)
+        self.homeworld = np.array([_ref_id(p.get("homeworld")) for p in people], dtype=np.int32)
+        # Usa-se a primeira espécie listada; lista vazia conta como humano (ver HUMAN_SPECIES_ID)
+        self.species = np.array([_ref_id(p["species"][0]) if p.get("species") else HUMAN_SPECIES_ID for p in people], dtype=np.int32)
+        self.species_names = {HUMAN_SPECIES_ID: "Human", **{_ref_id(s.get("url")): s.get("name", "") for s in species}}
+
+        self.planet_ids = np.array([_ref_id(p.get("url")) for p in planets], dtype=np.int32)
+        self.planet_names = np.array([p.get("name", "") for p in planets], dtype=object)
+        self.population = _numeric(planets, "population")
+        self.diameter = _numeric(planets, "diameter")
+        self.rotation_period = _numeric(planets, "rotation_period")
+        self.orbital_period = _numeric(planets, "orbital_period")
+        self.surface_water = _numeric(planets, "surface_water")
+        self.climate = Categorical(p.get("climate") for p in planets)
+        self.terrain = Categorical(p.get("terrain") for p in planets)
+        self.built_at = time.time()
+        log.info(
+            "Armazenamento colunar montado: %s personagens, %s planetas, "
+            "Tempo: %.3fs",
+            len(people), len(planets), self.built_at - start_time
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "ColumnarStore":
+        """Monta as colunas a partir de um `SwapiSnapshot` do espelho local."""
+        return cls(snapshot.records("people"), snapshot.records("planets"), snapshot.records("species"))
+
+    def tallest(self, limit: int = 10) -> List[dict]:
+        """Os `limit` personagens mais altos (altura desconhecida fica de fora)."""
+        known = np.flatnonzero(~np.isnan(self.height))
+        limit = min(limit, len(known))
+        if limit <= 0:
+            return []
+        top = known[np.argpartition(-self.height[known], limit - 1)[:limit]]
+        top = top[np.argsort(-self.height[top], kind="stable")]
+        return [
+            {"id": int(self.people_ids[i]), "name": self.people_names[i],
+             "height": float(self.height[i]), "mass": float(self.mass[i])}
+            for i in top
+        ]
+
+    def average_mass_by_species(self) -> List[dict]:
+        """Massa média por espécie (apenas personagens com massa conhecida), da maior para a menor."""
+        valid = ~np.isnan(self.mass) & (self.species >= 0)
+        species = self.species[valid]
+        if not len(species):
+            return []
+        counts = np.bincount(species)
+        totals = np.bincount(species, weights=self.mass[valid])
+        present = np.flatnonzero(counts)
+        averages = totals[present] / counts[present]
+        order = np.argsort(-averages, kind="stable")
+        return [
+            {"species_id": int(present[i]), "species": self.species_names.get(int(present[i]), f"Espécie {present[i]}"),
+             "average_mass": float(averages[i]), "count": int(counts[present[i]])}
+            for i in order
+        ]
+
+    def planets_with_population_above(self, threshold: float) -> List[dict]:
+        """Planetas com população conhecida maior que `threshold`, do mais populoso ao menos."""
+        # Comparações com NaN são falsas, então planetas com população desconhecida ficam de fora
+        matches = np.flatnonzero(self.population > threshold)
+        matches = matches[np.argsort(-self.population[matches], kind="stable")]
+        return [
+            {"id": int(self.planet_ids[i]), "name": self.planet_names[i], "population": float(self.population[i]),
+             "climate": self.climate.categories[self.climate.codes[i]] if self.climate.codes[i] >= 0 else "unknown"}
+            for i in matches
+        ]
+
+class ColumnarStoreProvider:
+    """
+    Monta o `ColumnarStore` sob demanda a partir do cliente SWAPI e o reconstrói após `max_age` segundos.
+
+    Com o cliente do espelho local (`MirrorSwapiClient`) usa o snapshot diretamente; com os
+    clientes HTTP baixa todas as páginas de people, planets e species (servidas pelo cache em disco).
+    Se alguma listagem falhar ou vier incompleta, nada é guardado e o armazenamento anterior
+    (se houver) continua em uso.
+    """
+
+    def __init__(self, fetch_all, snapshot=None, max_age: Optional[float] = 3600):
+        self._fetch_all = fetch_all
+        self._snapshot = snapshot
+        self.max_age = max_age
+        self._store = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[ColumnarStore]:
+        store = self._store
+        if store is not None and (self.max_age is None or time.time() - store.built_at < self.max_age):
+            return store
+        with self._lock:
+            store = self._store
+            if store is not None and (self.max_age is None or time.time() - store.built_at < self.max_age):
+                return store
+            if self._snapshot is not None:
+                self._store = ColumnarStore.from_snapshot(self._snapshot)
+            else:
+                data: Dict[str, Optional[list]] = {}
+                for endpoint in ("people", "planets", "species"):
+                    data[endpoint] = complete_results(endpoint, self._fetch_all(endpoint))
+                    if data[endpoint] is None:
+                        # Um armazenamento parcial ficaria em cache até `max_age` com agregados errados
+                        log.error("Não foi possível montar o armazenamento colunar: falha ao buscar %s", endpoint)
+                        return store
+                self._store = ColumnarStore(data["people"], data["planets"], data["species"])
+            return self._store
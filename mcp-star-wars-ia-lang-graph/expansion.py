@@ -0,0 +1,115 @@
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from resource_registry import RESOURCES
+from tracing import propagate
+
+# Modelos usados para resolver as URLs de cada recurso
+EXPANDABLE_MODELS = {endpoint: spec.model for endpoint, spec in RESOURCES.items()}
+
+def parse_resource_url(url) -> Optional[Tuple[str, int]]:
+    """Converte uma URL da SWAPI (ex: .../planets/1/) em `(endpoint, id)`, ou None."""
+    if not isinstance(url, str) or "/api/" not in url:
+        return None
+    parts = url.rstrip('/').split('/')
+    if len(parts) < 2 or not parts[-1].isdigit():
+        return None
+    return parts[-2], int(parts[-1])
+
+def _to_dict(obj) -> dict:
+    if isinstance(obj, dict):
+        return dict(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return dict(vars(obj))
+
+class Expander:
+    """
+    Resolve referências entre recursos (campos com URLs, como `homeworld` ou `films`).
+
+    Em cada nível de profundidade, todas as URLs dos campos pedidos em todo o conjunto de
+    resultados são coletadas, deduplicadas e resolvidas em lote (`fetch_many_by_id`, que
+    usa o cache e busca o restante em paralelo) — uma rodada de I/O paralelo por nível,
+    em vez de uma requisição por referência.
+    """
+
+    def __init__(self, swapi_client, max_depth: int = 3):
+        self.swapi = swapi_client
+        self.max_depth = max_depth
+
+    def _resolve(self, result):
+        if inspect.isawaitable(result):
+            return self.swapi.run_sync(result)
+        return result
+
+    def _fetch_endpoint(self, endpoint: str, ids: List[int]) -> Dict[int, dict]:
+        results = self._resolve(self.swapi.fetch_many_by_id(endpoint, ids, EXPANDABLE_MODELS[endpoint]))
+        return {r.id: _to_dict(r.result) for r in results if r.ok and r.result is not None}
+
+    def _fetch_urls(self, urls: Iterable[str]) -> Dict[str, dict]:
+        """Busca as URLs em lote, agrupadas por endpoint, com os endpoints em paralelo."""
+        by_endpoint = {}
+        for url in urls:
+            endpoint, id = parse_resource_url(url)
+            by_endpoint.setdefault(endpoint, {})[id] = url
+        if not by_endpoint:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=len(by_endpoint)) as executor:
+            futures = {
+                endpoint: executor.submit(propagate(self._fetch_endpoint), endpoint, list(urls_by_id))
+                for endpoint, urls_by_id in by_endpoint.items()
+            }
+        resolved = {}
+        for endpoint, future in futures.items():
+            for id, data in future.result().items():
+                resolved[by_endpoint[endpoint][id]] = data
+        return resolved
+
+    def expand(self, objects: Iterable, fields: Iterable[str], depth: int = 1) -> List[dict]:
+        """
+        Retorna cópias (dicionários) de `objects` com os campos `fields` substituídos
+        pelos recursos referenciados.
+
+        Os mesmos `fields` são aplicados aos objetos expandidos até `depth` níveis (limitado
+        a `max_depth`). Referências que não puderem ser resolvidas continuam como URL.
+        """
+        fields = list(fields)
+        depth = min(depth, self.max_depth)
+        roots = [_to_dict(obj) for obj in objects]
+        level = roots
+        resolved = {}
+
+        for _ in range(depth):
+            urls = set()
+            for obj in level:
+                for field in fields:
+                    value = obj.get(field)
+                    for url in (value if isinstance(value, list) else [value]):
+                        parsed = parse_resource_url(url)
+                        if parsed and parsed[0] in EXPANDABLE_MODELS and url not in resolved:
+                            urls.add(url)
+            resolved.update(self._fetch_urls(urls))
+
+            next_level = []
+
+            def _hydrate(url):
+                if not isinstance(url, str) or url not in resolved:
+                    return url
+                # Cada ocorrência recebe sua própria cópia para evitar ciclos entre níveis
+                copy = dict(resolved[url])
+                next_level.append(copy)
+                return copy
+
+            for obj in level:
+                for field in fields:
+                    value = obj.get(field)
+                    if isinstance(value, list):
+                        obj[field] = [_hydrate(url) for url in value]
+                    elif value is not None:
+                        obj[field] = _hydrate(value)
+            if not next_level:
+                break
+            level = next_level
+        return roots
@@ -1,6 +1,4 @@
 import os
-import json
-import inspect
 from typing import List, TypedDict, Annotated
 
 import google.generativeai as genai
@@ -9,7 +7,12 @@ from langchain_core.messages import BaseMessage, ToolMessage, AIMessage, HumanMe
 from langgraph.graph import StateGraph, END
 
 from logger import setup_logger
+from swapi_mirror import create_search_index, create_swapi_client
+from mcp_tools import MCPTools
 from tools import Tools
+from tool_result import ToolResult, render
+from tool_registry import registry
+from tracing import tracer
 
 # --- FASE 1: PREPARAÇÃO DO LOGGER ---
 log = setup_logger(__name__)
@@ -23,13 +26,19 @@ class GraphState(TypedDict):
     Atributos:
         messages: A lista de mensagens da conversa.
         tool_choice: A ferramenta que a IA decidiu usar.
+        failed: Se algum nó falhou e a resposta final é uma mensagem de erro.
     """
     messages: Annotated[List[BaseMessage], lambda x, y: x + y]
     tool_choice: dict | None
+    failed: bool
 
 class GraphBuilder:
     def __init__(self):
         self.model = self._initialize_model()
+        # Uma única instância de Tools (e do pool HTTP do SwapiClient) é compartilhada entre as requisições
+        self.swapi_client = create_swapi_client()
+        # MCPTools registra logs e métricas (contagem, erros e latência) de cada ferramenta
+        self.tools = MCPTools(Tools(self.swapi_client, search_index=create_search_index(self.swapi_client)))
         self.app_graph = self._build_graph()
 
     def _initialize_model(self):
@@ -46,7 +55,7 @@ class GraphBuilder:
             log.info("Modelo Gemini inicializado com sucesso.")
             return model
         except Exception as e:
-            log.error(f"Falha crítica ao inicializar o modelo Gemini: {e}", exc_info=True)
+            log.error("Falha crítica ao inicializar o modelo Gemini: %s", e, exc_info=True)
             return None
 
     def _build_graph(self):
@@ -54,8 +63,9 @@ class GraphBuilder:
         log.info("Montando o grafo da aplicação...")
         workflow = StateGraph(GraphState)
 
-        workflow.add_node("agente", self.agente_roteador)
-        workflow.add_node("executor_ferramenta", self.executor_ferramenta)
+        # Cada execução de nó vira um span no trace da requisição
+        workflow.add_node("agente", tracer.traced("node agente_roteador")(self.agente_roteador))
+        workflow.add_node("executor_ferramenta", tracer.traced("node executor_ferramenta")(self.executor_ferramenta))
 
         workflow.set_entry_point("agente")
 
@@ -73,73 +83,56 @@ class GraphBuilder:
         
         if isinstance(messages[-1], ToolMessage):
             log.info("Agente irá formular a resposta final com base no resultado da ferramenta.")
-            final_response = AIMessage(content=f"Resultado da sua consulta:\n{messages[-1].content}")
+            # O modelo recebe a forma compacta; para o usuário, o resultado completo (com textos longos truncados)
+            result = getattr(messages[-1], "artifact", None)
+            content = result.to_text(max_length=ToolResult.HTML_MAX_LENGTH) if isinstance(result, ToolResult) else messages[-1].content
+            final_response = AIMessage(content=f"Resultado da sua consulta:\n{content}")
             return {"messages": [final_response], "tool_choice": None}
         
         query = messages[-1].content
-        log.info(f"Consulta do usuário: '{query}'")
+        log.info("Consulta do usuário: '%s'", query)
 
         if not self.model:
             log.error("Modelo Gemini não inicializado. Não é possível processar a consulta.")
             error_message = AIMessage(content="Desculpe, estou com um problema interno e não consigo processar sua solicitação agora.")
-            return {"messages": [error_message], "tool_choice": None}
+            return {"messages": [error_message], "tool_choice": None, "failed": True}
 
-        available_tools = self._get_available_tools_desc()
-        
         prompt = f"""
-        Você é um assistente inteligente que analisa a solicitação de um usuário e a traduz em uma chamada de ferramenta para a API de Star Wars.
+        Você é um assistente inteligente que traduz a solicitação de um usuário em uma chamada de ferramenta para a API de Star Wars.
 
         A solicitação do usuário é: "{query}"
 
-        As ferramentas disponíveis são:
-        {json.dumps(available_tools, indent=2)}
-
-        Sua tarefa é analisar a solicitação e determinar qual ferramenta usar e quais argumentos passar.
-
-        Regras de Resposta:
-        1.  Sua resposta DEVE ser um objeto JSON.
-        2.  O objeto JSON deve ter duas chaves: "tool_name" e "tool_args".
-        3.  "tool_name" deve ser o nome da ferramenta a ser usada, extraído da lista de ferramentas disponíveis.
-        4.  "tool_args" deve ser um objeto contendo os argumentos para a ferramenta. Os nomes das chaves neste objeto DEVEM corresponder aos nomes dos parâmetros listados na descrição da ferramenta.
-        5.  Se a ferramenta não precisar de parâmetros (como 'list_all_films'), "tool_args" deve ser um objeto vazio: {{}}.
-        6.  Se nenhuma ferramenta corresponder à solicitação, "tool_name" deve ser null e "tool_args" um objeto vazio.
-
-        Exemplo de resposta para a consulta "procure pelo personagem luke":
-        {{"tool_name": "search_characters", "tool_args": {{"search": "luke"}}}}
-
-        Exemplo de resposta para a consulta "me dê o personagem com id 1":
-        {{"tool_name": "get_character_by_id", "tool_args": {{"id": 1}}}}
-
-        Analise a solicitação do usuário e forneça sua resposta JSON.
+        Chame a ferramenta declarada que atende a solicitação, com os argumentos extraídos dela.
+        Se nenhuma ferramenta corresponder à solicitação, responda sem chamar ferramentas.
         """
 
         try:
-            response = self.model.generate_content(prompt)
-            text_response = response.text.strip()
-            log.debug(f"Resposta bruta da IA: {text_response}")
-            
-            json_start = text_response.find('{')
-            json_end = text_response.rfind('}') + 1
-            
-            if json_start != -1 and json_end != -1:
-                json_str = text_response[json_start:json_end]
-                tool_choice = json.loads(json_str)
-                
-                if tool_choice and tool_choice.get('tool_name'):
-                    log.info(f"Agente decidiu usar a ferramenta: {tool_choice.get('tool_name')} com argumentos: {tool_choice.get('tool_args')}")
-                    ai_decision_msg = AIMessage(content="", tool_calls=[{"name": tool_choice["tool_name"], "args": tool_choice.get("tool_args", {}), "id": tool_choice["tool_name"]}])
-                    return {"messages": [ai_decision_msg], "tool_choice": tool_choice}
-                else:
-                    log.info("Agente decidiu que nenhuma ferramenta é necessária.")
-                    final_response = AIMessage(content="Não entendi sua solicitação ou não tenho uma ferramenta para atendê-la.")
-                    return {"messages": [final_response], "tool_choice": None}
-            else:
-                raise ValueError("Resposta da IA não continha um JSON válido.")
+            # Declarações de função nativas (montadas uma vez no registro): o modelo devolve o
+            # nome e os argumentos já estruturados, sem JSON no texto da resposta
+            with tracer.span("LLM generate_content", "client", model=self.model.model_name, prompt_chars=len(prompt)):
+                response = self.model.generate_content(prompt, tools=registry.function_declarations())
+            function_call = next(
+                (part.function_call for part in response.candidates[0].content.parts if part.function_call.name),
+                None,
+            )
+
+            if function_call is None or function_call.name not in registry:
+                log.info("Agente decidiu que nenhuma ferramenta é necessária.")
+                final_response = AIMessage(content="Não entendi sua solicitação ou não tenho uma ferramenta para atendê-la.")
+                return {"messages": [final_response], "tool_choice": None}
+
+            tool_name = function_call.name
+            # Converte os argumentos (ex: IDs chegam como float) para o tipo de cada parâmetro
+            tool_args = registry.get(tool_name).validate(type(function_call).to_dict(function_call).get("args") or {})
+            tool_choice = {"tool_name": tool_name, "tool_args": tool_args}
+            log.info("Agente decidiu usar a ferramenta: %s com argumentos: %s", tool_name, tool_args)
+            ai_decision_msg = AIMessage(content="", tool_calls=[{"name": tool_name, "args": tool_args, "id": tool_name}])
+            return {"messages": [ai_decision_msg], "tool_choice": tool_choice}
 
         except Exception as e:
-            log.error(f"Erro ao processar a decisão do agente: {e}", exc_info=True)
+            log.error("Erro ao processar a decisão do agente: %s", e, exc_info=True)
             error_message = AIMessage(content=f"Ocorreu um erro ao tentar entender sua solicitação: {e}")
-            return {"messages": [error_message], "tool_choice": None}
+            return {"messages": [error_message], "tool_choice": None, "failed": True}
 
     def executor_ferramenta(self, state: GraphState):
         """Executa a ferramenta escolhida pelo agente."""
@@ -152,24 +145,28 @@ class GraphBuilder:
 
         tool_name = tool_choice.get('tool_name')
         tool_args = tool_choice.get('tool_args', {})
-        log.info(f"Executando ferramenta '{tool_name}' com argumentos: {tool_args}")
+        log.info("Executando ferramenta '%s' com argumentos: %s", tool_name, tool_args)
 
-        tools_instance = Tools()
-        
+        failed = False
         try:
-            if hasattr(tools_instance, tool_name):
-                method_to_call = getattr(tools_instance, tool_name)
+            if tool_name in registry:
+                method_to_call = getattr(self.tools, tool_name)
                 result = method_to_call(**tool_args)
-                log.info(f"Ferramenta '{tool_name}' executada com sucesso.")
+                log.info("Ferramenta '%s' executada com sucesso.", tool_name)
             else:
                 result = f"Erro: A ferramenta '{tool_name}' não foi encontrada."
                 log.error(result)
+                failed = True
 
         except Exception as e:
             result = f"Erro ao executar a ferramenta '{tool_name}': {e}"
             log.error(result, exc_info=True)
+            failed = True
 
-        return {"messages": [ToolMessage(content=str(result), name=tool_name, tool_call_id=tool_name)]}
+        return {
+            "messages": [ToolMessage(content=render(result, "llm"), artifact=result, name=tool_name, tool_call_id=tool_name)],
+            "failed": failed,
+        }
 
     def router_logic(self, state: GraphState):
         """Define a lógica condicional para roteamento."""
@@ -180,30 +177,3 @@ class GraphBuilder:
         else:
             log.info("Decisão: Rota para 'END'")
             return END
-
-    def _get_available_tools_desc(self):
-        """Inspeciona a classe Tools para extrair uma descrição detalhada das ferramentas para a IA."""
-        tool_methods = inspect.getmembers(Tools, predicate=inspect.isfunction)
-        tools_with_desc = []
-        for name, method in tool_methods:
-            if not name.startswith('_') and method.__doc__:
-                sig = inspect.signature(method)
-                param_details = []
-                for param_name, param in sig.parameters.items():
-                    if param_name != 'self':
-                        param_type = "string" # Default
-                        if param.annotation == int:
-                            param_type = "integer"
-                        param_details.append({
-                            "name": param_name,
-                            "type": param_type,
-                            "required": param.default is inspect.Parameter.empty
-                        })
-                
-                tools_with_desc.append({
-                    "name": name,
-                    "description": method.__doc__.strip(),
-                    "parameters": param_details
-                })
-        return tools_with_desc
-    
\ No newline at end of file
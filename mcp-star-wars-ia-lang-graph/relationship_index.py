@@ -0,0 +1,245 @@
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from logger import setup_logger
+from search_index import normalize
+from swapi_client import complete_results
+
+log = setup_logger('relationship_index')
+
+# Campos de referência de cada recurso: campo -> recurso referenciado
+RELATION_FIELDS = {
+    "people": {"homeworld": "planets", "films": "films", "species": "species", "vehicles": "vehicles", "starships": "starships"},
+    "planets": {"residents": "people", "films": "films"},
+    "films": {"characters": "people", "planets": "planets", "species": "species", "starships": "starships", "vehicles": "vehicles"},
+    "species": {"homeworld": "planets", "people": "people", "films": "films"},
+    "vehicles": {"pilots": "people", "films": "films"},
+    "starships": {"pilots": "people", "films": "films"},
+}
+
+def _ref_id(url) -> Optional[int]:
+    if not url:
+        return None
+    return int(str(url).rstrip('/').rsplit('/', 1)[1])
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """IDs presentes num bitset, em ordem crescente."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+class RelationshipIndex:
+    """
+    Índices de adjacência pré-calculados entre films, people, planets, species, vehicles e starships.
+
+    Para cada par de recursos (ex: films → people) guarda, por ID de origem, um bitset (um
+    `int` do Python em que o bit `n` indica o ID `n`) com os IDs relacionados. As relações
+    valem nos dois sentidos, então `films.characters` e `people.films` alimentam o mesmo par.
+    Interseções e uniões viram operações `&`/`|` sobre inteiros.
+
+    A atualização é incremental: `update` compara as referências de cada registro com as da
+    última versão e só altera as arestas dos registros adicionados, removidos ou modificados.
+    Cada aresta conta quantos registros a declaram, para que só seja removida quando nenhum
+    dos dois lados a referencia mais.
+    """
+
+    def __init__(self):
+        self._adjacency: Dict[Tuple[str, str], Dict[int, int]] = {}
+        self._edge_counts = Counter()
+        self._record_edges: Dict[Tuple[str, int], frozenset] = {}
+        self._names: Dict[str, Dict[int, str]] = {}
+        self._lock = threading.Lock()
+        self.snapshot_version = None
+        self.updated_at = None
+
+    @staticmethod
+    def _edges_of(endpoint: str, id: int, record: dict) -> frozenset:
+        """Arestas declaradas por um registro, normalizadas como ((recurso, id), (recurso, id)) ordenados."""
+        edges = set()
+        source = (endpoint, id)
+        for field, target_endpoint in RELATION_FIELDS.get(endpoint, {}).items():
+            value = record.get(field)
+            for url in (value if isinstance(value, list) else [value]):
+                target_id = _ref_id(url)
+                if target_id is not None:
+                    target = (target_endpoint, target_id)
+                    edges.add((source, target) if source <= target else (target, source))
+        return frozenset(edges)
+
+    def _set_edge(self, edge, present: bool):
+        (a_endpoint, a_id), (b_endpoint, b_id) = edge
+        for (src, src_id), (dst, dst_id) in (((a_endpoint, a_id), (b_endpoint, b_id)), ((b_endpoint, b_id), (a_endpoint, a_id))):
+            adjacency = self._adjacency.setdefault((src, dst), {})
+            if present:
+                adjacency[src_id] = adjacency.get(src_id, 0) | (1 << dst_id)
+            else:
+                bits = adjacency.get(src_id, 0) & ~(1 << dst_id)
+                if bits:
+                    adjacency[src_id] = bits
+                else:
+                    adjacency.pop(src_id, None)
+
+    def update(self, endpoint: str, records: Dict[int, dict]) -> int:
+        """
+        Sincroniza os registros de um recurso (`{id: registro}`) e retorna quantos mudaram.
+
+        Registros ausentes de `records` são considerados removidos.
+        """
+        changed = 0
+        with self._lock:
+            names = self._names.setdefault(endpoint, {})
+            for id in set(names) - set(records):
+                changed += self._replace_edges(endpoint, id, frozenset())
+                names.pop(id, None)
+            for id, record in records.items():
+                names[id] = record.get("name") or record.get("title") or str(id)
+                changed += self._replace_edges(endpoint, id, self._edges_of(endpoint, id, record))
+            self.updated_at = time.time()
+        return changed
+
+    def _replace_edges(self, endpoint: str, id: int, edges: frozenset) -> int:
+        key = (endpoint, id)
+        old_edges = self._record_edges.get(key, frozenset())
+        if old_edges == edges and (key in self._record_edges or not edges):
+            return 0
+        for edge in old_edges - edges:
+            self._edge_counts[edge] -= 1
+            if self._edge_counts[edge] <= 0:
+                del self._edge_counts[edge]
+                self._set_edge(edge, False)
+        for edge in edges - old_edges:
+            self._edge_counts[edge] += 1
+            if self._edge_counts[edge] == 1:
+                self._set_edge(edge, True)
+        if edges:
+            self._record_edges[key] = edges
+        else:
+            self._record_edges.pop(key, None)
+        return 1
+
+    def sync_snapshot(self, snapshot) -> int:
+        """Atualiza o índice a partir de um `SwapiSnapshot`, só quando a versão dele mudou."""
+        if self.snapshot_version == snapshot.version:
+            return 0
+        start_time = time.time()
+        changed = sum(self.update(endpoint, records) for endpoint, records in snapshot.resources.items())
+        self.snapshot_version = snapshot.version
+        log.info(
+            "Índice de relacionamentos sincronizado com o snapshot v%s: "
+            "%s registros alterados, %s relações, Tempo: %.3fs",
+            snapshot.version, changed, len(self._edge_counts), time.time() - start_time
+        )
+        return changed
+
+    def related(self, source: str, id: int, target: str) -> int:
+        """Bitset dos IDs de `target` relacionados ao registro `source`/`id`."""
+        return self._adjacency.get((source, target), {}).get(id, 0)
+
+    def related_to_all(self, source: str, ids: Iterable[int], target: str) -> int:
+        """Interseção: IDs de `target` relacionados a todos os `ids` de `source`."""
+        result = None
+        adjacency = self._adjacency.get((source, target), {})
+        for id in ids:
+            bits = adjacency.get(id, 0)
+            result = bits if result is None else result & bits
+            if not result:
+                return 0
+        return result or 0
+
+    def related_to_any(self, source: str, bits: int, target: str) -> int:
+        """União: IDs de `target` relacionados a qualquer um dos IDs (bitset) de `source`."""
+        adjacency = self._adjacency.get((source, target), {})
+        result = 0
+        for id in iter_bits(bits):
+            result |= adjacency.get(id, 0)
+        return result
+
+    def co_occurrences(self, source: str, id: int, via: str) -> List[Tuple[int, int]]:
+        """
+        Registros de `source` que compartilham registros de `via` com `id` (ex: personagens
+        que aparecem nos mesmos filmes), com a quantidade em comum, da maior para a menor.
+        """
+        counts = Counter()
+        for via_id in iter_bits(self.related(source, id, via)):
+            counts.update(iter_bits(self.related(via, via_id, source) & ~(1 << id)))
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+    def name(self, endpoint: str, id: int) -> str:
+        return self._names.get(endpoint, {}).get(id, f"{endpoint}/{id}")
+
+    def find(self, endpoint: str, term) -> Optional[int]:
+        """Resolve um ID ou nome/título (parcial, sem acentos) para o ID do registro."""
+        term = str(term).strip()
+        names = self._names.get(endpoint, {})
+        if term.isdigit():
+            return int(term) if int(term) in names else None
+        term = normalize(term)
+        matches = [id for id, name in names.items() if term in normalize(name)]
+        exact = [id for id in matches if normalize(names[id]) == term]
+        return (exact or sorted(matches) or [None])[0]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "records": len(self._record_edges),
+                "relations": len(self._edge_counts),
+                "snapshot_version": self.snapshot_version,
+                "updated_at": self.updated_at,
+            }
+
+class RelationshipIndexProvider:
+    """
+    Mantém o `RelationshipIndex` atualizado a partir do cliente SWAPI.
+
+    Com o espelho local, reconstrói o índice sempre que a versão do snapshot muda; com os
+    clientes HTTP, baixa todas as páginas de cada recurso (servidas pelo cache em disco)
+    no primeiro uso e a cada `max_age` segundos.
+
+    As consultas leem o índice sem lock, então ele nunca é alterado depois de publicado:
+    cada atualização monta um índice novo e o troca de uma vez. Se algum recurso vier
+    incompleto, o índice anterior continua em uso.
+    """
+
+    def __init__(self, fetch_all, snapshot=None, max_age: Optional[float] = 3600):
+        self._fetch_all = fetch_all
+        self._snapshot = snapshot
+        self.max_age = max_age
+        self.index = RelationshipIndex()
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        if self._snapshot is not None:
+            return self.index.snapshot_version == self._snapshot.version
+        updated_at = self.index.updated_at
+        return updated_at is not None and (self.max_age is None or time.time() - updated_at < self.max_age)
+
+    def get(self) -> Optional[RelationshipIndex]:
+        if self._is_fresh():
+            return self.index
+        with self._lock:
+            if self._is_fresh():
+                return self.index
+            index = RelationshipIndex()
+            if self._snapshot is not None:
+                index.sync_snapshot(self._snapshot)
+                self.index = index
+                return index
+            start_time = time.time()
+            resources = {}
+            for endpoint in RELATION_FIELDS:
+                results = complete_results(endpoint, self._fetch_all(endpoint))
+                if results is None:
+                    log.error("Não foi possível atualizar o índice de relacionamentos: falha ao buscar %s", endpoint)
+                    return self.index if self.index.updated_at else None
+                resources[endpoint] = {_ref_id(record["url"]): record for record in results}
+            for endpoint, records in resources.items():
+                index.update(endpoint, records)
+            self.index = index
+            log.info(
+                "Índice de relacionamentos atualizado: %s relações, Tempo: %.2fs",
+                index.get_stats()["relations"], time.time() - start_time
+            )
+            return index
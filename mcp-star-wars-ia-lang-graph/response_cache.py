@@ -0,0 +1,117 @@
+"""
+Cache das respostas HTTP das aplicações Flask.
+
+A mesma ferramenta com o mesmo parâmetro (ou a mesma consulta, normalizada) produz a
+mesma resposta: ela é guardada em memória (LRU + TTL, limitada em entradas e bytes) e
+servida sem executar a ferramenta, o LLM ou a SWAPI, nem renderizar o template.
+
+Só GET/HEAD passam pelo cache: cada resposta leva um ETag forte (hash do corpo) e
+`Cache-Control: public, max-age=...`, e um GET condicional (`If-None-Match`) com o ETag
+atual recebe 304 sem corpo. Um POST sempre executa a ferramenta e não é marcado como
+cacheável. Respostas com erro ou montadas com dados incompletos (falha da SWAPI tratada
+como "não encontrado", ver `ToolResult.degraded`) não são guardadas (`Cache-Control:
+no-store`). Requisições idênticas simultâneas são agrupadas: só uma monta a resposta.
+
+Configuração por variáveis de ambiente: `RESPONSE_CACHE_TTL` (segundos no servidor;
+0 desativa o cache), `RESPONSE_CACHE_MAX_AGE` (segundos nos navegadores e proxies),
+`RESPONSE_CACHE_MAX_ENTRIES` e `RESPONSE_CACHE_MAX_BYTES`.
+"""
+import hashlib
+import os
+from typing import Callable, Hashable
+
+from logger import setup_logger
+from metrics import metrics
+from singleflight import SingleFlight
+from swapi_cache import ModelCache
+
+log = setup_logger('response_cache')
+
+def normalize_query(query: str) -> str:
+    """Forma canônica de uma consulta em linguagem natural: sem diferença de caixa e espaços."""
+    return " ".join(query.split()).casefold()
+
+def strong_etag(body: bytes) -> str:
+    """ETag forte: muda sempre que um byte do corpo muda."""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+class ResponseCache:
+    """
+    Cache de respostas HTTP (corpo, tipo e ETag) por chave.
+
+    Args:
+        max_entries: Número máximo de respostas guardadas
+        max_bytes: Tamanho máximo (soma dos corpos) em bytes
+        ttl: Segundos que uma resposta fica no cache do servidor (0 desativa)
+        max_age: Segundos que navegadores e proxies podem reutilizar a resposta
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024, ttl: float = 300, max_age: int = 60):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.store = ModelCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+        self._single_flight = SingleFlight()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 512)),
+            max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+            ttl=float(os.getenv("RESPONSE_CACHE_TTL", 300)),
+            max_age=int(os.getenv("RESPONSE_CACHE_MAX_AGE", 60)),
+        )
+
+    def _build_entry(self, key: Hashable, build: Callable) -> tuple:
+        response = build()
+        body = response.get_data()
+        cacheable = response.status_code == 200 and not response.cache_control.no_store
+        entry = (body, response.content_type, response.status_code, strong_etag(body) if cacheable else None)
+        if cacheable and self.ttl > 0:
+            self.store.set(key, entry, size=len(body))
+        return entry
+
+    def respond(self, key: Hashable, build: Callable):
+        """
+        Resposta para `key`: a guardada, se houver, ou a montada por `build()` (uma
+        resposta Flask; para não guardá-la, marque `response.cache_control.no_store`).
+        Métodos diferentes de GET/HEAD não usam o cache.
+        """
+        from flask import Response, request
+
+        if request.method not in ("GET", "HEAD"):
+            return build()
+
+        entry = self.store.get(key)
+        status = "HIT"
+        if entry is None:
+            status = "MISS"
+            entry = self._single_flight.do(key, lambda: self._build_entry(key, build))
+        body, content_type, status_code, etag = entry
+
+        response = Response(body, status=status_code, content_type=content_type)
+        if etag is None:
+            response.cache_control.no_store = True
+            return response
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.headers["X-Cache"] = status
+        # 304 sem corpo para GET/HEAD com If-None-Match igual ao ETag
+        return response.make_conditional(request)
+
+    def collect(self):
+        """Coletor das métricas do cache (ver `MetricsRegistry.register_collector`)."""
+        stats = self.store.get_stats()
+        for result in ("hits", "misses"):
+            yield "swapi_cache_lookups_total", "counter", "Consultas aos caches da SWAPI por resultado", {"cache": "response", "result": result}, stats.get(result)
+        yield "swapi_cache_evictions_total", "counter", "Entradas removidas dos caches por falta de espaço", {"cache": "response"}, stats.get("evictions")
+        yield "swapi_cache_entries", "gauge", "Entradas nos caches", {"cache": "response"}, stats.get("entries")
+        yield "swapi_cache_bytes", "gauge", "Tamanho dos caches em bytes", {"cache": "response"}, stats.get("bytes")
+
+def setup_response_cache(app, cache: ResponseCache = None) -> ResponseCache:
+    """Cria o cache de respostas de uma aplicação Flask e expõe as suas métricas em `/metrics`."""
+    cache = cache or ResponseCache.from_env()
+    metrics.register_collector("response_cache", cache.collect)
+    log.info("Cache de respostas HTTP: TTL %ss, max-age %ss, até %s entradas",
+             cache.ttl, cache.max_age, cache.store.max_entries)
+    return cache
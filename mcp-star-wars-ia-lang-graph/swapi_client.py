@@ -1,76 +1,435 @@
+import json
+import math
 import requests
 import time
-from typing import Type, TypeVar
-from logger import setup_logger
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from typing import Any, Iterable, Iterator, List, Optional, Type, TypeVar
+from logger import SAMPLED, setup_logger
+from metrics import UPSTREAM_BYTES, UPSTREAM_DURATION, UPSTREAM_REQUESTS
+from model import parse_model
+from swapi_cache import ModelCache, SwapiResponseCache, approximate_size
+from rate_limiter import AdaptiveRateLimiter
+from resilience import Resilience, on_abandon
+from singleflight import SingleFlight
+from tracing import propagate, tracer
+
+# Status de `_get_json` cujos dados vêm do cache local: podem usar o caminho rápido sem validação
+TRUSTED_STATUSES = ("cache", 304)
+
+# Falhas da SWAPI (rede, 5xx, circuito aberto) que os métodos `fetch_*` transformam em
+# None/"não encontrado" durante a ferramenta em execução; um 404 é uma resposta real, não falha
+_upstream_failures: ContextVar[Optional[list]] = ContextVar("upstream_failures", default=None)
+
+@contextmanager
+def track_upstream_failures():
+    """
+    Registra as falhas da SWAPI tratadas silenciosamente dentro do bloco (inclusive nas
+    threads e tasks iniciadas com `propagate`), para marcar o resultado como incompleto.
+    """
+    outer = _upstream_failures.get()
+    failures = []
+    token = _upstream_failures.set(failures)
+    try:
+        yield failures
+    finally:
+        _upstream_failures.reset(token)
+        if outer is not None:
+            outer.extend(failures)
+
+def record_upstream_failure(endpoint: str, error: Exception):
+    """Anota uma falha da SWAPI no bloco `track_upstream_failures` atual; um 404 não é falha."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 404:
+        return
+    failures = _upstream_failures.get()
+    if failures is not None:
+        failures.append(f"{endpoint}: {error}")
+
+def complete_results(endpoint: str, data) -> Optional[list]:
+    """
+    `results` de uma listagem de `fetch_all_pages` (dicionário ou `SearchResponse`), ou None
+    se ela falhou ou não trouxe os `count` registros; nesse caso a falha é anotada.
+    """
+    if not data:
+        return None
+    results, count = (data["results"], data["count"]) if isinstance(data, dict) else (data.results, data.count)
+    if len(results) != count:
+        record_upstream_failure(endpoint, RuntimeError(f"listagem incompleta ({len(results)} de {count})"))
+        return None
+    return results
+
+class _QueryString:
+    """Parâmetros da busca no log ("?search=luke"), formatados só quando a linha for gravada."""
+    __slots__ = ("params",)
+
+    def __init__(self, params):
+        self.params = params
+
+    def __str__(self):
+        return f"?{', '.join([f'{k}={v}' for k, v in self.params.items()])}" if self.params else ""
+
+@dataclass
+class BatchResult:
+    """Resultado de um item de uma busca em lote (`fetch_many_by_id`)."""
+    id: Any
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 class SwapiClient:
     SWAPI_BASE_URL = "https://swapi.dev/api"
     T = TypeVar('T')
 
-    def __init__(self, session=None):
-        self.session = session or requests
+    def __init__(self, session=None, pool_connections: int = 4, pool_maxsize: int = 16,
+                 pool_block: bool = False, keep_alive: bool = True, cache=None,
+                 model_cache=None, single_flight=None, timeout=(3.05, 10), resilience=None,
+                 rate_limiter=None):
+        """
+        Cria o cliente SWAPI.
+
+        Sem uma sessão explícita, o cliente cria uma `requests.Session` própria com
+        pool de conexões keep-alive, que pode ser compartilhada entre as threads do Flask.
+
+        Args:
+            session: Sessão HTTP já configurada (substitui o pool padrão).
+            pool_connections: Número de hosts distintos mantidos no pool.
+            pool_maxsize: Máximo de conexões abertas por host.
+            pool_block: Se True, bloqueia quando o pool do host está cheio em vez de abrir conexões extras.
+            keep_alive: Se False, envia `Connection: close` e desativa a reutilização de conexões.
+            cache: `SwapiResponseCache` persistente. Por padrão usa o cache em disco em `cache/`;
+                passe `False` para desativá-lo.
+            model_cache: `ModelCache` em memória dos objetos retornados por `fetch_swapi_by_id`
+                (padrão: um cache novo; `False` desativa).
+            single_flight: `SingleFlight` que agrupa requisições idênticas simultâneas
+                (padrão: um novo; `False` desativa).
+            timeout: Timeout das requisições, em segundos (`(conexão, leitura)` ou um único valor).
+            resilience: `Resilience` com retries, circuit breaker por endpoint e hedge opcional
+                (padrão: retries e circuit breaker, sem hedge; `False` desativa).
+            rate_limiter: `AdaptiveRateLimiter` que limita a taxa e a concorrência das requisições
+                (padrão: 10 req/s e concorrência adaptativa até `pool_maxsize`; `False` desativa).
+        """
+        self.session = session or self._create_session(pool_connections, pool_maxsize, pool_block, keep_alive)
         self.logger = setup_logger('swapi_client')
+        if cache is None:
+            cache = SwapiResponseCache()
+        self.cache = cache or None
+        if model_cache is None:
+            model_cache = ModelCache()
+        self.model_cache = model_cache or None
+        if single_flight is None:
+            single_flight = SingleFlight()
+        self.single_flight = single_flight or None
+        self.timeout = timeout
+        if resilience is None:
+            resilience = Resilience(retry_exceptions=(requests.ConnectionError, requests.Timeout))
+        self.resilience = resilience or None
+        if rate_limiter is None:
+            rate_limiter = AdaptiveRateLimiter(max_limit=pool_maxsize)
+        self.rate_limiter = rate_limiter or None
+
+    @staticmethod
+    def _create_session(pool_connections: int, pool_maxsize: int, pool_block: bool, keep_alive: bool):
+        """Cria uma sessão HTTP com pool de conexões para a SWAPI."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+        return session
+
+    def get_pool_stats(self) -> dict:
+        """
+        Retorna os contadores do pool de conexões.
+
+        `new_connections` é o número de conexões TCP/TLS abertas e `reused_connections`
+        o número de requisições atendidas por uma conexão já aberta.
+        """
+        stats = {"hosts": 0, "requests": 0, "new_connections": 0, "reused_connections": 0}
+        adapters = getattr(self.session, "adapters", {})
+        for adapter in {id(a): a for a in adapters.values()}.values():
+            pool_manager = getattr(adapter, "poolmanager", None)
+            if pool_manager is None:
+                continue
+            for key in list(pool_manager.pools.keys()):
+                pool = pool_manager.pools.get(key)
+                if pool is None:
+                    continue
+                stats["hosts"] += 1
+                stats["requests"] += pool.num_requests
+                stats["new_connections"] += pool.num_connections
+        stats["reused_connections"] = max(stats["requests"] - stats["new_connections"], 0)
+        return stats
+
+    def close(self):
+        """Fecha as conexões abertas do pool."""
+        if hasattr(self.session, "close"):
+            self.session.close()
+
+    def _send(self, endpoint: str, url: str, params=None, headers=None):
+        """
+        Envia o GET pela camada de resiliência (circuit breaker, retries e hedge).
+
+        Cada tentativa aguarda sua vez no `rate_limiter`, que ajusta a concorrência conforme
+        o status e a latência das respostas.
+        """
+        def send():
+            with tracer.span(f"GET {endpoint}", "client", url=url, conditional=bool(headers)) as span:
+                start = time.perf_counter()
+                try:
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout, verify=False)
+                except Exception:
+                    UPSTREAM_REQUESTS.labels(endpoint, "error").inc()
+                    raise
+                UPSTREAM_DURATION.labels(endpoint).observe(time.perf_counter() - start)
+                UPSTREAM_REQUESTS.labels(endpoint, str(response.status_code)).inc()
+                UPSTREAM_BYTES.labels(endpoint).inc(len(response.content))
+                span.set_attribute("status", response.status_code)
+                if self.resilience and response.status_code in self.resilience.retry.retry_statuses:
+                    response.raise_for_status()
+                return response
+
+        def attempt():
+            if not self.rate_limiter:
+                return send()
+            with self.rate_limiter.limit() as permit:
+                # Se um hedge perder a corrida, a vaga volta ao limiter sem esperar a resposta dele
+                on_abandon(permit.release)
+                response = send()
+                permit.status = response.status_code
+                return response
+
+        if not self.resilience:
+            return attempt()
+        return self.resilience.call(endpoint, attempt)
+
+    def _get_json(self, endpoint: str, url: str, params=None):
+        """
+        Executa o GET e retorna (status, data).
+
+        Chamadas simultâneas para a mesma URL + parâmetros são agrupadas: apenas a primeira
+        vai à rede e as demais recebem o mesmo resultado (ou a mesma falha).
+        """
+        if not self.single_flight:
+            return self._fetch_json(endpoint, url, params)
+        key = SwapiResponseCache.make_key(url, params)
+        return self.single_flight.do(key, lambda: self._fetch_json(endpoint, url, params))
+
+    def _fetch_json(self, endpoint: str, url: str, params=None):
+        """
+        Executa o GET passando pelo cache persistente e retorna (status, data).
+
+        Entradas frescas são servidas do disco sem acessar a rede (status "cache");
+        entradas expiradas são revalidadas com If-None-Match / If-Modified-Since e,
+        em caso de `304 Not Modified`, renovadas e reaproveitadas.
+        """
+        cached = None
+        headers = None
+        if self.cache:
+            cache_key = self.cache.make_key(url, params)
+            with tracer.span("cache disk", key=cache_key) as span:
+                cached = self.cache.get(cache_key)
+                span.set_attribute("result", "miss" if cached is None else "hit" if cached.fresh else "stale")
+            if cached and cached.fresh:
+                return "cache", json.loads(cached.body)
+            if cached:
+                headers = cached.conditional_headers()
+
+        response = self._send(endpoint, url, params, headers)
+
+        if cached and response.status_code == 304:
+            refreshed = self.cache.refresh(cache_key) or cached
+            return response.status_code, json.loads(refreshed.body)
+
+        response.raise_for_status()
+        data = response.json()
+        if self.cache:
+            self.cache.set(
+                cache_key, endpoint, response.content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+        return response.status_code, data
 
     def fetch_swapi(self, endpoint: str, params=None, model: Type[T] = None) -> T:
         url = f"{self.SWAPI_BASE_URL}/{endpoint}/"
         start_time = time.time()
         
         # Log da requisição MCP
-        params_str = f"?{', '.join([f'{k}={v}' for k, v in params.items()])}" if params else ""
-        self.logger.info(f"Requisição MCP → GET {url}{params_str}")
+        self.logger.info("Requisição MCP → GET %s%s", url, _QueryString(params), extra=SAMPLED)
         
         try:
-            response = self.session.get(url, params=params, timeout=10, verify=False)
+            status, data = self._get_json(endpoint, url, params)
             elapsed_time = time.time() - start_time
             
-            response.raise_for_status()
-            data = response.json()
-            
             # Log da resposta MCP
             results_count = len(data.get('results', [])) if isinstance(data, dict) else 0
             self.logger.info(
-                f"Resposta MCP ← Status: {response.status_code}, "
-                f"Tempo: {elapsed_time:.2f}s, "
-                f"Resultados: {results_count}"
+                "Resposta MCP ← Status: %s, Tempo: %.2fs, Resultados: %s",
+                status, elapsed_time, results_count, extra=SAMPLED
             )
             
             if model:
-                return model.parse_obj(data)
+                return parse_model(model, data, trusted=status in TRUSTED_STATUSES)
             return data
         except Exception as e:
             elapsed_time = time.time() - start_time
             self.logger.error(
-                f"Erro ao buscar {endpoint}: {e}, "
-                f"Tempo decorrido: {elapsed_time:.2f}s"
+                "Erro ao buscar %s: %s, "
+                "Tempo decorrido: %.2fs",
+                endpoint, e, elapsed_time
             )
+            record_upstream_failure(endpoint, e)
             return None
 
     def fetch_swapi_by_id(self, endpoint: str, id: int, model: Type[T]) -> T:
+        try:
+            return self._fetch_by_id(endpoint, id, model)
+        except Exception:
+            return None
+
+    def _fetch_by_id(self, endpoint: str, id: int, model: Type[T]) -> T:
+        """Busca um recurso pelo ID; registra e propaga a exceção em caso de erro."""
+        if self.model_cache:
+            cache_key = (endpoint, id, model.__name__)
+            with tracer.span("cache model", endpoint=endpoint, id=id) as span:
+                cached = self.model_cache.get(cache_key)
+                span.set_attribute("result", "miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+
         url = f"{self.SWAPI_BASE_URL}/{endpoint}/{id}/"
         start_time = time.time()
         
         # Log da requisição MCP
-        self.logger.info(f"Requisição MCP → GET {url}")
+        self.logger.info("Requisição MCP → GET %s", url, extra=SAMPLED)
         
         try:
-            response = self.session.get(url, timeout=10, verify=False)
+            status, data = self._get_json(endpoint, url)
             elapsed_time = time.time() - start_time
             
-            response.raise_for_status()
-            data = response.json()
-            
             # Log da resposta MCP
             self.logger.info(
-                f"Resposta MCP ← Status: {response.status_code}, "
-                f"Tempo: {elapsed_time:.2f}s, "
-                f"Endpoint: {endpoint}/{id}"
+                "Resposta MCP ← Status: %s, Tempo: %.2fs, Endpoint: %s/%s",
+                status, elapsed_time, endpoint, id, extra=SAMPLED
             )
             
-            return model.parse_obj(data)
+            result = parse_model(model, data, trusted=status in TRUSTED_STATUSES)
+            if self.model_cache:
+                self.model_cache.set(cache_key, result, size=approximate_size(result))
+            return result
         except Exception as e:
             elapsed_time = time.time() - start_time
             self.logger.error(
-                f"Erro ao buscar {endpoint} com ID {id}: {e}, "
-                f"Tempo decorrido: {elapsed_time:.2f}s"
+                "Erro ao buscar %s com ID %s: %s, "
+                "Tempo decorrido: %.2fs",
+                endpoint, id, e, elapsed_time
+            )
+            record_upstream_failure(endpoint, e)
+            raise
+
+    def iter_pages(self, endpoint: str, params=None, max_concurrency: int = 4) -> Iterator[dict]:
+        """
+        Itera sobre todas as páginas de um endpoint de listagem/busca, na ordem.
+
+        A primeira página é buscada para ler `count`; as URLs das páginas restantes são
+        calculadas a partir dela e baixadas em paralelo (no máximo `max_concurrency`
+        ao mesmo tempo). Cada página é entregue assim que estiver disponível, para que o
+        chamador possa começar a processar antes da última chegar.
+        """
+        params = dict(params or {})
+        first_page = self.fetch_swapi(endpoint, params=params)
+        if not first_page:
+            return
+        yield first_page
+
+        page_size = len(first_page.get('results', []))
+        if not page_size or not first_page.get('next'):
+            return
+        total_pages = math.ceil(first_page.get('count', 0) / page_size)
+        if total_pages <= 1:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(max_concurrency, total_pages - 1))
+        try:
+            futures = [
+                executor.submit(propagate(self.fetch_swapi), endpoint, {**params, "page": page})
+                for page in range(2, total_pages + 1)
+            ]
+            for future in futures:
+                page_data = future.result()
+                if page_data:
+                    yield page_data
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_all_pages(self, endpoint: str, params=None, model: Type[T] = None,
+                        max_concurrency: int = 4) -> T:
+        """
+        Busca todas as páginas de um endpoint e junta os resultados em uma única resposta.
+
+        Retorna um dicionário no formato de `SearchResponse` (ou o `model` informado) com
+        todos os `results`, ou None se alguma página falhar ou o total não bater com `count`.
+        """
+        results = []
+        count = None
+        for page_data in self.iter_pages(endpoint, params=params, max_concurrency=max_concurrency):
+            if count is None:
+                count = page_data.get('count', 0)
+            results.extend(page_data.get('results', []))
+        if count is None:
+            return None
+
+        if len(results) != count:
+            # Página que falhou ou veio curta: um resultado parcial passaria por completo
+            self.logger.warning(
+                "Paginação incompleta em %s: %s de %s resultados", endpoint, len(results), count
             )
+            record_upstream_failure(endpoint, RuntimeError(f"paginação incompleta ({len(results)} de {count})"))
             return None
+        data = {"count": count, "next": None, "previous": None, "results": results}
+        if model:
+            return parse_model(model, data)
+        return data
+
+    def fetch_many_by_id(self, endpoint: str, ids: Iterable[int], model: Type[T],
+                         max_concurrency: int = 8) -> List[BatchResult]:
+        """
+        Busca vários recursos pelo ID de uma só vez.
+
+        IDs repetidos são buscados uma única vez; os que estão no cache de objetos são
+        servidos direto da memória e os demais são buscados em paralelo (no máximo
+        `max_concurrency` ao mesmo tempo). O retorno segue a ordem de `ids`, com um
+        `BatchResult` por item contendo o objeto ou a mensagem de erro.
+        """
+        ids = list(ids)
+        resolved = {}
+        missing = []
+        for id in dict.fromkeys(ids):
+            cached = self.model_cache.get((endpoint, id, model.__name__)) if self.model_cache else None
+            if cached is not None:
+                resolved[id] = BatchResult(id, cached)
+            else:
+                missing.append(id)
+
+        def _fetch(id):
+            try:
+                return BatchResult(id, self._fetch_by_id(endpoint, id, model))
+            except Exception as e:
+                return BatchResult(id, error=str(e))
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(missing))) as executor:
+                for batch_result in executor.map(propagate(_fetch), missing):
+                    resolved[batch_result.id] = batch_result
+        return [resolved[id] for id in ids]
@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Os módulos da aplicação ficam na raiz da pasta (imports planos, como em `app.py`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class FakeSwapi:
+    """
+    SWAPI falsa em 127.0.0.1, com keep-alive (HTTP/1.1).
+
+    `routes` mapeia o caminho pedido (com a query string) para o corpo JSON da resposta,
+    ou para uma tupla `(status, corpo)`; caminhos ausentes respondem 404. `requests`
+    guarda os caminhos recebidos, na ordem, e `connections` as conexões TCP aceitas.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.connections = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                fake.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                fake.requests.append(self.path)
+                route = fake.routes.get(self.path, (404, {"detail": "Not found"}))
+                status, body = route if isinstance(route, tuple) else (200, route)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/api"
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+
+    def paginate(self, path: str, records: list, page_size: int = 10):
+        """Registra a listagem `records` em `path`, em páginas de `page_size` itens, como a SWAPI."""
+        pages = [records[i:i + page_size] for i in range(0, len(records), page_size)] or [[]]
+        for number, page in enumerate(pages, start=1):
+            self.routes[path if number == 1 else f"{path}?page={number}"] = {
+                "count": len(records),
+                "next": f"{self.base_url}{path[4:]}?page={number + 1}" if number < len(pages) else None,
+                "previous": None,
+                "results": page,
+            }
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def fake_swapi():
+    fake = FakeSwapi()
+    yield fake
+    fake.close()
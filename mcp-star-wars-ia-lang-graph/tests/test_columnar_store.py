@@ -0,0 +1,73 @@
+import numpy as np
+
+from columnar_store import Categorical, ColumnarStore, ColumnarStoreProvider, parse_number
+from swapi_client import track_upstream_failures
+
+PEOPLE = [
+    {"url": "https://swapi.dev/api/people/1/", "name": "Luke Skywalker", "height": "172", "mass": "77", "species": []},
+    {"url": "https://swapi.dev/api/people/4/", "name": "Darth Vader", "height": "202", "mass": "136", "species": []},
+    {"url": "https://swapi.dev/api/people/2/", "name": "C-3PO", "height": "167", "mass": "75",
+     "species": ["https://swapi.dev/api/species/2/"]},
+    {"url": "https://swapi.dev/api/people/3/", "name": "R2-D2", "height": "96", "mass": "unknown",
+     "species": ["https://swapi.dev/api/species/2/"]},
+]
+SPECIES = [{"url": "https://swapi.dev/api/species/2/", "name": "Droid"}]
+PLANETS = [
+    {"url": "https://swapi.dev/api/planets/1/", "name": "Tatooine", "population": "200000", "climate": "arid"},
+    {"url": "https://swapi.dev/api/planets/8/", "name": "Naboo", "population": "4500000000", "climate": "temperate"},
+    {"url": "https://swapi.dev/api/planets/2/", "name": "Alderaan", "population": "2,000,000,000",
+     "climate": "temperate, arid"},
+    {"url": "https://swapi.dev/api/planets/4/", "name": "Hoth", "population": "unknown", "climate": "frozen"},
+]
+
+def test_parse_number_and_categorical():
+    assert parse_number("1,358") == 1358
+    assert np.isnan(parse_number("n/a"))
+    climate = Categorical(p["climate"] for p in PLANETS)
+    assert list(climate.mask("arid")) == [True, False, True, False]
+
+def test_average_mass_counts_empty_species_as_human():
+    rows = ColumnarStore(PEOPLE, [], SPECIES).average_mass_by_species()
+    by_species = {row["species"]: row for row in rows}
+    assert set(by_species) == {"Human", "Droid"}
+    assert by_species["Human"]["count"] == 2
+    assert by_species["Human"]["average_mass"] == (77 + 136) / 2
+    # Massa desconhecida fica de fora da média
+    assert by_species["Droid"]["count"] == 1
+    assert rows[0]["species"] == "Human"
+
+def test_tallest_skips_unknown_height():
+    people = PEOPLE + [{"url": "https://swapi.dev/api/people/5/", "name": "?", "height": "unknown", "species": []}]
+    assert [row["name"] for row in ColumnarStore(people, []).tallest(3)] == ["Darth Vader", "Luke Skywalker", "C-3PO"]
+
+def test_planets_with_population_above():
+    rows = ColumnarStore([], PLANETS).planets_with_population_above(1_000_000)
+    assert [(row["name"], row["climate"]) for row in rows] == [("Naboo", "temperate"), ("Alderaan", "temperate, arid")]
+
+def test_provider_builds_once_until_max_age():
+    calls = []
+
+    def fetch_all(endpoint):
+        calls.append(endpoint)
+        records = {"people": PEOPLE, "planets": PLANETS, "species": SPECIES}[endpoint]
+        return {"count": len(records), "results": records}
+
+    provider = ColumnarStoreProvider(fetch_all)
+    store = provider.get()
+    assert provider.get() is store
+    assert calls == ["people", "planets", "species"]
+    provider.max_age = 0
+    assert provider.get() is not store
+
+def test_provider_does_not_cache_an_incomplete_fetch():
+    listings = {"people": {"count": len(PEOPLE) + 1, "results": PEOPLE}, "planets": {"count": len(PLANETS), "results": PLANETS}}
+
+    def fetch_all(endpoint):
+        return listings.get(endpoint, {"count": len(SPECIES), "results": SPECIES})
+
+    provider = ColumnarStoreProvider(fetch_all)
+    with track_upstream_failures() as failures:
+        assert provider.get() is None
+    assert len(failures) == 1
+    listings["people"]["count"] = len(PEOPLE)
+    assert len(provider.get().tallest(10)) == 4
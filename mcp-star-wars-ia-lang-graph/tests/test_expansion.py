@@ -0,0 +1,55 @@
+from expansion import Expander, parse_resource_url
+from swapi_client import BatchResult
+
+API = "https://swapi.dev/api"
+
+RECORDS = {
+    "people": {
+        1: {"name": "Luke Skywalker", "homeworld": f"{API}/planets/1/", "films": [f"{API}/films/1/"]},
+        2: {"name": "C-3PO", "homeworld": f"{API}/planets/1/", "films": [f"{API}/films/1/", f"{API}/films/2/"]},
+    },
+    "planets": {1: {"name": "Tatooine"}},
+    "films": {
+        1: {"title": "A New Hope", "characters": [f"{API}/people/1/", f"{API}/people/2/"]},
+        2: {"title": "The Empire Strikes Back", "characters": [f"{API}/people/1/"]},
+    },
+}
+
+class FakeClient:
+    """Cliente SWAPI falso que registra cada chamada de `fetch_many_by_id`."""
+
+    def __init__(self):
+        self.calls = []
+
+    def fetch_many_by_id(self, endpoint, ids, model):
+        self.calls.append((endpoint, sorted(ids)))
+        return [
+            BatchResult(id, RECORDS[endpoint][id]) if id in RECORDS[endpoint] else BatchResult(id, error="não encontrado")
+            for id in ids
+        ]
+
+def test_parse_resource_url():
+    assert parse_resource_url(f"{API}/planets/1/") == ("planets", 1)
+    assert parse_resource_url("Tatooine") is None
+    assert parse_resource_url(None) is None
+
+def test_references_are_deduplicated_in_one_batch_per_endpoint():
+    client = FakeClient()
+    people = Expander(client).expand(RECORDS["people"].values(), ["homeworld", "films"])
+    assert sorted(client.calls) == [("films", [1, 2]), ("planets", [1])]
+    assert [person["homeworld"]["name"] for person in people] == ["Tatooine", "Tatooine"]
+    assert [film["title"] for film in people[1]["films"]] == ["A New Hope", "The Empire Strikes Back"]
+    # Os objetos originais não são alterados
+    assert RECORDS["people"][1]["homeworld"] == f"{API}/planets/1/"
+
+def test_depth_is_limited_and_unresolved_references_stay_as_urls():
+    client = FakeClient()
+    films = Expander(client, max_depth=2).expand([RECORDS["films"][2]], ["characters", "films"], depth=5)
+    # Um lote por nível: personagens no 1º, os filmes deles no 2º, e nada além de `max_depth`
+    assert client.calls == [("people", [1]), ("films", [1])]
+    luke_films = films[0]["characters"][0]["films"]
+    assert luke_films[0]["title"] == "A New Hope"
+    assert luke_films[0]["characters"] == [f"{API}/people/1/", f"{API}/people/2/"]
+
+    missing = Expander(FakeClient()).expand([{"homeworld": f"{API}/planets/99/"}], ["homeworld"])
+    assert missing == [{"homeworld": f"{API}/planets/99/"}]
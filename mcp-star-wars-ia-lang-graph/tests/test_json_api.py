@@ -0,0 +1,92 @@
+from flask import Flask
+
+from json_api import setup_json_api
+from response_cache import ResponseCache
+from tool_result import Column, ToolResult
+
+class FakeTools:
+    """Ferramentas do `MCPTools` sem acesso à SWAPI; `offline` simula uma falha tratada."""
+
+    def __init__(self):
+        self.calls = []
+        self.offline = False
+
+    def search_characters(self, search):
+        self.calls.append(search)
+        if self.offline:
+            result = ToolResult.from_message(f'Nenhum personagem encontrado com o nome "{search}".')
+            # Marcado pelo MCPTools quando houve falhas da SWAPI
+            result.degraded = True
+            return result
+        return ToolResult(items=[{"id": 1, "name": search.title()}], columns=(Column("name", "Nome"),))
+
+    def get_character_by_id(self, id):
+        raise RuntimeError("SWAPI fora do ar")
+
+def _client(query_handler=None):
+    app = Flask(__name__)
+    tools = FakeTools()
+    setup_json_api(app, tools, query_handler=query_handler, response_cache=ResponseCache(ttl=60))
+    return app.test_client(), tools
+
+def test_call_tool_via_get_and_post():
+    client, _ = _client()
+    response = client.get("/api/tools/search_characters?search=luke")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["text"] == "Nome: Luke\n---"
+    assert body["data"]["items"] == [{"id": 1, "name": "Luke"}]
+    assert client.post("/api/tools/search_characters", json={"search": "leia"}).get_json()["data"]["count"] == 1
+
+def test_errors_have_status_and_code():
+    client, _ = _client()
+    assert client.get("/api/tools/list_all_films").status_code == 404
+    response = client.get("/api/tools/get_character_by_id?id=luke")
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
+    assert client.get("/api/tools/get_character_by_id?id=1").status_code == 500
+    assert client.post("/api/tools/search_characters", data="{", content_type="application/json").status_code == 400
+    assert client.get("/api/query?q=luke").status_code == 404
+
+def test_get_is_cached_but_post_and_degraded_results_are_not():
+    client, tools = _client()
+    client.get("/api/tools/search_characters?search=luke")
+    assert client.get("/api/tools/search_characters?search=luke").headers["X-Cache"] == "HIT"
+    client.post("/api/tools/search_characters", json={"search": "luke"})
+    assert tools.calls == ["luke", "luke"]
+
+    tools.offline = True
+    response = client.get("/api/tools/search_characters?search=han")
+    assert response.get_json()["degraded"] is True
+    assert "no-store" in response.headers["Cache-Control"]
+    client.get("/api/tools/search_characters?search=han")
+    assert tools.calls.count("han") == 2
+
+def test_query_handler_and_ambiguous_queries():
+    def answer(query):
+        if query == "skywalker":
+            return {"ambiguous_tools": ["search_characters", "search_planets"], "original_param": query}
+        return {"tool": "search_characters", "param": query, "result": ToolResult.from_message("ok")}
+
+    client, _ = _client(query_handler=answer)
+    body = client.get("/api/query?q=Luke").get_json()
+    assert body["tool"] == "search_characters"
+    assert body["text"] == "ok"
+    response = client.post("/api/query", json={"query": "skywalker"})
+    assert response.status_code == 422
+    assert response.get_json()["ambiguous_tools"] == ["search_characters", "search_planets"]
+    assert client.post("/api/query", json={"query": " "}).status_code == 400
+
+def test_batch_keeps_order_with_per_item_status():
+    client, _ = _client()
+    response = client.post("/api/batch", json={"items": [
+        {"tool": "search_characters", "arguments": {"search": "luke"}},
+        {"tool": "get_character_by_id", "arguments": {"id": 1}},
+        {"query": "luke"},
+        "luke",
+    ]})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body["succeeded"], body["failed"]) == (1, 3)
+    assert [(item["index"], item["code"]) for item in body["results"]] == [(0, 200), (1, 500), (2, 404), (3, 400)]
+    assert client.post("/api/batch", json={"items": []}).status_code == 400
@@ -0,0 +1,56 @@
+import pytest
+
+from model import Films, FilmsRecord, People, PeopleRecord, Planets, PlanetsRecord, parse_model
+
+API = "https://swapi.dev/api"
+
+LUKE = {
+    "name": "Luke Skywalker", "height": "172", "mass": "77", "hair_color": "blond", "skin_color": "fair",
+    "eye_color": "blue", "birth_year": "19BBY", "gender": "male", "homeworld": f"{API}/planets/1/",
+    "films": [f"{API}/films/1/", f"{API}/films/2/"], "species": [], "vehicles": [f"{API}/vehicles/14/"],
+    "starships": [f"{API}/starships/12/"], "created": "2014-12-09T13:50:51.644000Z",
+    "edited": "2014-12-20T21:17:56.891000Z", "url": f"{API}/people/1/",
+}
+TATOOINE = {
+    "name": "Tatooine", "diameter": "10465", "rotation_period": "23", "orbital_period": "304", "gravity": "1 standard",
+    "population": "200000", "climate": "arid", "terrain": "desert", "surface_water": "1",
+    "residents": [f"{API}/people/1/"], "films": [f"{API}/films/1/"], "created": "", "edited": "", "url": f"{API}/planets/1/",
+}
+A_NEW_HOPE = {
+    "title": "A New Hope", "episode_id": 4, "opening_crawl": "It is a period of civil war.", "director": "George Lucas",
+    "producer": "Gary Kurtz", "release_date": "1977-05-25", "species": [], "starships": [], "vehicles": [],
+    "characters": [f"{API}/people/1/"], "planets": [f"{API}/planets/1/"], "created": "", "edited": "",
+    "url": f"{API}/films/1/",
+}
+
+@pytest.mark.parametrize("record, model, data", [
+    (PeopleRecord, People, LUKE),
+    (PlanetsRecord, Planets, TATOOINE),
+    (FilmsRecord, Films, A_NEW_HOPE),
+])
+def test_model_dump_matches_the_pydantic_model(record, model, data):
+    compact = record.model_validate(data)
+    assert compact.model_dump() == model.model_validate(data).model_dump()
+    assert record.from_trusted(data) == compact
+
+def test_references_are_stored_as_ids():
+    luke = PeopleRecord.model_validate(LUKE)
+    assert (luke.id, luke.homeworld, luke.films) == (1, 1, (1, 2))
+    assert luke.url == f"{API}/people/1/"
+    assert PeopleRecord.model_validate({**LUKE, "homeworld": None}).model_dump()["homeworld"] is None
+
+@pytest.mark.parametrize("changes", [
+    {"height": 172},
+    {"homeworld": "Tatooine"},
+    {"films": f"{API}/films/1/"},
+    {"url": None},
+])
+def test_model_validate_rejects_invalid_data(changes):
+    with pytest.raises(ValueError):
+        PeopleRecord.model_validate({**LUKE, **changes})
+
+def test_parse_model_trusted_skips_validation():
+    assert parse_model(PeopleRecord, LUKE, trusted=True) == PeopleRecord.model_validate(LUKE)
+    assert parse_model(People, {**LUKE, "height": 172}, trusted=True).height == 172
+    with pytest.raises(ValueError):
+        parse_model(People, {**LUKE, "height": 172})
@@ -0,0 +1,70 @@
+from relationship_index import RELATION_FIELDS, RelationshipIndex, RelationshipIndexProvider, iter_bits
+
+API = "https://swapi.dev/api"
+
+def _film(title, *people):
+    return {"title": title, "characters": [f"{API}/people/{id}/" for id in people]}
+
+def _index():
+    index = RelationshipIndex()
+    index.update("films", {1: _film("A New Hope", 1, 2, 3), 2: _film("The Empire Strikes Back", 1, 2, 4)})
+    index.update("people", {
+        1: {"name": "Luke Skywalker", "films": [f"{API}/films/1/", f"{API}/films/2/"]},
+        2: {"name": "Leia Organa"},
+        3: {"name": "Obi-Wan Kenobi"},
+        4: {"name": "Yoda"},
+    })
+    return index
+
+def test_relations_work_in_both_directions():
+    index = _index()
+    assert list(iter_bits(index.related("films", 1, "people"))) == [1, 2, 3]
+    assert list(iter_bits(index.related("people", 4, "films"))) == [2]
+
+def test_intersection_union_and_co_occurrences():
+    index = _index()
+    assert list(iter_bits(index.related_to_all("films", [1, 2], "people"))) == [1, 2]
+    assert list(iter_bits(index.related_to_any("films", 0b110, "people"))) == [1, 2, 3, 4]
+    assert index.co_occurrences("people", 1, "films") == [(2, 2), (3, 1), (4, 1)]
+
+def test_edge_is_kept_while_one_side_still_declares_it():
+    index = _index()
+    # Luke deixa de listar os filmes, mas os filmes ainda o listam
+    assert index.update("people", {1: {"name": "Luke Skywalker"}, 2: {}, 3: {}, 4: {}}) == 1
+    assert list(iter_bits(index.related("people", 1, "films"))) == [1, 2]
+    index.update("films", {1: _film("A New Hope", 2, 3), 2: _film("The Empire Strikes Back", 2, 4)})
+    assert index.related("people", 1, "films") == 0
+
+def test_find_by_id_or_partial_name():
+    index = _index()
+    assert index.find("people", "4") == 4
+    assert index.find("people", "skywalker") == 1
+    assert index.find("films", "empire") == 2
+    assert index.find("people", "Vader") is None
+
+def _listing(records):
+    return {"count": len(records), "next": None, "previous": None, "results": records}
+
+def test_provider_swaps_in_a_new_index_and_keeps_it_on_incomplete_fetches():
+    resources = {endpoint: [] for endpoint in RELATION_FIELDS}
+    resources["films"] = [dict(_film("A New Hope", 1, 2), url=f"{API}/films/1/")]
+    listings = {}
+
+    def fetch_all(endpoint):
+        return listings.get(endpoint, _listing(resources[endpoint]))
+
+    provider = RelationshipIndexProvider(fetch_all, max_age=0)
+    first = provider.get()
+    assert list(iter_bits(first.related("films", 1, "people"))) == [1, 2]
+
+    # Um índice já publicado nunca é alterado: a atualização troca o objeto
+    resources["films"] = [dict(_film("A New Hope", 1, 2, 3), url=f"{API}/films/1/")]
+    second = provider.get()
+    assert second is not first
+    assert list(iter_bits(first.related("films", 1, "people"))) == [1, 2]
+    assert list(iter_bits(second.related("films", 1, "people"))) == [1, 2, 3]
+
+    listings["films"] = dict(_listing([]), count=1)
+    assert provider.get() is second
+    listings["people"] = None
+    assert provider.get() is second
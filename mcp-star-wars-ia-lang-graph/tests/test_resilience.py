@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from rate_limiter import AdaptiveRateLimiter
+from resilience import CircuitBreaker, CircuitOpenError, Resilience, RetryPolicy, on_abandon
+
+def _http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+def _resilience(**kwargs) -> Resilience:
+    retry = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+    return Resilience(retry=retry, retry_exceptions=(requests.ConnectionError,), **kwargs)
+
+def _flaky(errors):
+    """Função que levanta os erros em `errors`, um por chamada, e depois responde."""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+    return fn, calls
+
+def test_retries_transient_failures():
+    resilience = _resilience()
+    fn, calls = _flaky([requests.ConnectionError(), _http_error(503)])
+    assert resilience.call("people", fn) == "ok"
+    assert len(calls) == 3
+    assert resilience.get_stats()["retries"] == 2
+
+def test_client_errors_are_not_retried_and_keep_the_circuit_closed():
+    resilience = _resilience(failure_threshold=1)
+    fn, calls = _flaky([_http_error(404)])
+    with pytest.raises(requests.HTTPError):
+        resilience.call("people", fn)
+    assert len(calls) == 1
+    assert resilience.get_stats()["endpoints"]["people"]["circuit"] == CircuitBreaker.CLOSED
+
+def test_circuit_opens_and_short_circuits():
+    resilience = _resilience(failure_threshold=2, reset_timeout=60)
+    fn, calls = _flaky([requests.ConnectionError()] * 10)
+    with pytest.raises(requests.ConnectionError):
+        resilience.call("people", fn)
+    assert len(calls) == 2
+    with pytest.raises(CircuitOpenError):
+        resilience.call("people", fn)
+    assert len(calls) == 2
+    assert resilience.get_stats()["short_circuited"] == 1
+
+def test_half_open_circuit_closes_after_a_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_backoff_honors_retry_after():
+    error = _http_error(429)
+    error.response.headers["Retry-After"] = "3"
+    assert RetryPolicy(base_delay=0, max_retry_after=2).backoff(0, error) == 2
+
+def test_async_retries_transient_failures():
+    resilience = _resilience()
+    fn, calls = _flaky([requests.ConnectionError()])
+
+    async def attempt():
+        return fn()
+
+    assert asyncio.run(resilience.acall("people", attempt)) == "ok"
+    assert len(calls) == 2
+
+def test_hedged_request_wins_over_slow_primary():
+    resilience = _resilience(hedge=True, hedge_min_samples=1)
+    # Latência de referência de 50 ms: a requisição extra sai se a primeira passar disso
+    resilience.call("people", lambda: time.sleep(0.05))
+    delays = [0.5, 0]
+
+    def slow_then_fast():
+        time.sleep(delays.pop(0))
+        return "ok"
+
+    assert resilience.call("people", slow_then_fast) == "ok"
+    stats = resilience.get_stats()
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+def test_losing_hedge_gives_back_its_rate_limiter_slot():
+    resilience = _resilience(hedge=True, hedge_min_samples=1)
+    limiter = AdaptiveRateLimiter(rate=None, initial_limit=4)
+    resilience.call("people", lambda: time.sleep(0.05))
+    primary_done = threading.Event()
+    delays = [0.5, 0]
+
+    def attempt():
+        with limiter.limit() as permit:
+            on_abandon(permit.release)
+            delay = delays.pop(0)
+            time.sleep(delay)
+            permit.status = 200
+        if delay:
+            primary_done.set()
+        return "ok"
+
+    assert resilience.call("people", attempt) == "ok"
+    assert limiter.get_stats()["in_flight"] == 0
+    assert primary_done.wait(2)
+    assert limiter.get_stats()["in_flight"] == 0
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "luke"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(single_flight.do("people/1", fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while single_flight.get_stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["luke"] * 5
+    assert len(calls) == 1
+    assert single_flight.get_stats()["in_flight"] == 0
+
+def test_error_is_not_cached():
+    single_flight = SingleFlight()
+
+    def fail():
+        raise ValueError("SWAPI fora do ar")
+
+    with pytest.raises(ValueError):
+        single_flight.do("people/1", fail)
+    assert single_flight.do("people/1", lambda: "luke") == "luke"
+    assert single_flight.get_stats()["errors"] == 1
+
+def test_async_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "luke"
+
+    async def main():
+        return await asyncio.gather(*(single_flight.do_async("people/1", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["luke"] * 5
+    assert len(calls) == 1
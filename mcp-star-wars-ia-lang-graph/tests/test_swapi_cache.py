@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from swapi_cache import ModelCache, SwapiResponseCache
+
+def _cache(tmp_path, **kwargs):
+    return SwapiResponseCache(path=str(tmp_path / "swapi_cache.sqlite3"), **kwargs)
+
+def test_make_key_sorts_params():
+    url = "https://swapi.dev/api/people/"
+    assert SwapiResponseCache.make_key(url, {"search": "luke", "page": 2}) == f"{url}?page=2&search=luke"
+    assert SwapiResponseCache.make_key(url) == url
+
+def test_stale_entry_is_kept_for_revalidation(tmp_path):
+    cache = _cache(tmp_path, ttls={"people": 0})
+    try:
+        cache.set("people/1", "people", b'{"name": "Luke"}', etag='"abc"')
+        entry = cache.get("people/1")
+        assert not entry.fresh
+        assert entry.conditional_headers() == {"If-None-Match": '"abc"'}
+        cache.ttls["people"] = 60
+        assert cache.refresh("people/1").fresh
+        assert cache.get_stats()["revalidated"] == 1
+    finally:
+        cache.close()
+
+def test_evicts_least_recently_used_over_max_bytes(tmp_path):
+    cache = _cache(tmp_path, max_bytes=20)
+    try:
+        cache.set("a", "people", b"x" * 10)
+        cache.set("b", "people", b"x" * 10)
+        cache.get("a")
+        cache.set("c", "people", b"x" * 10)
+        assert cache.get("b") is None
+        assert cache.get("a").body == b"x" * 10
+        assert cache.get_stats()["evictions"] == 1
+    finally:
+        cache.close()
+
+def test_size_limit_uses_a_running_total(tmp_path):
+    cache = _cache(tmp_path, max_bytes=25)
+    sums = []
+    cache._conn.set_trace_callback(lambda sql: sums.append(sql) if "SUM(size)" in sql else None)
+    try:
+        for _ in range(5):
+            cache.set("a", "people", b"x" * 10)
+        cache.set("b", "people", b"x" * 10)
+        assert len(sums) == 1
+        assert cache.get_stats()["evictions"] == 0
+        cache.set("c", "people", b"x" * 10)
+        assert cache.get_stats()["evictions"] == 1
+        cache.invalidate()
+        cache.set("d", "people", b"x" * 10)
+        assert cache.get("d") is not None
+    finally:
+        cache.close()
+
+def test_model_cache_evicts_least_recently_used():
+    cache = ModelCache(max_entries=2, max_bytes=1000)
+    cache.set(("people", 1), "luke", size=10)
+    cache.set(("people", 2), "leia", size=10)
+    cache.get(("people", 1))
+    cache.set(("people", 3), "han", size=10)
+    assert cache.get(("people", 2)) is None
+    assert cache.get(("people", 1)) == "luke"
+    assert cache.get_stats()["evictions"] == 1
+
+def test_model_cache_respects_max_bytes_and_ttl():
+    cache = ModelCache(max_bytes=15, ttl=0)
+    cache.set(("people", 1), "luke", size=20)
+    assert cache.get_stats()["entries"] == 0
+    cache.set(("people", 2), "leia", size=10)
+    assert cache.get(("people", 2)) is None
+    assert cache.get_stats()["expirations"] == 1
+
+def test_model_cache_invalidate_by_endpoint_and_id():
+    cache = ModelCache()
+    cache.set(("people", 1, "Character"), "luke", size=1)
+    cache.set(("people", 2, "Character"), "leia", size=1)
+    cache.set(("planets", 1, "Planet"), "tatooine", size=1)
+    cache.invalidate("people", 1)
+    assert cache.get(("people", 1, "Character")) is None
+    assert cache.get(("people", 2, "Character")) == "leia"
+    cache.invalidate("people")
+    assert cache.get_stats()["entries"] == 1
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork disponível apenas no POSIX")
+def test_child_process_opens_its_own_connection(tmp_path):
+    cache = _cache(tmp_path)
+    try:
+        cache.set("people/1", "people", b'{"name": "Luke"}')
+        parent_conn = cache._conn
+        pid = os.fork()
+        if pid == 0:
+            ok = False
+            try:
+                ok = cache._conn is not parent_conn and cache.get("people/1") is not None
+                cache.set("people/2", "people", b'{"name": "Leia"}')
+            finally:
+                os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert cache.get("people/2").body == b'{"name": "Leia"}'
+    finally:
+        cache.close()
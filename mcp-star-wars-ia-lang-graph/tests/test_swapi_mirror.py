@@ -0,0 +1,104 @@
+from model import People, SearchResponse
+from swapi_mirror import MirrorSwapiClient, SwapiSnapshot, refresh_snapshot
+
+API = "https://swapi.dev/api"
+
+def _person(id, name, edited="2014-12-20"):
+    return {
+        "name": name, "height": "172", "mass": "77", "hair_color": "", "skin_color": "", "eye_color": "",
+        "birth_year": "", "gender": "", "homeworld": f"{API}/planets/1/", "films": [], "species": [],
+        "vehicles": [], "starships": [], "created": "", "edited": edited, "url": f"{API}/people/{id}/",
+    }
+
+PEOPLE = [_person(id, f"Personagem {id}") for id in range(1, 13)] + [_person(13, "Luke Skywalker")]
+
+class FakeClient:
+    """
+    Cliente SWAPI falso para o `refresh_snapshot`: responde `fetch_all_pages` com `resources`;
+    `counts` substitui o `count` informado, para simular uma coleta incompleta.
+    """
+
+    def __init__(self, resources):
+        self.resources = resources
+        self.counts = {}
+        self.calls = []
+
+    def fetch_all_pages(self, endpoint):
+        self.calls.append(endpoint)
+        records = self.resources.get(endpoint)
+        if records is None:
+            return None
+        count = self.counts.get(endpoint, len(records))
+        return {"count": count, "next": None, "previous": None, "results": records}
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "snapshot.json.gz")
+    snapshot = SwapiSnapshot(created_at="2024-01-01", version=3)
+    snapshot.update_resource("people", list(reversed(PEOPLE)))
+    snapshot.save(path)
+
+    loaded = SwapiSnapshot.load(path)
+    assert loaded.version == 3
+    assert loaded.get("people", 13)["name"] == "Luke Skywalker"
+    assert [record["name"] for record in loaded.records("people")][:2] == ["Personagem 1", "Personagem 2"]
+
+def test_update_resource_counts_changes():
+    snapshot = SwapiSnapshot()
+    snapshot.update_resource("people", PEOPLE[:2])
+    changes = snapshot.update_resource("people", [_person(1, "Personagem 1", edited="2024-01-01"), PEOPLE[2]])
+    assert changes == {"added": 1, "removed": 1, "updated": 1}
+
+def test_mirror_client_search_and_pages():
+    snapshot = SwapiSnapshot()
+    snapshot.update_resource("people", PEOPLE)
+    client = MirrorSwapiClient(snapshot)
+
+    first = client.fetch_swapi("people", model=SearchResponse)
+    assert (first.count, len(first.results)) == (13, 10)
+    assert first.next == f"{API}/people/?page=2"
+    second = client.fetch_swapi("people", params={"page": 2})
+    assert [record["name"] for record in second["results"]] == ["Personagem 11", "Personagem 12", "Luke Skywalker"]
+    assert second["next"] is None
+    assert client.fetch_swapi("people", params={"page": 3}) is None
+    assert client.fetch_swapi("people", params={"page": "dois"}) is None
+    assert client.fetch_swapi("people", params={"search": "SKY"})["count"] == 1
+    assert client.fetch_swapi("planets") is None
+
+    assert client.fetch_swapi_by_id("people", "13", People).name == "Luke Skywalker"
+    assert client.fetch_swapi_by_id("people", 99, People) is None
+    assert client.fetch_all_pages("people")["count"] == 13
+
+def test_refresh_snapshot_is_incremental(tmp_path):
+    path = str(tmp_path / "snapshot.json.gz")
+    client = FakeClient({"people": PEOPLE[:2], "planets": []})
+    snapshot = refresh_snapshot(client, path=path, resources=("people", "planets"))
+    assert snapshot.version == 1
+    assert client.calls == ["people", "planets"]
+
+    # Recursos recentes não são coletados de novo, e sem mudanças a versão é mantida
+    client.resources["people"] = PEOPLE[:3]
+    assert refresh_snapshot(client, path=path, max_age=3600, resources=("people", "planets")).version == 1
+    assert client.calls == ["people", "planets"]
+
+    snapshot = refresh_snapshot(client, path=path, resources=("people", "planets"))
+    assert snapshot.version == 2
+    assert len(snapshot.records("people")) == 3
+
+def test_refresh_snapshot_keeps_records_when_a_fetch_fails(tmp_path):
+    path = str(tmp_path / "snapshot.json.gz")
+    client = FakeClient({"people": PEOPLE[:2]})
+    refresh_snapshot(client, path=path, resources=("people",))
+    client.resources["people"] = None
+    snapshot = refresh_snapshot(client, path=path, resources=("people",))
+    assert snapshot.version == 1
+    assert len(snapshot.records("people")) == 2
+
+def test_refresh_snapshot_skips_an_incomplete_fetch(tmp_path):
+    path = str(tmp_path / "snapshot.json.gz")
+    client = FakeClient({"people": PEOPLE})
+    refresh_snapshot(client, path=path, resources=("people",))
+    client.resources["people"] = PEOPLE[:10]
+    client.counts["people"] = len(PEOPLE)
+    snapshot = refresh_snapshot(client, path=path, resources=("people",))
+    assert snapshot.version == 1
+    assert len(snapshot.records("people")) == 13
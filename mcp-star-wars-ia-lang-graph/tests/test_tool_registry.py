@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from tool_registry import ToolArgumentsError, ToolRegistry, registry
+
+class FakeTools:
+    def search_characters(self, search: str):
+        """Busca personagens pelo nome.
+
+        Args:
+            search: Nome ou parte do nome.
+        """
+
+    def tallest_characters(self, limit: int = 10):
+        """Lista os personagens mais altos."""
+
+    def _helper(self):
+        """Métodos privados não são ferramentas."""
+
+    def undocumented(self):
+        pass
+
+def test_schemas_are_typed_from_the_signature():
+    tools = ToolRegistry(FakeTools)
+    assert tools.names() == ["search_characters", "tallest_characters"]
+    assert tools.get("search_characters").description == "Busca personagens pelo nome."
+    assert tools.json_schemas()[1]["inputSchema"] == {
+        "type": "object", "properties": {"limit": {"type": "integer", "default": 10}}, "required": [],
+    }
+    assert tools.get("search_characters").json_schema()["properties"]["search"] == {
+        "type": "string", "description": "Nome ou parte do nome.",
+    }
+
+def test_prompt_fragment_is_cached():
+    tools = ToolRegistry(FakeTools)
+    fragment = tools.prompt_fragment()
+    assert tools.prompt_fragment() is fragment
+    assert json.loads(fragment)[0] == {
+        "name": "search_characters", "description": "Busca personagens pelo nome.", "requires_param": True,
+    }
+    assert json.loads(tools.prompt_fragment(detailed=True))[1]["parameters"] == [
+        {"name": "limit", "type": "integer", "required": False},
+    ]
+
+def test_reload_bumps_the_version_only_on_changes():
+    class Tools(FakeTools):
+        pass
+
+    tools = ToolRegistry(Tools)
+    fragment = tools.prompt_fragment()
+    assert tools.reload() is False
+    assert tools.get_stats()["version"] == 1
+
+    def search_planets(self, search: str):
+        """Busca planetas pelo nome."""
+    Tools.search_planets = search_planets
+    assert tools.reload() is True
+    assert tools.get_stats() == {"version": 2, "fingerprint": tools.fingerprint, "tools": 3}
+    assert "search_planets" in tools
+    assert tools.prompt_fragment() is not fragment
+
+def test_validate_converts_and_rejects_arguments():
+    tools = ToolRegistry(FakeTools)
+    assert tools.get("tallest_characters").validate({"limit": "5"}) == {"limit": 5}
+    assert tools.get("tallest_characters").validate({}) == {}
+    assert tools.get("search_characters").validate({"search": ["luke", "leia"]}) == {"search": "luke,leia"}
+    with pytest.raises(ToolArgumentsError) as error:
+        tools.get("tallest_characters").validate({"limit": "dez", "page": 2})
+    assert error.value.details() == {"missing": [], "unknown": ["page"], "invalid": ["limit"]}
+    with pytest.raises(ToolArgumentsError) as error:
+        tools.get("search_characters").validate({"search": None})
+    assert error.value.missing == ["search"]
+
+def test_default_registry_covers_the_tools_class():
+    assert {"search_characters", "get_character_by_id", "list_all_films"} <= set(registry.names())
@@ -0,0 +1,36 @@
+from swapi_mirror import MirrorSwapiClient, SwapiSnapshot
+from tools import Tools
+
+def _person(id, name):
+    return {
+        "name": name, "height": "172", "mass": "77", "hair_color": "blond", "skin_color": "fair",
+        "eye_color": "blue", "birth_year": "19BBY", "gender": "male", "homeworld": "https://swapi.dev/api/planets/1/",
+        "films": [], "species": [], "vehicles": [], "starships": [], "created": "", "edited": "",
+        "url": f"https://swapi.dev/api/people/{id}/",
+    }
+
+def _tools():
+    snapshot = SwapiSnapshot()
+    snapshot.update_resource("people", [_person(1, "Luke Skywalker"), _person(4, "Darth Vader")])
+    return Tools(MirrorSwapiClient(snapshot))
+
+def test_get_characters_by_ids_keeps_order_and_repeats():
+    result = _tools().get_characters_by_ids("4, 1;4")
+    assert [item["name"] for item in result.items] == ["Darth Vader", "Luke Skywalker", "Darth Vader"]
+
+def test_get_characters_by_ids_reports_invalid_and_missing_ids():
+    result = _tools().get_characters_by_ids(["1", "luke", "-2", 99])
+    assert result.items[0]["name"] == "Luke Skywalker"
+    assert result.items[1:] == [
+        {"id": "luke", "error": 'ID inválido: "luke".'},
+        {"id": "-2", "error": 'ID inválido: "-2".'},
+        {"id": 99, "error": "Personagem com ID 99 não encontrado."},
+    ]
+    assert str(result).endswith('---\nID inválido: "luke".\n---\nID inválido: "-2".\n---\nPersonagem com ID 99 não encontrado.\n---')
+    assert str(_tools().get_characters_by_ids(" , ")) == "Nenhum ID de personagem informado."
+
+def test_tallest_characters_validates_the_limit():
+    tools = _tools()
+    assert [item["name"] for item in tools.tallest_characters("1").items] == ["Luke Skywalker"]
+    for limit in (0, "-1", "dez"):
+        assert str(tools.tallest_characters(limit)).startswith(f'Limite inválido: "{limit}".')
@@ -0,0 +1,106 @@
+"""
+Servidor de produção (WSGI) das aplicações Flask, no lugar do servidor de desenvolvimento.
+
+- gunicorn (Linux/macOS): vários processos (`--workers`), cada um com várias threads
+  (`--threads`, worker `gthread`). A aplicação é criada uma única vez no processo mestre,
+  antes do fork (`preload_app`): registro de ferramentas, grafo, índice de nomes e
+  snapshot são montados uma vez e compartilhados pelos workers (copy-on-write).
+  O estado em memória não é compartilhado: cada worker tem o seu limitador de taxa,
+  circuit breakers, caches de objetos e de respostas, traces e métricas. Os limites à
+  SWAPI crescem com `--workers`, e `/metrics` mostra só o worker que atendeu.
+- waitress (Windows, ou sem gunicorn instalado): um processo com `--threads` threads.
+
+Encerramento gracioso: com SIGTERM (ou Ctrl+C), o servidor para de aceitar conexões,
+espera as requisições em andamento (até `--graceful-timeout` segundos, no gunicorn) e só
+então encerra; os logs ainda na fila são gravados na saída de cada processo.
+
+Configuração por argumentos ou variáveis de ambiente: `WEB_HOST`, `WEB_PORT`,
+`WEB_WORKERS` (padrão: número de CPUs), `WEB_THREADS` (padrão: 8) e `WEB_SERVER`
+(`gunicorn` ou `waitress`; padrão: gunicorn, se disponível).
+"""
+import argparse
+import importlib.util
+import os
+import signal
+import sys
+from typing import Callable
+
+from logger import setup_logger
+
+log = setup_logger('wsgi_server')
+
+SERVERS = ("gunicorn", "waitress")
+
+def available_server() -> str:
+    """Servidor usado por padrão: gunicorn (fora do Windows) ou waitress."""
+    if sys.platform != "win32" and importlib.util.find_spec("gunicorn"):
+        return "gunicorn"
+    if importlib.util.find_spec("waitress"):
+        return "waitress"
+    raise RuntimeError("Nenhum servidor WSGI instalado: instale gunicorn (Linux/macOS) ou waitress (Windows).")
+
+def serve_gunicorn(app_factory: Callable, host: str, port: int, workers: int, threads: int,
+                   graceful_timeout: int = 30, timeout: int = 60):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{host}:{port}",
+                "workers": workers,
+                "threads": threads,
+                "worker_class": "gthread",
+                # Cria a aplicação no mestre, antes do fork dos workers
+                "preload_app": True,
+                "graceful_timeout": graceful_timeout,
+                "timeout": timeout,
+                "keepalive": 5,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app_factory()
+
+    log.info("Servidor gunicorn em http://%s:%s (%s workers x %s threads)", host, port, workers, threads)
+    Application().run()
+
+def serve_waitress(app_factory: Callable, host: str, port: int, threads: int):
+    from waitress import serve
+
+    def stop(signum, frame):
+        # O waitress encerra com KeyboardInterrupt, esperando as requisições em andamento
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    app = app_factory()
+    log.info("Servidor waitress em http://%s:%s (%s threads)", host, port, threads)
+    serve(app, host=host, port=port, threads=threads)
+
+def run(app_factory: Callable, description: str = "Servidor WSGI de produção", default_port: int = 5000):
+    """
+    Linha de comando comum dos pontos de entrada `wsgi.py`.
+
+    Args:
+        app_factory: Função que cria a aplicação Flask (chamada uma vez, antes do fork)
+        description: Descrição exibida no `--help`
+        default_port: Porta padrão, se `WEB_PORT` não estiver definida
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--host", default=os.getenv("WEB_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("WEB_PORT", default_port)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", os.cpu_count() or 1)),
+                        help="Processos (apenas gunicorn)")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("WEB_THREADS", 8)),
+                        help="Threads por processo")
+    parser.add_argument("--server", choices=SERVERS, default=os.getenv("WEB_SERVER"),
+                        help="Servidor WSGI (padrão: gunicorn, se disponível)")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="Segundos para concluir as requisições em andamento ao encerrar (apenas gunicorn)")
+    args = parser.parse_args()
+
+    server = args.server or available_server()
+    if server == "gunicorn":
+        serve_gunicorn(app_factory, args.host, args.port, args.workers, args.threads, args.graceful_timeout)
+    else:
+        serve_waitress(app_factory, args.host, args.port, args.threads)
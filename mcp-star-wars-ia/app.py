@@ -1,10 +1,15 @@
 
-import traceback
-from flask import Flask, request, render_template
+from flask import Flask, make_response, request, render_template
 from gemini_client import GeminiClient
+from mcp_tools import MCPTools
+from metrics import setup_metrics
 from tools import Tools
-from swapi_client import SwapiClient
-from logger import setup_logger
+from tool_registry import registry
+from swapi_mirror import create_search_index, create_swapi_client
+from logger import SAMPLED, setup_logger
+from tracing import setup_tracing
+from json_api import setup_json_api
+from response_cache import normalize_query, setup_response_cache
 
 class MCPApp:
     def __init__(self):
@@ -12,103 +17,139 @@ class MCPApp:
         self.logger = setup_logger('app')
         
         # Instancia as dependências
-        swapi_client = SwapiClient()
-        self.tools = Tools(swapi_client)
+        swapi_client = create_swapi_client()
+        # MCPTools registra logs e métricas (contagem, erros e latência) de cada ferramenta
+        self.tools = MCPTools(Tools(swapi_client, search_index=create_search_index(swapi_client)))
+        setup_metrics(self.app, swapi_client)
+        setup_tracing(self.app)
         try:
             self.gemini_client = GeminiClient()
         except ValueError as e:
-            self.logger.error(f"Erro ao inicializar o GeminiClient: {e}")
+            self.logger.error("Erro ao inicializar o GeminiClient: %s", e)
             self.gemini_client = None
+        # Sem o Gemini, a API JSON oferece apenas as ferramentas
+        self.response_cache = setup_response_cache(self.app)
+        setup_json_api(self.app, self.tools, query_handler=self.answer_query if self.gemini_client else None,
+                       response_cache=self.response_cache)
 
         self.setup_routes()
 
     def _get_tool_function(self, tool_name):
-        """Retorna a função da ferramenta pelo nome."""
+        """Retorna a função da ferramenta pelo nome (apenas ferramentas do registro)."""
+        if tool_name not in registry:
+            return None
         return getattr(self.tools, tool_name, None)
 
+    def answer_query(self, query):
+        """
+        Responde uma consulta em linguagem natural: a IA escolhe a ferramenta e o parâmetro.
+
+        Returns:
+            dict: `tool`, `param` e `result` (ToolResult ou texto) quando há uma ferramenta
+            única; `ambiguous_tools` e `original_param` quando a consulta é ambígua; `error`
+            quando nenhuma ferramenta pode ser usada. Usado pelo formulário e pela API JSON.
+        """
+        self.logger.info("Nova consulta para Gemini: '%s'", query)
+        ia_decision = self.gemini_client.get_mcp_from_query(query)
+        self.logger.info("Decisão da IA: %s", ia_decision)
+
+        # Trata ambiguidade
+        if "ambiguous_tools" in ia_decision:
+            return {
+                "ambiguous_tools": ia_decision.get("ambiguous_tools"),
+                "original_param": ia_decision.get("param"),
+            }
+
+        # Trata ferramenta única
+        if ia_decision.get("tool"):
+            tool_name = ia_decision["tool"]
+            tool_param = ia_decision.get("param")
+            tool_func = self._get_tool_function(tool_name)
+            if not tool_func:
+                return {"tool": tool_name, "error": f"IA sugeriu uma ferramenta desconhecida: {tool_name}"}
+            if tool_param:
+                # A função get_character_by_id espera um int
+                if tool_name == 'get_character_by_id':
+                    tool_param = int(tool_param)
+                result = tool_func(tool_param)
+            else:
+                # Para ferramentas sem parâmetro como 'list_all_films'
+                result = tool_func()
+            return {"tool": tool_name, "param": tool_param, "result": result}
+
+        # Trata erro ou nenhuma ferramenta encontrada
+        return {"error": ia_decision.get("error", "Não foi possível determinar a ferramenta a ser usada para a sua busca.")}
+
     def setup_routes(self):
         @self.app.route("/", methods=["GET", "POST"])
         def index():
-            result = None
-            ambiguous_tools = None
-            original_param = None
-            error_message = None
-            query = ""
-
             client_ip = request.remote_addr
-            self.logger.info(f"Requisição {request.method} de {client_ip}: {request.form}")
+            self.logger.info("Requisição %s de %s: %s", request.method, client_ip, request.values, extra=SAMPLED)
 
             if not self.gemini_client:
-                error_message = "Cliente Gemini não inicializado. Verifique a chave da API."
-                return render_template("index.html", error_message=error_message)
-
-            if request.method == "POST":
-                query = request.form.get("query", "")
-                chosen_tool = request.form.get("chosen_tool")
-                param = request.form.get("param")
-
-                try:
-                    # Cenário 2: Usuário escolheu uma ferramenta ambígua
-                    if chosen_tool and param:
-                        self.logger.info(f"Executando ferramenta escolhida: {chosen_tool} com param: {param}")
-                        tool_func = self._get_tool_function(chosen_tool)
-                        if tool_func:
-                            # A função get_character_by_id espera um int
-                            if chosen_tool == 'get_character_by_id':
-                                param = int(param)
-                            result = tool_func(param)
-                        else:
-                            error_message = f"Ferramenta escolhida '{chosen_tool}' não encontrada."
-                        query = f"Busca por '{param}' em '{chosen_tool}'"
-
-                    # Cenário 1: Nova consulta do usuário
-                    elif query:
-                        self.logger.info(f"Nova consulta para Gemini: '{query}'")
-                        ia_decision = self.gemini_client.get_mcp_from_query(query)
-                        self.logger.info(f"Decisão da IA: {ia_decision}")
-
-                        # Trata ambiguidade
-                        if "ambiguous_tools" in ia_decision:
-                            ambiguous_tools = ia_decision.get("ambiguous_tools")
-                            original_param = ia_decision.get("param")
-                        
-                        # Trata ferramenta única
-                        elif ia_decision.get("tool"):
-                            tool_name = ia_decision["tool"]
-                            tool_param = ia_decision.get("param")
-                            tool_func = self._get_tool_function(tool_name)
-                            
-                            if tool_func:
-                                if tool_param:
-                                     # A função get_character_by_id espera um int
-                                    if tool_name == 'get_character_by_id':
-                                        tool_param = int(tool_param)
-                                    result = tool_func(tool_param)
-                                else:
-                                    # Para ferramentas sem parâmetro como 'list_all_films'
-                                    result = tool_func()
-                            else:
-                                error_message = f"IA sugeriu uma ferramenta desconhecida: {tool_name}"
-                        
-                        # Trata erro ou nenhuma ferramenta encontrada
-                        else:
-                            error_message = ia_decision.get("error", "Não foi possível determinar a ferramenta a ser usada para a sua busca.")
-
-                except Exception as e:
-                    self.logger.error(f"Erro inesperado no processamento do POST: {e}\n{traceback.format_exc()}")
-                    error_message = "Ocorreu um erro inesperado ao processar sua solicitação."
-
-            return render_template(
-                "index.html", 
-                result=result,
-                ambiguous_tools=ambiguous_tools,
-                original_param=original_param,
-                error_message=error_message,
-                query=query
-            )
+                return render_template("index.html", error_message="Cliente Gemini não inicializado. Verifique a chave da API.")
+
+            # A consulta vem do formulário (POST) ou da URL (GET /?query=...), que navegadores
+            # e proxies podem guardar
+            query = request.values.get("query", "")
+            chosen_tool = request.values.get("chosen_tool")
+            param = request.values.get("param")
+            if chosen_tool and param:
+                key = ("index", "tool", chosen_tool, param)
+            elif query.strip():
+                key = ("index", "query", normalize_query(query))
+            else:
+                return render_template("index.html", query=query)
+            return self.response_cache.respond(key, lambda: self._render_result(query, chosen_tool, param))
+
+    def _render_result(self, query, chosen_tool, param):
+        """Responde a consulta e renderiza a página; páginas de erro ou incompletas não vão para o cache."""
+        result = None
+        ambiguous_tools = None
+        original_param = None
+        error_message = None
+
+        try:
+            # Cenário 2: Usuário escolheu uma ferramenta ambígua
+            if chosen_tool and param:
+                self.logger.info("Executando ferramenta escolhida: %s com param: %s", chosen_tool, param)
+                tool_func = self._get_tool_function(chosen_tool)
+                if tool_func:
+                    # A função get_character_by_id espera um int
+                    if chosen_tool == 'get_character_by_id':
+                        param = int(param)
+                    result = tool_func(param)
+                else:
+                    error_message = f"Ferramenta escolhida '{chosen_tool}' não encontrada."
+                query = f"Busca por '{param}' em '{chosen_tool}'"
+
+            # Cenário 1: Nova consulta do usuário
+            else:
+                answer = self.answer_query(query)
+                result = answer.get("result")
+                ambiguous_tools = answer.get("ambiguous_tools")
+                original_param = answer.get("original_param")
+                error_message = answer.get("error")
+
+        except Exception as e:
+            self.logger.error("Erro inesperado no processamento da consulta: %s", e, exc_info=True)
+            error_message = "Ocorreu um erro inesperado ao processar sua solicitação."
+
+        page = make_response(render_template(
+            "index.html", 
+            result=result,
+            ambiguous_tools=ambiguous_tools,
+            original_param=original_param,
+            error_message=error_message,
+            query=query
+        ))
+        # Falhas da SWAPI viram "não encontrado": essa resposta também não vai para o cache
+        page.cache_control.no_store = bool(error_message) or getattr(result, "degraded", False)
+        return page
 
     def run(self):
         self.logger.info("Iniciando servidor Flask na porta 5000")
+        self.logger.info("Servidor de desenvolvimento: para produção, use `python wsgi.py`")
         self.app.run(host='0.0.0.0', port=5000, debug=True)
 
 if __name__ == "__main__":
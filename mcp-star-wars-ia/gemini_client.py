@@ -2,8 +2,8 @@ import google.generativeai as genai
 import os
 import json
 from dotenv import load_dotenv
-from tools import Tools
-import inspect
+from tool_registry import registry
+from tracing import tracer
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -16,37 +16,20 @@ class GeminiClient:
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
 
-    def _get_available_tools(self):
-        """
-        Inspeciona a classe Tools para extrair os nomes das ferramentas e suas descrições (docstrings).
-        """
-        tool_methods = inspect.getmembers(Tools, predicate=inspect.isfunction)
-        tools_with_desc = []
-        for name, method in tool_methods:
-            if not name.startswith('_') and method.__doc__:
-                # Verifica se a ferramenta requer um parâmetro
-                sig = inspect.signature(method)
-                takes_param = len(sig.parameters) > 1  # (self é o primeiro)
-                tools_with_desc.append({
-                    "name": name,
-                    "description": method.__doc__.strip(),
-                    "requires_param": takes_param
-                })
-        return tools_with_desc
-
     def get_mcp_from_query(self, query: str):
         """
         Usa o Gemini para analisar a consulta do usuário e determinar a ferramenta e o parâmetro corretos.
         """
-        available_tools = self._get_available_tools()
-        
+        # Lista de ferramentas já serializada (calculada uma vez no registro, não a cada consulta)
+        available_tools = registry.prompt_fragment()
+
         prompt = f"""
         Você é um assistente inteligente que analisa a solicitação de um usuário e a traduz em uma chamada de ferramenta para a API de Star Wars.
 
         A solicitação do usuário é: "{query}"
 
         As ferramentas disponíveis são:
-        {json.dumps(available_tools, indent=2)}
+        {available_tools}
 
         Sua tarefa é analisar a solicitação e determinar qual ferramenta usar.
 
@@ -66,7 +49,8 @@ class GeminiClient:
         """
 
         try:
-            response = self.model.generate_content(prompt)
+            with tracer.span("LLM generate_content", "client", model=self.model.model_name, prompt_chars=len(prompt)):
+                response = self.model.generate_content(prompt)
             # Tenta extrair o JSON do texto de resposta, mesmo que esteja dentro de ```json ... ```
             text_response = response.text.strip()
             json_start = text_response.find('{')
@@ -84,7 +68,7 @@ if __name__ == '__main__':
     # Exemplo de uso para teste
     client = GeminiClient()
     # print("Ferramentas disponíveis:")
-    # print(json.dumps(client._get_available_tools(), indent=2))
+    # print(registry.prompt_fragment())
     
     test_query = "quem é o personagem luke skywalker"
     result = client.get_mcp_from_query(test_query)
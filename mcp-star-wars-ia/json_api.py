@@ -0,0 +1,212 @@
+"""
+API JSON das aplicações Flask, ao lado do formulário HTML.
+
+Rotas (registradas por `setup_json_api`):
+
+- `GET /api/tools`: ferramentas disponíveis, com o schema dos argumentos.
+- `POST /api/tools/<name>`: executa uma ferramenta; o corpo é o objeto de argumentos
+  (ex: `{"search": "luke"}`). Também via GET, com os argumentos na query string
+  (`/api/tools/search_characters?search=luke`).
+- `POST /api/query`: consulta em linguagem natural (`{"query": "..."}`), nas aplicações
+  com IA. Também via GET (`/api/query?q=...`).
+- `POST /api/batch`: vários itens (`{"items": [{"tool": ..., "arguments": {...}},
+  {"query": "..."}]}`) executados em paralelo; os resultados voltam na ordem dos itens,
+  cada um com o seu status.
+
+Cada resultado traz `status` ("ok" ou "error") e `code` (o status HTTP equivalente); em
+caso de sucesso, `text` (o mesmo texto da interface web) e `data` (os itens estruturados
+do `ToolResult`). Com um `ResponseCache`, as respostas a GET de ferramentas e consultas
+são guardadas por ferramenta e argumentos (ou consulta normalizada), com ETag e 304; os
+resultados com `"degraded": true` (falha da SWAPI durante a ferramenta) não são guardados.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from logger import SAMPLED, setup_logger
+from response_cache import ResponseCache, normalize_query
+from tool_registry import ToolArgumentsError, registry
+from tool_result import ToolResult, render
+from tracing import propagate
+
+log = setup_logger('json_api')
+
+class ApiError(Exception):
+    def __init__(self, code: int, message: str, details: dict = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.details = details
+
+def _error(code: int, message: str, details: dict = None) -> dict:
+    error = {"status": "error", "code": code, "error": message}
+    if details:
+        error["details"] = details
+    return error
+
+def result_payload(result) -> dict:
+    """Texto e dados estruturados de um resultado de ferramenta."""
+    payload = {
+        "text": render(result),
+        "data": result.to_dict() if isinstance(result, ToolResult) else None,
+    }
+    if getattr(result, "degraded", False):
+        # Alguma consulta à SWAPI falhou: o resultado pode estar incompleto
+        payload["degraded"] = True
+    return payload
+
+class JsonApi:
+    """
+    Executa ferramentas e consultas para a API JSON, sem renderizar templates.
+
+    Args:
+        mcp_tools: Fachada `MCPTools` com as ferramentas (logs, métricas e traces)
+        query_handler: Função `query -> dict` que responde consultas em linguagem natural;
+            o dicionário pode ter `tool`, `param`, `result` (ToolResult ou texto), `answer`,
+            `ambiguous_tools`, `original_param` e `error`. Sem ela, `/api/query` não é
+            registrada.
+        max_workers: Itens de um lote executados ao mesmo tempo
+        max_batch_items: Tamanho máximo de um lote
+    """
+
+    def __init__(self, mcp_tools, query_handler: Optional[Callable[[str], dict]] = None,
+                 max_workers: int = 8, max_batch_items: int = 500):
+        self.mcp_tools = mcp_tools
+        self.query_handler = query_handler
+        self.max_batch_items = max_batch_items
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api-batch")
+
+    def tool_schemas(self) -> list:
+        return [schema for schema in registry.json_schemas() if hasattr(self.mcp_tools, schema["name"])]
+
+    def validate_tool(self, name: str, arguments) -> dict:
+        """Argumentos da ferramenta convertidos para o tipo de cada parâmetro (ou `ApiError`)."""
+        schema = registry.get(name) if isinstance(name, str) else None
+        if schema is None or not hasattr(self.mcp_tools, name):
+            raise ApiError(404, f"Ferramenta desconhecida: {name}")
+        if not isinstance(arguments, dict):
+            raise ApiError(400, "Os argumentos da ferramenta devem ser um objeto.")
+        try:
+            return schema.validate(arguments)
+        except ToolArgumentsError as e:
+            raise ApiError(400, str(e), e.details())
+
+    def call_tool(self, name: str, arguments) -> dict:
+        arguments = self.validate_tool(name, arguments)
+        try:
+            result = getattr(self.mcp_tools, name)(**arguments)
+        except Exception as e:
+            # O MCPTools já registrou o erro
+            raise ApiError(500, f"Erro ao executar a ferramenta '{name}': {e}")
+        return {"status": "ok", "code": 200, "tool": name, "arguments": arguments, **result_payload(result)}
+
+    def run_query(self, query) -> dict:
+        if self.query_handler is None:
+            raise ApiError(404, "Consultas em linguagem natural não estão disponíveis nesta aplicação.")
+        if not isinstance(query, str) or not query.strip():
+            raise ApiError(400, "Informe a consulta em \"query\".")
+        try:
+            answer = self.query_handler(query.strip())
+        except Exception as e:
+            log.error("Erro ao processar a consulta '%s': %s", query, e, exc_info=True)
+            raise ApiError(500, "Ocorreu um erro inesperado ao processar a consulta.")
+        response = {"query": query}
+        for key in ("tool", "param", "answer", "ambiguous_tools", "original_param", "degraded"):
+            if answer.get(key) is not None:
+                response[key] = answer[key]
+        if answer.get("result") is not None:
+            response.update(result_payload(answer["result"]))
+        error = answer.get("error")
+        if not error and answer.get("ambiguous_tools"):
+            error = "Consulta ambígua: repita com uma das ferramentas em \"ambiguous_tools\"."
+        if error:
+            # A consulta foi entendida, mas não há resposta única
+            return {**_error(422, error), **response}
+        return {"status": "ok", "code": 200, **response}
+
+    def execute(self, item) -> dict:
+        """Executa um item de lote (ferramenta ou consulta); nunca levanta exceção."""
+        try:
+            if not isinstance(item, dict):
+                raise ApiError(400, "Cada item deve ser um objeto com \"tool\" ou \"query\".")
+            if "tool" in item:
+                return self.call_tool(item["tool"], item.get("arguments") or {})
+            if "query" in item:
+                return self.run_query(item["query"])
+            raise ApiError(400, "Cada item deve ter \"tool\" ou \"query\".")
+        except ApiError as e:
+            return _error(e.code, e.message, e.details)
+        except Exception as e:
+            log.error("Erro inesperado ao executar o item %r: %s", item, e, exc_info=True)
+            return _error(500, "Erro interno ao executar o item.")
+
+    def batch(self, items) -> dict:
+        if not isinstance(items, list) or not items:
+            raise ApiError(400, "Informe os itens do lote em \"items\" (lista não vazia).")
+        if len(items) > self.max_batch_items:
+            raise ApiError(413, f"O lote tem {len(items)} itens; o máximo é {self.max_batch_items}.")
+        results = list(self._executor.map(propagate(self.execute), items))
+        for index, result in enumerate(results):
+            result["index"] = index
+        succeeded = sum(1 for result in results if result["status"] == "ok")
+        return {"count": len(results), "succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+def setup_json_api(app, mcp_tools, query_handler: Optional[Callable[[str], dict]] = None,
+                   response_cache: Optional[ResponseCache] = None, **options) -> JsonApi:
+    """Registra as rotas `/api/...` numa aplicação Flask (ver `JsonApi` para as opções)."""
+    from flask import jsonify, make_response, request
+
+    api = JsonApi(mcp_tools, query_handler, **options)
+
+    def respond(payload: dict, code: int = None):
+        response = make_response(jsonify(payload), code or payload.get("code", 200))
+        # Resultados incompletos (falha da SWAPI) não vão para o cache de respostas
+        response.cache_control.no_store = bool(payload.get("degraded"))
+        return response
+
+    def cached(key, build: Callable):
+        return response_cache.respond(key, build) if response_cache else build()
+
+    def json_body(default=None):
+        data = request.get_json(silent=True)
+        if data is None and request.get_data():
+            raise ApiError(400, "Corpo da requisição não é um JSON válido.")
+        return default if data is None else data
+
+    @app.errorhandler(ApiError)
+    def api_error(error: ApiError):
+        return respond(_error(error.code, error.message, error.details))
+
+    @app.route("/api/tools", methods=["GET"])
+    def api_tools():
+        return jsonify({"tools": api.tool_schemas()})
+
+    @app.route("/api/tools/<name>", methods=["GET", "POST"])
+    def api_call_tool(name):
+        log.info("API: ferramenta %s", name, extra=SAMPLED)
+        arguments = api.validate_tool(name, request.args.to_dict() if request.method == "GET" else json_body({}))
+        # Chave com os argumentos já convertidos: {"id": "1"} e {"id": 1} são a mesma chamada
+        key = ("api/tools", name, tuple(sorted(arguments.items())))
+        return cached(key, lambda: respond(api.call_tool(name, arguments)))
+
+    if query_handler is not None:
+        @app.route("/api/query", methods=["GET", "POST"])
+        def api_query():
+            if request.method == "GET":
+                query = request.args.get("q", request.args.get("query"))
+            else:
+                body = json_body({})
+                query = body.get("query") if isinstance(body, dict) else None
+            log.info("API: consulta %r", query, extra=SAMPLED)
+            if not isinstance(query, str) or not query.strip():
+                return respond(api.run_query(query))
+            return cached(("api/query", normalize_query(query)), lambda: respond(api.run_query(query)))
+
+    @app.route("/api/batch", methods=["POST"])
+    def api_batch():
+        body = json_body()
+        items = body.get("items") if isinstance(body, dict) else body
+        log.info("API: lote com %s itens", len(items) if isinstance(items, list) else 0)
+        # O status de cada item vai no próprio item; o lote em si foi processado
+        return respond(api.batch(items), 200)
+
+    return api
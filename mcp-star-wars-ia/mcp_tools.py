@@ -1,14 +1,40 @@
 from enum import Enum
 import time
 from tools import Tools
-from logger import setup_logger
+from resource_registry import generated_tool_names
+from swapi_client import track_upstream_failures
+from tool_result import ToolResult, lazy_render
+from logger import SAMPLED, setup_logger
+from metrics import TOOL_CALLS, TOOL_DURATION, TOOL_ERRORS
+from tracing import tracer
 
 class ToolName(Enum):
     SEARCH_CHARACTERS = "search_characters"
     SEARCH_PLANETS = "search_planets"
     SEARCH_FILMS = "search_films"
     GET_CHARACTER_BY_ID = "get_character_by_id"
+    GET_CHARACTERS_BY_IDS = "get_characters_by_ids"
     LIST_ALL_FILMS = "list_all_films"
+    TALLEST_CHARACTERS = "tallest_characters"
+    AVERAGE_MASS_BY_SPECIES = "average_mass_by_species"
+    PLANETS_WITH_POPULATION_ABOVE = "planets_with_population_above"
+    COMMON_CHARACTERS_IN_FILMS = "common_characters_in_films"
+    CHARACTERS_FROM_PLANETS_IN_FILM = "characters_from_planets_in_film"
+    CO_APPEARANCES = "co_appearances"
+
+class _CallArgs:
+    """Argumentos de uma chamada, formatados só quando o texto for necessário (log ou trace)."""
+    __slots__ = ("args", "kwargs")
+
+    def __init__(self, args, kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        params_str = ', '.join([str(arg) for arg in self.args])
+        if self.kwargs:
+            params_str += ', ' + ', '.join([f'{k}={v}' for k, v in self.kwargs.items()])
+        return params_str
 
 class MCPTools:
     def __init__(self, tools=None):
@@ -16,34 +42,47 @@ class MCPTools:
         self.logger = setup_logger('mcp_tools')
 
     def _execute_tool(self, tool_name: str, func, *args, **kwargs):
-        """Método auxiliar para executar ferramentas com logging."""
-        start_time = time.time()
-        
-        # Log quando a ferramenta MCP é chamada
-        params_str = ', '.join([str(arg) for arg in args])
-        if kwargs:
-            params_str += ', ' + ', '.join([f'{k}={v}' for k, v in kwargs.items()])
-        self.logger.info(f"Ferramenta MCP chamada: {tool_name}({params_str})")
-        
-        try:
-            result = func(*args, **kwargs)
-            elapsed_time = time.time() - start_time
-            
-            # Log de sucesso
-            self.logger.info(
-                f"Ferramenta MCP executada com sucesso: {tool_name}, "
-                f"Tempo: {elapsed_time:.2f}s"
-            )
-            self.logger.debug(f"Resultado da ferramenta {tool_name}: {result}")
-            
-            return result
-        except Exception as e:
-            elapsed_time = time.time() - start_time
-            self.logger.error(
-                f"Erro ao executar ferramenta MCP {tool_name}: {e}, "
-                f"Tempo decorrido: {elapsed_time:.2f}s"
-            )
-            raise
+        """Método auxiliar para executar ferramentas com logging, métricas e um span no trace."""
+        with tracer.span(f"tool {tool_name}", tool=tool_name, args=_CallArgs(args, kwargs)):
+            start_time = time.perf_counter()
+            TOOL_CALLS.labels(tool_name).inc()
+
+            # Log quando a ferramenta MCP é chamada
+            self.logger.info("Ferramenta MCP chamada: %s(%s)", tool_name, _CallArgs(args, kwargs), extra=SAMPLED)
+
+            try:
+                with track_upstream_failures() as failures:
+                    result = func(*args, **kwargs)
+                elapsed_time = time.perf_counter() - start_time
+                TOOL_DURATION.labels(tool_name).observe(elapsed_time)
+
+                if failures and isinstance(result, ToolResult):
+                    # A ferramenta respondeu, mas com dados faltando por falha da SWAPI
+                    result.degraded = True
+                    self.logger.warning(
+                        "Ferramenta MCP %s respondeu com falhas da SWAPI: %s",
+                        tool_name, "; ".join(failures)
+                    )
+
+                # Log de sucesso
+                self.logger.info(
+                    "Ferramenta MCP executada com sucesso: %s, Tempo: %.2fs",
+                    tool_name, elapsed_time, extra=SAMPLED
+                )
+                # Forma compacta, renderizada só se a linha DEBUG for de fato gravada (na thread de escrita)
+                self.logger.debug("Resultado da ferramenta %s: %s", tool_name, lazy_render(result, "llm"))
+
+                return result
+            except Exception as e:
+                elapsed_time = time.perf_counter() - start_time
+                TOOL_DURATION.labels(tool_name).observe(elapsed_time)
+                TOOL_ERRORS.labels(tool_name).inc()
+                self.logger.error(
+                    "Erro ao executar ferramenta MCP %s: %s, "
+                    "Tempo decorrido: %.2fs",
+                    tool_name, e, elapsed_time
+                )
+                raise
 
     def search_characters(self, search: str):
         return self._execute_tool(ToolName.SEARCH_CHARACTERS.value, self.tools.search_characters, search)
@@ -57,5 +96,37 @@ class MCPTools:
     def get_character_by_id(self, id: int):
         return self._execute_tool(ToolName.GET_CHARACTER_BY_ID.value, self.tools.get_character_by_id, id)
 
+    def get_characters_by_ids(self, ids: str):
+        return self._execute_tool(ToolName.GET_CHARACTERS_BY_IDS.value, self.tools.get_characters_by_ids, ids)
+
     def list_all_films(self):
         return self._execute_tool(ToolName.LIST_ALL_FILMS.value, self.tools.list_all_films)
+
+    def tallest_characters(self, limit: int = 10):
+        return self._execute_tool(ToolName.TALLEST_CHARACTERS.value, self.tools.tallest_characters, limit)
+
+    def average_mass_by_species(self):
+        return self._execute_tool(ToolName.AVERAGE_MASS_BY_SPECIES.value, self.tools.average_mass_by_species)
+
+    def planets_with_population_above(self, min_population: float):
+        return self._execute_tool(ToolName.PLANETS_WITH_POPULATION_ABOVE.value, self.tools.planets_with_population_above, min_population)
+
+    def common_characters_in_films(self, films: str):
+        return self._execute_tool(ToolName.COMMON_CHARACTERS_IN_FILMS.value, self.tools.common_characters_in_films, films)
+
+    def characters_from_planets_in_film(self, film: str):
+        return self._execute_tool(ToolName.CHARACTERS_FROM_PLANETS_IN_FILM.value, self.tools.characters_from_planets_in_film, film)
+
+    def co_appearances(self, character: str):
+        return self._execute_tool(ToolName.CO_APPEARANCES.value, self.tools.co_appearances, character)
+
+def _mcp_tool(name: str):
+    def method(self, *args, **kwargs):
+        return self._execute_tool(name, getattr(self.tools, name), *args, **kwargs)
+    method.__name__ = method.__qualname__ = name
+    return method
+
+# Ferramentas geradas a partir do registro de recursos que não têm um método próprio acima
+for _name in generated_tool_names():
+    if not hasattr(MCPTools, _name):
+        setattr(MCPTools, _name, _mcp_tool(_name))
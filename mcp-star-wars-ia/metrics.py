@@ -0,0 +1,265 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Sequence, Tuple
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # Contagem por bucket (não cumulativa); a última posição é o bucket +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        """Mede a duração do bloco com `time.perf_counter` (monotônico e de alta resolução)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Série dos valores de label informados (texto), criada no primeiro uso."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} espera os labels {self.labelnames}, recebeu {values}")
+            with self._lock:
+                child = self._children.setdefault(tuple(str(value) for value in values), self._new_child())
+        return child
+
+    def _series(self):
+        with self._lock:
+            items = list(self._children.items())
+        for values, child in items:
+            yield dict(zip(self.labelnames, values)), child
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def samples(self):
+        for labels, child in self._series():
+            yield self.name, labels, child.value
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def samples(self):
+        for labels, child in self._series():
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(float(bound))}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+class MetricsRegistry:
+    """
+    Métricas da aplicação (contadores e histogramas) no formato texto do Prometheus.
+
+    No caminho quente, registrar uma medição custa uma consulta a um dicionário (a série
+    do label), um `bisect` nos limites dos buckets e um incremento sob um lock próprio da
+    série. Estatísticas que os componentes já mantêm (caches e limitador de taxa) são lidas
+    só na coleta, por funções registradas com `register_collector`.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[tuple]]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[tuple]]):
+        """
+        Registra (ou substitui) uma função chamada a cada coleta.
+
+        A função retorna tuplas `(nome, tipo, ajuda, labels, valor)`; `tipo` é "counter" ou "gauge".
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render(self) -> str:
+        """Todas as métricas no formato de exposição texto do Prometheus (versão 0.0.4)."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        families: Dict[str, list] = {}
+        for collector in collectors:
+            for name, type, help, labels, value in collector():
+                if value is None:
+                    continue
+                family = families.setdefault(name, [type, help])
+                family.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, (type, help, *samples) in families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+TOOL_CALLS = metrics.counter("swapi_tool_calls_total", "Chamadas das ferramentas MCP", ("tool",))
+TOOL_ERRORS = metrics.counter("swapi_tool_errors_total", "Chamadas das ferramentas MCP que terminaram em erro", ("tool",))
+TOOL_DURATION = metrics.histogram("swapi_tool_duration_seconds", "Duração das chamadas das ferramentas MCP", ("tool",))
+UPSTREAM_REQUESTS = metrics.counter("swapi_upstream_requests_total", "Requisições HTTP enviadas à SWAPI", ("endpoint", "status"))
+UPSTREAM_DURATION = metrics.histogram("swapi_upstream_request_duration_seconds", "Latência das requisições HTTP à SWAPI", ("endpoint",))
+UPSTREAM_BYTES = metrics.counter("swapi_upstream_response_bytes_total", "Bytes recebidos da SWAPI", ("endpoint",))
+HTTP_REQUESTS = metrics.counter("http_requests_total", "Requisições HTTP recebidas pela aplicação", ("method", "endpoint", "status"))
+HTTP_DURATION = metrics.histogram("http_request_duration_seconds", "Duração das requisições HTTP recebidas pela aplicação", ("method", "endpoint"))
+
+def swapi_client_collector(swapi_client) -> Callable[[], Iterable[tuple]]:
+    """Coletor das estatísticas do cliente SWAPI: caches e limitador de taxa."""
+    def collect():
+        cache = getattr(swapi_client, "cache", None)
+        if cache:
+            stats = cache.get_stats()
+            for result in ("hits", "misses", "stale", "revalidated"):
+                yield "swapi_cache_lookups_total", "counter", "Consultas aos caches da SWAPI por resultado", {"cache": "disk", "result": result}, stats.get(result)
+            yield "swapi_cache_bytes_read_total", "counter", "Bytes lidos dos caches", {"cache": "disk"}, stats.get("bytes_read")
+            yield "swapi_cache_bytes_written_total", "counter", "Bytes gravados nos caches", {"cache": "disk"}, stats.get("bytes_written")
+            yield "swapi_cache_evictions_total", "counter", "Entradas removidas dos caches por falta de espaço", {"cache": "disk"}, stats.get("evictions")
+            yield "swapi_cache_entries", "gauge", "Entradas nos caches", {"cache": "disk"}, stats.get("entries")
+            yield "swapi_cache_bytes", "gauge", "Tamanho dos caches em bytes", {"cache": "disk"}, stats.get("total_bytes")
+        model_cache = getattr(swapi_client, "model_cache", None)
+        if model_cache:
+            stats = model_cache.get_stats()
+            for result in ("hits", "misses"):
+                yield "swapi_cache_lookups_total", "counter", "Consultas aos caches da SWAPI por resultado", {"cache": "model", "result": result}, stats.get(result)
+            yield "swapi_cache_evictions_total", "counter", "Entradas removidas dos caches por falta de espaço", {"cache": "model"}, stats.get("evictions")
+            yield "swapi_cache_entries", "gauge", "Entradas nos caches", {"cache": "model"}, stats.get("entries")
+            yield "swapi_cache_bytes", "gauge", "Tamanho dos caches em bytes", {"cache": "model"}, stats.get("bytes")
+        rate_limiter = getattr(swapi_client, "rate_limiter", None)
+        if rate_limiter:
+            stats = rate_limiter.get_stats()
+            yield "swapi_rate_limiter_limit", "gauge", "Limite atual de requisições simultâneas à SWAPI", {}, stats["limit"]
+            yield "swapi_rate_limiter_in_flight", "gauge", "Requisições à SWAPI em andamento", {}, stats["in_flight"]
+            yield "swapi_rate_limiter_queue_depth", "gauge", "Requisições aguardando vaga no limitador", {}, stats["queue_depth"]
+            yield "swapi_rate_limiter_throttled_total", "counter", "Respostas 429/5xx ou falhas de conexão da SWAPI", {}, stats["throttled"]
+            yield "swapi_rate_limiter_wait_seconds_total", "counter", "Tempo total de espera no limitador", {}, stats["total_wait"]
+    return collect
+
+def setup_metrics(app, swapi_client=None):
+    """
+    Adiciona a rota `/metrics` a uma aplicação Flask e mede a duração de cada requisição.
+
+    Com `swapi_client`, inclui também as estatísticas de caches e do limitador de taxa dele.
+    """
+    from flask import Response, g, request
+
+    if swapi_client is not None:
+        metrics.register_collector("swapi_client", swapi_client_collector(swapi_client))
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = getattr(g, "_metrics_start", None)
+        if start is not None:
+            # A rota (ex: "/api/tools/<name>") em vez da URL, para não criar uma série por parâmetro
+            endpoint = request.url_rule.rule if request.url_rule else "desconhecido"
+            HTTP_DURATION.labels(request.method, endpoint).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(request.method, endpoint, str(response.status_code)).inc()
+        return response
+
+    @app.route("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+    return app
@@ -0,0 +1,275 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+from logger import setup_logger
+
+log = setup_logger('rate_limiter')
+
+class TokenBucket:
+    """
+    Token bucket: até `burst` requisições imediatas e `rate` requisições/segundo em média.
+
+    Cada chamador reserva seu token na ordem de chegada (o saldo pode ficar negativo) e
+    espera o tempo necessário para que ele seja reposto, então a fila é atendida em ordem.
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserva um token e retorna quantos segundos o chamador deve esperar por ele."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._last
+            return min(self.burst, self._tokens + elapsed * self.rate)
+
+class _Permit:
+    """Vaga de concorrência obtida por uma requisição; `status` é preenchido pelo chamador."""
+    __slots__ = ("status", "released", "_limiter")
+
+    def __init__(self, limiter: "AdaptiveRateLimiter"):
+        self.status = None
+        self.released = False
+        self._limiter = limiter
+
+    def release(self):
+        """
+        Devolve a vaga antes do fim do bloco, sem registrar amostra de latência (ex: requisição
+        de um hedge que perdeu a corrida e não interessa mais); o fim do bloco não a devolve de novo.
+        """
+        if self._limiter._claim(self):
+            self._limiter._release(None, None, False)
+
+class _ThreadWaiter:
+    __slots__ = ("event", "granted")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+
+    def wake(self):
+        self.event.set()
+
+class _AsyncWaiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+    def wake(self):
+        self.loop.call_soon_threadsafe(self._set)
+
+    def _set(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+class AdaptiveRateLimiter:
+    """
+    Limita a taxa (token bucket) e o número de requisições simultâneas à SWAPI.
+
+    O limite de concorrência é adaptativo (AIMD): cresce aos poucos (+`increase` a cada
+    `limit` respostas) enquanto a latência se mantém estável e o limite está em uso, e é
+    multiplicado por `backoff` quando a SWAPI responde 429/5xx, a conexão falha ou a
+    latência média passa de `latency_tolerance` vezes a menor latência recente (e ao menos
+    `min_latency_increase` segundos acima dela, para ignorar oscilações em latências muito baixas).
+
+    Quem excede os limites não falha: espera numa fila FIFO, atendida por ordem de chegada.
+    Funciona com threads (`limit`) e com corrotinas (`alimit`).
+    """
+
+    def __init__(self, rate: Optional[float] = 10.0, burst: int = 20, initial_limit: int = 4,
+                 min_limit: int = 1, max_limit: int = 32, increase: float = 1.0, backoff: float = 0.5,
+                 latency_tolerance: float = 2.0, min_latency_increase: float = 0.05, latency_window: int = 100):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.min_latency_increase = min_latency_increase
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiters = deque()
+        self._latencies = deque(maxlen=latency_window)
+        self._smoothed_latency = None
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "queued": 0, "throttled": 0, "increases": 0, "decreases": 0,
+                       "total_wait": 0.0, "max_wait": 0.0}
+
+    def _grant_waiters(self):
+        """Libera vagas para os primeiros da fila (chamado com o lock adquirido)."""
+        while self._waiters and self._in_flight < int(self._limit):
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self._in_flight += 1
+            waiter.wake()
+
+    def _try_acquire(self, waiter):
+        """Ocupa uma vaga se houver uma livre e ninguém na fila; senão enfileira `waiter`."""
+        with self._lock:
+            self._stats["requests"] += 1
+            if not self._waiters and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return True
+            self._stats["queued"] += 1
+            self._waiters.append(waiter)
+            return False
+
+    def _record_wait(self, seconds: float):
+        with self._lock:
+            self._stats["total_wait"] += seconds
+            self._stats["max_wait"] = max(self._stats["max_wait"], seconds)
+
+    def _claim(self, permit: _Permit) -> bool:
+        """Marca a vaga de `permit` como devolvida; False se já foi (a devolução acontece uma vez só)."""
+        with self._lock:
+            if permit.released:
+                return False
+            permit.released = True
+            return True
+
+    def _release(self, latency: Optional[float], status, failed: bool):
+        """Devolve a vaga e ajusta o limite; `latency=None` devolve sem registrar amostra."""
+        overloaded = failed or status == 429 or (status is not None and status >= 500)
+        with self._lock:
+            saturated = self._in_flight + len(self._waiters) >= int(self._limit)
+            self._in_flight -= 1
+            if latency is not None and overloaded:
+                self._stats["throttled"] += 1
+                self._decrease(f"status {status}" if status else "falha de conexão")
+            elif latency is not None:
+                self._latencies.append(latency)
+                previous = self._smoothed_latency
+                self._smoothed_latency = latency if previous is None else previous * 0.8 + latency * 0.2
+                baseline = min(self._latencies)
+                # Poucas amostras (ex: conexões sendo abertas) ainda não indicam saturação
+                slow = (self._smoothed_latency > baseline * self.latency_tolerance
+                        and self._smoothed_latency - baseline > self.min_latency_increase)
+                if len(self._latencies) >= 10 and slow:
+                    self._decrease(f"latência {self._smoothed_latency:.2f}s (base {baseline:.2f}s)")
+                elif saturated and self._limit < self.max_limit:
+                    self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+                    self._stats["increases"] += 1
+            self._grant_waiters()
+
+    def _decrease(self, reason: str):
+        """Reduz o limite, no máximo uma vez por latência média (chamado com o lock adquirido)."""
+        now = time.monotonic()
+        if now - self._last_decrease < max(self._smoothed_latency or 0.0, 0.1):
+            return
+        self._last_decrease = now
+        new_limit = max(self.min_limit, self._limit * self.backoff)
+        if int(new_limit) < int(self._limit):
+            log.warning("Reduzindo concorrência da SWAPI de %s para %s: %s", int(self._limit), int(new_limit), reason)
+        self._limit = new_limit
+        self._stats["decreases"] += 1
+
+    @contextmanager
+    def limit(self):
+        """Aguarda uma vaga e um token; o bloco deve preencher `permit.status` com o status HTTP."""
+        start_time = time.monotonic()
+        waiter = _ThreadWaiter()
+        if not self._try_acquire(waiter):
+            waiter.event.wait()
+        if self.bucket:
+            delay = self.bucket.reserve()
+            if delay:
+                time.sleep(delay)
+        self._record_wait(time.monotonic() - start_time)
+
+        permit = _Permit(self)
+        sent_at = time.monotonic()
+        failed = False
+        try:
+            yield permit
+        except Exception as e:
+            permit.status = permit.status or getattr(getattr(e, "response", None), "status_code", None)
+            failed = permit.status is None
+            raise
+        finally:
+            if self._claim(permit):
+                self._release(time.monotonic() - sent_at, permit.status, failed)
+
+    @asynccontextmanager
+    async def alimit(self):
+        """Versão assíncrona de `limit`."""
+        start_time = time.monotonic()
+        waiter = _AsyncWaiter(asyncio.get_running_loop())
+        if not self._try_acquire(waiter):
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter.granted:
+                        # A vaga foi concedida junto com o cancelamento: devolve para o próximo da fila
+                        self._in_flight -= 1
+                        self._grant_waiters()
+                    else:
+                        self._waiters.remove(waiter)
+                raise
+        try:
+            if self.bucket:
+                delay = self.bucket.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._in_flight -= 1
+                self._grant_waiters()
+            raise
+        self._record_wait(time.monotonic() - start_time)
+
+        permit = _Permit(self)
+        sent_at = time.monotonic()
+        failed = False
+        latency = None
+        try:
+            yield permit
+            latency = time.monotonic() - sent_at
+        except asyncio.CancelledError:
+            # Cancelamentos (ex: hedge perdedor) não dizem nada sobre a saúde da SWAPI
+            raise
+        except Exception as e:
+            latency = time.monotonic() - sent_at
+            permit.status = permit.status or getattr(getattr(e, "response", None), "status_code", None)
+            failed = permit.status is None
+            raise
+        finally:
+            if self._claim(permit):
+                self._release(latency, permit.status, failed)
+
+    def get_stats(self) -> dict:
+        """Limites atuais, requisições em andamento, tamanho da fila e tempos de espera."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._waiters),
+                "latency": self._smoothed_latency,
+                "baseline_latency": min(self._latencies) if self._latencies else None,
+            })
+        stats["rate"] = self.bucket.rate if self.bucket else None
+        stats["burst"] = self.bucket.burst if self.bucket else None
+        stats["tokens"] = self.bucket.tokens if self.bucket else None
+        stats["avg_wait"] = stats["total_wait"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
@@ -0,0 +1,343 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import ContextVar
+from typing import Awaitable, Callable, List, Optional, Tuple, Type, TypeVar
+
+from logger import setup_logger
+from tracing import propagate
+
+T = TypeVar('T')
+
+log = setup_logger('resilience')
+
+class CircuitOpenError(Exception):
+    """O circuito do endpoint está aberto: a chamada falha imediatamente, sem acessar a rede."""
+
+class _HedgeAttempt:
+    """
+    Uma das tentativas enviadas pelo hedge síncrono. A thread de quem perde a corrida não pode
+    ser interrompida, então ela é "abandonada": os callbacks registrados com `on_abandon`
+    (ex: devolver a vaga do rate limiter) rodam assim que a outra tentativa responde.
+    """
+    __slots__ = ("_callbacks", "_abandoned", "_lock")
+
+    def __init__(self):
+        self._callbacks: List[Callable[[], None]] = []
+        self._abandoned = False
+        self._lock = threading.Lock()
+
+    def on_abandon(self, callback: Callable[[], None]):
+        with self._lock:
+            if not self._abandoned:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def abandon(self):
+        with self._lock:
+            self._abandoned = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def run(self, fn: Callable[[], T]) -> Callable[[], T]:
+        def wrapper():
+            _current_attempt.set(self)
+            return fn()
+        return wrapper
+
+# Tentativa do hedge em execução na thread atual (None fora do hedge)
+_current_attempt: ContextVar[Optional[_HedgeAttempt]] = ContextVar("hedge_attempt", default=None)
+
+def on_abandon(callback: Callable[[], None]):
+    """
+    Registra `callback` para quando a tentativa em execução perder a corrida do hedge
+    síncrono; fora de uma tentativa com hedge, não faz nada.
+    """
+    attempt = _current_attempt.get()
+    if attempt is not None:
+        attempt.on_abandon(callback)
+
+def _status_of(error: Exception):
+    """Status HTTP associado a uma exceção de `requests` / `httpx`, se houver."""
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+class RetryPolicy:
+    """
+    Novas tentativas com backoff exponencial e jitter ("full jitter") para GETs idempotentes.
+
+    São repetidas apenas falhas transitórias: erros de rede/timeout (`retry_exceptions`)
+    e respostas com status em `retry_statuses`.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0,
+                 retry_statuses=(429, 500, 502, 503, 504), max_retry_after: float = 5.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.max_retry_after = max_retry_after
+
+    def is_retryable(self, error: Exception, retry_exceptions: Tuple[Type[Exception], ...]) -> bool:
+        if isinstance(error, retry_exceptions):
+            return True
+        return _status_of(error) in self.retry_statuses
+
+    def backoff(self, attempt: int, error: Exception = None) -> float:
+        """Espera antes da tentativa `attempt + 1`, respeitando `Retry-After` quando enviado."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        retry_after = getattr(getattr(error, "response", None), "headers", {}).get("Retry-After")
+        if retry_after and str(retry_after).isdigit():
+            delay = max(delay, min(float(retry_after), self.max_retry_after))
+        return delay
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples (fechado → aberto → meio-aberto).
+
+    Após `failure_threshold` falhas seguidas o circuito abre e as chamadas falham na hora.
+    Depois de `reset_timeout` segundos uma única chamada de teste é liberada: sucesso
+    fecha o circuito, falha o reabre.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class LatencyTracker:
+    """Janela deslizante das latências recentes (em segundos) para calcular percentis."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, p: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        return samples[min(int(p * len(samples)), len(samples) - 1)]
+
+class Resilience:
+    """
+    Camada de resiliência usada pelos clientes SWAPI em cada requisição.
+
+    Combina, por endpoint: circuit breaker, novas tentativas com backoff e, opcionalmente,
+    requisições "hedged" — se a primeira tentativa passar do percentil `hedge_percentile`
+    das latências recentes, uma segunda é enviada e vale a resposta que chegar primeiro.
+    """
+
+    def __init__(self, retry: RetryPolicy = None, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 hedge: bool = False, hedge_percentile: float = 0.95, hedge_min_samples: int = 20,
+                 hedge_max_workers: int = 16, retry_exceptions: Tuple[Type[Exception], ...] = ()):
+        self.retry = retry or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.retry_exceptions = tuple(retry_exceptions)
+        self._hedge_max_workers = hedge_max_workers
+        self._executor = None
+        self._breakers = {}
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "failures": 0, "short_circuited": 0, "hedged": 0, "hedge_wins": 0}
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _breaker(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def _tracker(self, key: str) -> LatencyTracker:
+        with self._lock:
+            tracker = self._latencies.get(key)
+            if tracker is None:
+                tracker = self._latencies[key] = LatencyTracker()
+            return tracker
+
+    def _hedge_delay(self, key: str):
+        """Tempo de espera antes do envio da requisição extra, ou None se o hedge não se aplica."""
+        tracker = self._tracker(key)
+        if not self.hedge or len(tracker) < self.hedge_min_samples:
+            return None
+        return tracker.percentile(self.hedge_percentile)
+
+    def _check_circuit(self, key: str) -> CircuitBreaker:
+        self._count("calls")
+        breaker = self._breaker(key)
+        if not breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(f"Circuito aberto para '{key}'")
+        return breaker
+
+    def _on_failure(self, key: str, breaker: CircuitBreaker, error: Exception, attempt: int) -> bool:
+        """Registra a falha e indica se uma nova tentativa deve ser feita."""
+        if not self.retry.is_retryable(error, self.retry_exceptions):
+            # Erros do cliente (ex: 404) indicam que o upstream está respondendo
+            breaker.record_success()
+            return False
+        self._count("failures")
+        breaker.record_failure()
+        if attempt + 1 >= self.retry.max_attempts or breaker.state == CircuitBreaker.OPEN:
+            return False
+        self._count("retries")
+        log.warning("Falha transitória em '%s' (tentativa %s): %s", key, attempt + 1, error)
+        return True
+
+    def _timed(self, key: str, fn: Callable[[], T]) -> T:
+        start_time = time.perf_counter()
+        result = fn()
+        self._tracker(key).record(time.perf_counter() - start_time)
+        return result
+
+    def call(self, key: str, fn: Callable[[], T]) -> T:
+        """Executa `fn` (uma tentativa da requisição) com circuit breaker, retries e hedge."""
+        breaker = self._check_circuit(key)
+        attempt = 0
+        while True:
+            try:
+                result = self._attempt(key, fn)
+                breaker.record_success()
+                return result
+            except Exception as e:
+                if not self._on_failure(key, breaker, e, attempt):
+                    raise
+                time.sleep(self.retry.backoff(attempt, e))
+                attempt += 1
+
+    def _attempt(self, key: str, fn: Callable[[], T]) -> T:
+        delay = self._hedge_delay(key)
+        if delay is None:
+            return self._timed(key, fn)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._hedge_max_workers, thread_name_prefix="hedge")
+        attempts = (_HedgeAttempt(), _HedgeAttempt())
+        # As tentativas rodam no pool do hedge: mantém os spans delas no trace de quem chamou
+        primary = self._executor.submit(self._timed, key, propagate(attempts[0].run(fn)))
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count("hedged")
+        backup = self._executor.submit(self._timed, key, propagate(attempts[1].run(fn)))
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count("hedge_wins")
+                    # A outra tentativa continua na thread dela até responder: libera o que ela ocupa
+                    attempts[0 if future is backup else 1].abandon()
+                    return future.result()
+        return primary.result()
+
+    async def acall(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Versão assíncrona de `call`: `fn()` cria a corrotina de uma tentativa."""
+        breaker = self._check_circuit(key)
+        attempt = 0
+        while True:
+            try:
+                result = await self._attempt_async(key, fn)
+                breaker.record_success()
+                return result
+            except Exception as e:
+                if not self._on_failure(key, breaker, e, attempt):
+                    raise
+                await asyncio.sleep(self.retry.backoff(attempt, e))
+                attempt += 1
+
+    async def _timed_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        start_time = time.perf_counter()
+        result = await fn()
+        self._tracker(key).record(time.perf_counter() - start_time)
+        return result
+
+    async def _attempt_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        delay = self._hedge_delay(key)
+        if delay is None:
+            return await self._timed_async(key, fn)
+
+        primary = asyncio.ensure_future(self._timed_async(key, fn))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count("hedged")
+        backup = asyncio.ensure_future(self._timed_async(key, fn))
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self._count("hedge_wins")
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> dict:
+        """Contadores de retries/hedge e o estado do circuito e a latência p95 de cada endpoint."""
+        with self._lock:
+            stats = dict(self._stats)
+            breakers = dict(self._breakers)
+            latencies = dict(self._latencies)
+        stats["endpoints"] = {
+            key: {
+                "circuit": breaker.state,
+                "p95": latencies[key].percentile(0.95) if key in latencies else None,
+            }
+            for key, breaker in breakers.items()
+        }
+        return stats
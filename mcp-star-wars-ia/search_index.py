@@ -0,0 +1,93 @@
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional
+
+# Campos usados pelo `?search=` da SWAPI em cada recurso (padrão: "name")
+SEARCH_FIELDS = {
+    "films": ("title",),
+    "starships": ("name", "model"),
+    "vehicles": ("name", "model"),
+}
+
+def normalize(text: str) -> str:
+    """Normaliza o texto para busca: remove acentos e ignora maiúsculas/minúsculas."""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class _EndpointIndex:
+    """Índice invertido de trigramas dos registros de um recurso."""
+    __slots__ = ("ids", "records", "texts", "postings")
+
+    def __init__(self, records: Dict[int, dict], fields):
+        self.ids = sorted(records)
+        self.records = records
+        # Campos separados por "\0" para que uma busca não case atravessando dois campos
+        self.texts = {id: "\0".join(normalize(records[id].get(f, "")) for f in fields) for id in self.ids}
+        self.postings = {}
+        for id in self.ids:
+            for gram in trigrams(self.texts[id]):
+                self.postings.setdefault(gram, set()).add(id)
+
+    def search(self, term: str) -> List[dict]:
+        if len(term) < 3:
+            candidates = self.ids
+        else:
+            grams = sorted((self.postings.get(g, ()) for g in trigrams(term)), key=len)
+            if not grams[0]:
+                return []
+            candidates = sorted(set(grams[0]).intersection(*grams[1:]))
+        return [self.records[id] for id in candidates if term in self.texts[id]]
+
+class NameIndex:
+    """
+    Índice local de nomes/títulos para responder buscas sem chamar o `?search=` remoto.
+
+    Usa a mesma semântica de substring da SWAPI (sem diferenciar maiúsculas), além de
+    ignorar acentos. O índice é considerado desatualizado (`is_stale`) quando os dados
+    de origem têm mais de `max_age` segundos; `None` desativa essa verificação.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = max_age
+        self._indexes = {}
+        self._source_time = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_snapshot(cls, snapshot, max_age: Optional[float] = None) -> "NameIndex":
+        """Monta o índice a partir de um `SwapiSnapshot`."""
+        index = cls(max_age=max_age)
+        for endpoint, records in snapshot.resources.items():
+            index.build(endpoint, records, snapshot.fetched_at.get(endpoint))
+        return index
+
+    def build(self, endpoint: str, records: Dict[int, dict], source_time: float = None):
+        """(Re)indexa os registros de um recurso (`{id: registro}`)."""
+        endpoint_index = _EndpointIndex(records, SEARCH_FIELDS.get(endpoint, ("name",)))
+        with self._lock:
+            self._indexes[endpoint] = endpoint_index
+            self._source_time[endpoint] = source_time or time.time()
+
+    def has(self, endpoint: str) -> bool:
+        return endpoint in self._indexes
+
+    def is_stale(self, endpoint: str) -> bool:
+        if self.max_age is None:
+            return False
+        return time.time() - self._source_time.get(endpoint, 0) > self.max_age
+
+    def search(self, endpoint: str, query: str) -> Optional[List[dict]]:
+        """
+        Retorna os registros cujo nome/título contém `query`, em ordem de ID.
+
+        Retorna None quando o recurso não está indexado ou o índice está desatualizado,
+        indicando que o chamador deve consultar a API remota.
+        """
+        endpoint_index = self._indexes.get(endpoint)
+        if endpoint_index is None or self.is_stale(endpoint):
+            return None
+        return endpoint_index.search(normalize(query or ""))
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar('T')
+
+class _Call:
+    """Chamada em andamento compartilhada pelos chamadores da mesma chave."""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Agrupa chamadas idênticas e simultâneas ("single-flight").
+
+    O primeiro chamador de uma chave executa a função; os chamadores concorrentes da
+    mesma chave aguardam e recebem o mesmo resultado (ou a mesma exceção). Funciona
+    com threads (`do`) e com corrotinas (`do_async`).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}
+        self._stats = {"executions": 0, "coalesced": 0, "errors": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Executa `fn()` uma única vez para todas as threads que pedirem `key` ao mesmo tempo."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def do_async(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Versão assíncrona de `do`: `factory()` cria a corrotina executada pelo primeiro chamador."""
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        future = self._async_calls.get(loop_key)
+        if future is not None:
+            with self._lock:
+                self._stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = self._async_calls[loop_key] = loop.create_future()
+        with self._lock:
+            self._stats["executions"] += 1
+        try:
+            result = await factory()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita o aviso "exception was never retrieved" quando não há outros chamadores
+            future.exception()
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            self._async_calls.pop(loop_key, None)
+
+    def get_stats(self) -> dict:
+        """Retorna execuções reais, chamadas agrupadas (`coalesced`) e falhas."""
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls) + len(self._async_calls)}
@@ -0,0 +1,136 @@
+import io
+import logging
+import os
+import threading
+import time
+
+import pytest
+
+import logger
+from logger import SAMPLED, JsonFormatter, ProcessSafeRotatingFileHandler, SamplingFilter, _log_level, build_pipeline, fcntl
+
+def _record(level=logging.INFO, msg="Requisição → GET %s", args=("people",), sampled=True, name="swapi_client"):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    if sampled:
+        record.sampled = True
+    return record
+
+def test_queue_listener_formats_in_the_writer_thread(tmp_path):
+    class Lazy:
+        thread = None
+
+        def __str__(self):
+            Lazy.thread = threading.current_thread()
+            return "Luke"
+
+    stream = io.StringIO()
+    handler, listener = build_pipeline(log_file=str(tmp_path / "app.log"), stream=stream)
+    logger = logging.getLogger("test_logger.queue")
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    try:
+        logger.debug("Resultado: %s", Lazy())
+        logger.info("Requisição → GET %s", "people/1", extra=SAMPLED)
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+        for file_handler in listener.handlers:
+            file_handler.close()
+
+    assert Lazy.thread is not threading.current_thread()
+    lines = (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()
+    assert [line.split("] ", 3)[-1] for line in lines] == ["Resultado: Luke", "Requisição → GET people/1"]
+    # O console só recebe INFO e acima
+    assert stream.getvalue().endswith("[INFO] [test_logger.queue] Requisição → GET people/1\n")
+
+def test_sampling_filter_keeps_one_in_n_per_message():
+    sampling = SamplingFilter(rate=0.5)
+    assert [sampling.filter(_record()) for _ in range(4)] == [True, False, True, False]
+    assert sampling.filter(_record(msg="Resposta ← %s")) is True
+    assert sampling.filter(_record(sampled=False)) is True
+    assert sampling.filter(_record(level=logging.WARNING)) is True
+
+    drop_all = SamplingFilter(rate=0)
+    assert drop_all.filter(_record()) is False
+    assert drop_all.filter(_record(level=logging.ERROR)) is True
+
+def test_json_formatter_includes_extra_fields():
+    record = _record(sampled=False)
+    record.endpoint = "people"
+    line = JsonFormatter().format(record)
+    assert '"message": "Requisição → GET people"' in line
+    assert '"endpoint": "people"' in line
+
+def _file_handler(path, **kwargs):
+    handler = ProcessSafeRotatingFileHandler(str(path), maxBytes=kwargs.pop("maxBytes", 0), encoding="utf-8", **kwargs)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+def test_rotation_is_seen_by_other_handlers_of_the_same_file(tmp_path):
+    path = tmp_path / "app.log"
+    # Dois handlers no mesmo arquivo, como dois workers
+    first = _file_handler(path, maxBytes=40, backupCount=2)
+    second = _file_handler(path, maxBytes=40, backupCount=2)
+    try:
+        first.emit(_record(msg="primeira linha do log", args=(), sampled=False))
+        first.emit(_record(msg="segunda linha do log", args=(), sampled=False))
+        # O segundo handler ainda aponta para o arquivo rotacionado e precisa reabri-lo
+        second.emit(_record(msg="terceira", args=(), sampled=False))
+    finally:
+        first.close()
+        second.close()
+    assert (tmp_path / "app.log.1").read_text(encoding="utf-8") == "primeira linha do log\n"
+    assert path.read_text(encoding="utf-8") == "segunda linha do log\nterceira\n"
+
+@pytest.mark.skipif(fcntl is None, reason="flock disponível apenas no POSIX")
+def test_writes_wait_for_the_file_lock(tmp_path):
+    path = tmp_path / "app.log"
+    handler = _file_handler(path)
+    with open(f"{path}.lock", "a+b") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        writer = threading.Thread(target=handler.emit, args=(_record(msg="bloqueada", args=(), sampled=False),))
+        writer.start()
+        time.sleep(0.1)
+        assert path.read_text(encoding="utf-8") == ""
+        fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+        writer.join(5)
+    handler.close()
+    assert path.read_text(encoding="utf-8") == "bloqueada\n"
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork disponível apenas no POSIX")
+def test_listener_is_restarted_on_both_sides_of_a_fork(tmp_path, monkeypatch):
+    handler, listener = build_pipeline(log_file=str(tmp_path / "app.log"), stream=io.StringIO())
+    monkeypatch.setattr(logger, "_listener", listener)
+    log = logging.getLogger("test_logger.fork")
+    log.addHandler(handler)
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    try:
+        pid = os.fork()
+        if pid == 0:
+            # Processo filho: a thread de escrita foi recriada e o arquivo reaberto
+            try:
+                log.info("filho %s", os.getpid())
+                listener.stop()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        log.info("pai")
+    finally:
+        listener.stop()
+        log.removeHandler(handler)
+        for file_handler in listener.handlers:
+            file_handler.close()
+
+    lines = [line.split("] ", 3)[-1] for line in (tmp_path / "app.log").read_text(encoding="utf-8").splitlines()]
+    assert lines == [f"filho {pid}", "pai"]
+
+def test_log_level_accepts_names_in_any_case(monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "warning")
+    assert _log_level("LOG_LEVEL", "DEBUG") == logging.WARNING
+
+def test_unknown_log_level_falls_back_to_default(monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "VERBOSE")
+    with pytest.warns(RuntimeWarning, match="VERBOSE"):
+        assert _log_level("LOG_LEVEL", "DEBUG") == logging.DEBUG
@@ -0,0 +1,46 @@
+from mcp_tools import MCPTools
+from resource_registry import RESOURCES, generated_tool_names, tool_labels, tool_names
+from swapi_mirror import MirrorSwapiClient, SwapiSnapshot
+from tools import Tools
+
+API = "https://swapi.dev/api"
+
+def _film(id, title, episode_id):
+    return {
+        "title": title, "episode_id": episode_id, "opening_crawl": "", "director": "George Lucas", "producer": "",
+        "release_date": "", "species": [], "starships": [], "vehicles": [], "characters": [], "planets": [],
+        "created": "", "edited": "", "url": f"{API}/films/{id}/",
+    }
+
+def _tools():
+    snapshot = SwapiSnapshot()
+    snapshot.update_resource("films", [_film(1, "A New Hope", 4), _film(4, "The Phantom Menace", 1)])
+    snapshot.update_resource("species", [])
+    return Tools(MirrorSwapiClient(snapshot))
+
+def test_every_resource_gets_four_documented_tools():
+    names = generated_tool_names()
+    assert len(names) == 4 * len(RESOURCES)
+    assert tool_names(RESOURCES["people"]) == {
+        "search": "search_characters", "get_by_id": "get_character_by_id",
+        "get_by_ids": "get_characters_by_ids", "list_all": "list_all_characters",
+    }
+    for name in names:
+        method = getattr(Tools, name)
+        assert method.__name__ == name
+        assert method.__doc__
+        assert getattr(MCPTools, name).__name__ == name
+    assert Tools.get_species_by_id.__doc__ == "Obtém os detalhes de uma espécie específica pelo seu ID numérico."
+    assert tool_labels(RESOURCES["starships"])["list_all_starships"] == "Listar todas as naves estelares"
+
+def test_generated_tools_use_the_resource_spec():
+    tools = _tools()
+    assert [film["title"] for film in tools.list_all_films().items] == ["The Phantom Menace", "A New Hope"]
+    assert str(tools.search_species("wookie")) == 'Nenhuma espécie encontrada com o nome "wookie".'
+    assert str(tools.get_film_by_id("x")) == 'ID inválido: "x".'
+    assert str(tools.get_film_by_id(99)) == "Filme com ID 99 não encontrado."
+
+def test_mcp_tools_delegate_generated_tools():
+    mcp_tools = MCPTools(_tools())
+    assert str(mcp_tools.get_species_by_id(3)) == "Espécie com ID 3 não encontrada."
+    assert str(mcp_tools.get_films_by_ids("4")).startswith("Título: The Phantom Menace")
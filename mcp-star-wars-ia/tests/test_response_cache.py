@@ -0,0 +1,83 @@
+import requests
+from flask import Flask, make_response, request
+
+from mcp_tools import MCPTools
+from response_cache import ResponseCache
+from swapi_client import record_upstream_failure
+from tool_result import ToolResult
+
+def _client(build):
+    """Aplicação com uma rota `/` servida pelo cache; `build` monta a resposta."""
+    app = Flask(__name__)
+    cache = ResponseCache(ttl=60, max_age=30)
+    calls = []
+
+    @app.route("/", methods=["GET", "POST"])
+    def index():
+        def counted():
+            calls.append(request.method)
+            return build()
+        return cache.respond(("index", request.values.get("q", "")), counted)
+
+    return app.test_client(), calls
+
+def test_get_is_cached_and_conditional():
+    client, calls = _client(lambda: make_response("luke"))
+    first = client.get("/?q=luke")
+    assert first.headers["X-Cache"] == "MISS"
+    assert "public" in first.headers["Cache-Control"]
+    second = client.get("/?q=luke")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_data() == b"luke"
+    etag = first.headers["ETag"]
+    assert client.get("/?q=luke", headers={"If-None-Match": etag}).status_code == 304
+    assert calls == ["GET"]
+
+def test_post_bypasses_the_cache():
+    client, calls = _client(lambda: make_response("luke"))
+    client.get("/?q=luke")
+    response = client.post("/", data={"q": "luke"})
+    assert response.get_data() == b"luke"
+    assert "ETag" not in response.headers
+    assert "X-Cache" not in response.headers
+    assert "public" not in response.headers.get("Cache-Control", "")
+    client.post("/", data={"q": "luke"})
+    assert calls == ["GET", "POST", "POST"]
+
+def test_no_store_responses_are_not_cached():
+    def build():
+        page = make_response("Personagem não encontrado.")
+        page.cache_control.no_store = True
+        return page
+
+    client, calls = _client(build)
+    client.get("/?q=luke")
+    response = client.get("/?q=luke")
+    assert "no-store" in response.headers["Cache-Control"]
+    assert "ETag" not in response.headers
+    assert len(calls) == 2
+
+def test_swallowed_upstream_failure_marks_result_degraded():
+    tools = MCPTools(tools=object())
+
+    def failing_search():
+        # O cliente SWAPI registra a falha e devolve None, que a ferramenta trata como "não encontrado"
+        error = requests.HTTPError(response=requests.Response())
+        error.response.status_code = 503
+        record_upstream_failure("people", error)
+        return ToolResult.from_message("Nenhum personagem encontrado.")
+
+    result = tools._execute_tool("search_characters", failing_search)
+    assert result.degraded
+    assert result.to_dict()["degraded"] is True
+
+def test_not_found_is_not_degraded():
+    tools = MCPTools(tools=object())
+
+    def not_found():
+        error = requests.HTTPError(response=requests.Response())
+        error.response.status_code = 404
+        record_upstream_failure("people", error)
+        return ToolResult.from_message("Personagem não encontrado.")
+
+    assert not tools._execute_tool("get_character_by_id", not_found).degraded
@@ -0,0 +1,38 @@
+import time
+
+from search_index import NameIndex
+
+PEOPLE = {
+    1: {"name": "Luke Skywalker"},
+    4: {"name": "Darth Vader"},
+    11: {"name": "Anakin Skywalker"},
+    20: {"name": "Yoda"},
+}
+
+def _index(**kwargs):
+    index = NameIndex(**kwargs)
+    index.build("people", PEOPLE)
+    index.build("starships", {10: {"name": "Millennium Falcon", "model": "YT-1300 light freighter"}})
+    index.build("planets", {1: {"name": "Tatooine"}, 2: {"name": "Alderaan"}})
+    return index
+
+def test_substring_search_ignores_case_and_accents_in_id_order():
+    index = _index()
+    assert [p["name"] for p in index.search("people", "SKYWALKER")] == ["Luke Skywalker", "Anakin Skywalker"]
+    assert index.search("planets", "tatoóine") == [{"name": "Tatooine"}]
+    assert index.search("people", "vader x") == []
+
+def test_short_terms_and_extra_fields():
+    index = _index()
+    assert [p["name"] for p in index.search("people", "yo")] == ["Yoda"]
+    assert len(index.search("people", "")) == len(PEOPLE)
+    assert index.search("starships", "yt-1300")[0]["name"] == "Millennium Falcon"
+    # Os campos são separados: a busca não casa atravessando nome e modelo
+    assert index.search("starships", "falconyt") == []
+
+def test_missing_or_stale_index_defers_to_the_api():
+    index = NameIndex(max_age=60)
+    assert index.search("people", "luke") is None
+    index.build("people", PEOPLE, source_time=time.time() - 120)
+    assert index.is_stale("people")
+    assert index.search("people", "luke") is None
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from tool_result import Column, ToolResult, lazy_render, render
+
+COLUMNS = (Column("name", "Nome"), Column("height", "Altura", "{}cm"), Column("films", "Filmes"))
+
+def _result():
+    return ToolResult(
+        items=[{"id": 1, "name": "Luke <Skywalker>", "height": "172", "films": ["A New Hope"]}],
+        columns=COLUMNS,
+    )
+
+def test_text_and_llm_formats():
+    result = _result()
+    assert str(result) == "Nome: Luke <Skywalker>\nAltura: 172cm\nFilmes (1): A New Hope\n---"
+    assert result.to_llm(fields=["name", "height"]) == "Nome: Luke <Skywalker>; Altura: 172cm"
+
+def test_json_keeps_id_and_truncates_long_texts():
+    data = json.loads(_result().to_json(fields=["name"], max_length=5))
+    assert data == {"count": 1, "items": [{"id": 1, "name": "Luke…"}]}
+
+def test_html_escapes_values():
+    html = _result().__html__()
+    assert "<strong>Nome:</strong> Luke &lt;Skywalker&gt;" in html
+
+def test_message_line_and_error_items():
+    assert str(ToolResult.from_message("Nenhum personagem encontrado.")) == "Nenhum personagem encontrado."
+    ranking = ToolResult(
+        items=[{"position": 1, "name": "Yarael Poof"}, {"error": "Personagem com ID 99 não encontrado."}],
+        columns=(Column("name", "Nome"),), line="{position}. {name}", separator=False,
+    )
+    assert ranking.to_text() == "1. Yarael Poof\nPersonagem com ID 99 não encontrado."
+
+def test_render_helpers():
+    assert render("Erro ao executar a ferramenta") == "Erro ao executar a ferramenta"
+    assert str(lazy_render(_result(), "llm", fields=["name"])) == "Nome: Luke <Skywalker>"
+    with pytest.raises(ValueError):
+        _result().render("xml")
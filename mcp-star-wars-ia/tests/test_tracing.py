@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask
+
+from tracing import NOOP_SPAN, Tracer, propagate, setup_tracing, to_otlp
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+def test_spans_nest_under_the_active_span():
+    tracer = Tracer()
+    assert tracer.span("fora de um trace") is NOOP_SPAN
+    with tracer.start_trace("GET /") as root:
+        with tracer.span("tool.search_characters", tool="search_characters") as child:
+            pass
+    assert child.trace_id == root.trace_id
+    assert child.parent_id == root.span_id
+    trace = tracer.store.get(root.trace_id)
+    assert trace.root is root
+    assert [span["name"] for span in trace.to_dict()["spans"]] == ["GET /", "tool.search_characters"]
+
+def test_propagate_carries_the_span_to_pool_threads():
+    tracer = Tracer()
+
+    def fetch(page):
+        with tracer.span("swapi.page", page=page) as span:
+            return span.parent_id
+
+    with tracer.start_trace("GET /") as root:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parents = list(executor.map(propagate(fetch), [1, 2]))
+            # Sem `propagate`, a thread do pool não tem span ativo
+            assert executor.submit(fetch, 3).result() is None
+    assert parents == [root.span_id, root.span_id]
+
+def test_errors_are_recorded_and_exported_as_otlp():
+    tracer = Tracer()
+    with pytest.raises(ValueError):
+        with tracer.start_trace("GET /", trace_id="a" * 32):
+            raise ValueError("SWAPI fora do ar")
+    span = tracer.store.get("a" * 32).root
+    otlp = to_otlp([span])["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert otlp["traceId"] == "a" * 32
+    assert otlp["status"] == {"code": 2, "message": span.error}
+    assert "SWAPI fora do ar" in span.error
+
+def _client(monkeypatch, **env):
+    for name in ("TRACE_DEBUG_VIEW", "TRACE_TRUST_TRACEPARENT"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    app = Flask(__name__)
+    setup_tracing(app)
+    app.route("/")(lambda: "ok")
+    return app.test_client()
+
+def test_debug_view_and_traceparent_are_off_by_default(monkeypatch):
+    client = _client(monkeypatch)
+    response = client.get("/", headers={"traceparent": TRACEPARENT})
+    assert response.headers["X-Trace-Id"] != TRACEPARENT.split("-")[1]
+    assert client.get("/debug/traces").status_code == 404
+
+def test_env_flags_enable_debug_view_and_trusted_traceparent(monkeypatch):
+    client = _client(monkeypatch, TRACE_DEBUG_VIEW="1", TRACE_TRUST_TRACEPARENT="true")
+    response = client.get("/", headers={"traceparent": TRACEPARENT})
+    trace_id = response.headers["X-Trace-Id"]
+    assert trace_id == TRACEPARENT.split("-")[1]
+    assert client.get(f"/debug/trace/{trace_id}?format=json").status_code == 200
@@ -0,0 +1,251 @@
+import hashlib
+import inspect
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from logger import setup_logger
+from tools import Tools
+
+log = setup_logger('tool_registry')
+
+# Tipos das anotações dos parâmetros -> tipos do JSON Schema (o resto vira "string")
+JSON_TYPES = {int: "integer", float: "number", bool: "boolean", str: "string"}
+
+def _to_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ("true", "1", "sim"):
+        return True
+    if str(value).lower() in ("false", "0", "nao", "não"):
+        return False
+    raise ValueError(value)
+
+def _to_str(value) -> str:
+    if isinstance(value, list) and not any(isinstance(item, (dict, list)) for item in value):
+        # Listas (ex: IDs) viram o texto separado por vírgulas que as ferramentas esperam
+        return ",".join(map(str, value))
+    if isinstance(value, (dict, list)):
+        raise ValueError(value)
+    return str(value)
+
+# Conversão dos argumentos recebidos (ex: "1" vindo de um formulário ou da IA) para o tipo do parâmetro
+_CONVERTERS = {"integer": int, "number": float, "boolean": _to_bool, "string": _to_str}
+
+class ToolArgumentsError(ValueError):
+    """Argumentos inválidos para uma ferramenta: faltando, desconhecidos ou com tipo errado."""
+
+    def __init__(self, tool: str, missing=(), unknown=(), invalid=()):
+        super().__init__(f"Argumentos inválidos para {tool}")
+        self.tool = tool
+        self.missing = list(missing)
+        self.unknown = list(unknown)
+        self.invalid = list(invalid)
+
+    def details(self) -> dict:
+        return {"missing": self.missing, "unknown": self.unknown, "invalid": self.invalid}
+
+@dataclass(frozen=True)
+class ToolParameter:
+    name: str
+    type: str = "string"
+    required: bool = True
+    default: Any = None
+    description: Optional[str] = None
+
+@dataclass(frozen=True)
+class ToolSchema:
+    """Descrição de uma ferramenta: nome, descrição (docstring) e parâmetros tipados."""
+    name: str
+    description: str
+    parameters: Tuple[ToolParameter, ...] = field(default_factory=tuple)
+
+    def json_schema(self, defaults: bool = True) -> dict:
+        """Schema dos argumentos no formato JSON Schema (`{"type": "object", "properties": ...}`)."""
+        properties = {}
+        for param in self.parameters:
+            prop = {"type": param.type}
+            if param.description:
+                prop["description"] = param.description
+            if defaults and not param.required and param.default is not None:
+                prop["default"] = param.default
+            properties[param.name] = prop
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": [param.name for param in self.parameters if param.required],
+        }
+
+    def validate(self, arguments: dict) -> dict:
+        """
+        Confere os argumentos de uma chamada e converte os valores para o tipo de cada
+        parâmetro; levanta `ToolArgumentsError` se algum faltar, sobrar ou não converter.
+        """
+        accepted = {param.name: param for param in self.parameters}
+        missing = [param.name for param in self.parameters if param.required and arguments.get(param.name) is None]
+        unknown = sorted(set(arguments) - set(accepted))
+        converted = {}
+        invalid = []
+        for name, value in arguments.items():
+            param = accepted.get(name)
+            if param is None or value is None:
+                continue
+            try:
+                converted[name] = _CONVERTERS.get(param.type, _to_str)(value)
+            except (TypeError, ValueError):
+                invalid.append(name)
+        if missing or unknown or invalid:
+            raise ToolArgumentsError(self.name, missing, unknown, invalid)
+        return converted
+
+def _param_descriptions(doc: str) -> Dict[str, str]:
+    """Descrições dos parâmetros na seção `Args:` da docstring, se houver."""
+    descriptions = {}
+    in_args = False
+    for line in doc.splitlines():
+        stripped = line.strip()
+        if stripped in ("Args:", "Parâmetros:"):
+            in_args = True
+        elif in_args and ":" in stripped:
+            name, _, description = stripped.partition(":")
+            descriptions[name.split(" ")[0]] = description.strip()
+        elif in_args and not stripped:
+            in_args = False
+    return descriptions
+
+def _tool_schema(name: str, method) -> ToolSchema:
+    doc = inspect.getdoc(method)
+    descriptions = _param_descriptions(doc)
+    parameters = []
+    for param_name, param in inspect.signature(method).parameters.items():
+        if param_name == 'self':
+            continue
+        required = param.default is inspect.Parameter.empty
+        parameters.append(ToolParameter(
+            name=param_name,
+            type=JSON_TYPES.get(param.annotation, "string"),
+            required=required,
+            default=None if required else param.default,
+            description=descriptions.get(param_name),
+        ))
+    return ToolSchema(name=name, description=doc.split("\nArgs:")[0].strip(), parameters=tuple(parameters))
+
+class ToolRegistry:
+    """
+    Schemas das ferramentas da classe `Tools`, calculados uma única vez.
+
+    Antes, cada consulta ao modelo inspecionava a classe `Tools` (`inspect.getmembers` e
+    `inspect.signature`) e serializava a lista de ferramentas de novo. Aqui a inspeção é
+    feita na importação do módulo, e o fragmento de prompt serializado e as declarações de
+    função nativas do Gemini ficam em cache até a próxima mudança de versão.
+
+    `reload()` inspeciona a classe de novo (ex: depois de registrar novas ferramentas) e só
+    troca a versão e descarta os caches se os schemas tiverem mudado.
+    """
+
+    def __init__(self, tools_class=Tools):
+        self.tools_class = tools_class
+        self.version = 0
+        self.fingerprint = None
+        self._schemas: Dict[str, ToolSchema] = {}
+        self._cache: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _inspect(self) -> Dict[str, ToolSchema]:
+        schemas = {}
+        for name, method in inspect.getmembers(self.tools_class, predicate=inspect.isfunction):
+            if not name.startswith('_') and method.__doc__:
+                schemas[name] = _tool_schema(name, method)
+        return schemas
+
+    def reload(self) -> bool:
+        """Recalcula os schemas; retorna True (e incrementa a versão) se algo mudou."""
+        schemas = self._inspect()
+        serialized = json.dumps([self._as_dict(schema) for schema in schemas.values()], sort_keys=True, ensure_ascii=False)
+        fingerprint = hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return False
+            self._schemas = schemas
+            self._cache = {}
+            self.fingerprint = fingerprint
+            self.version += 1
+        log.info("Registro de ferramentas v%s (%s): %s ferramentas", self.version, fingerprint, len(schemas))
+        return True
+
+    @staticmethod
+    def _as_dict(schema: ToolSchema) -> dict:
+        return {"name": schema.name, "description": schema.description, "inputSchema": schema.json_schema()}
+
+    def _cached(self, key, build):
+        cache = self._cache
+        if key not in cache:
+            value = build()
+            with self._lock:
+                # Não guarda valores calculados com uma versão que já foi substituída
+                if cache is self._cache:
+                    cache[key] = value
+            return value
+        return cache[key]
+
+    def names(self) -> List[str]:
+        return list(self._schemas)
+
+    def get(self, name: str) -> Optional[ToolSchema]:
+        return self._schemas.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._schemas
+
+    def schemas(self) -> List[ToolSchema]:
+        return list(self._schemas.values())
+
+    def json_schemas(self) -> List[dict]:
+        """Ferramentas no formato do MCP (`name`, `description`, `inputSchema`)."""
+        return self._cached("json_schemas", lambda: [self._as_dict(schema) for schema in self._schemas.values()])
+
+    def prompt_fragment(self, detailed: bool = False) -> str:
+        """
+        Lista de ferramentas serializada para o prompt.
+
+        Args:
+            detailed: Inclui nome, tipo e obrigatoriedade de cada parâmetro; sem ele, só
+                indica se a ferramenta recebe parâmetro (`requires_param`).
+        """
+        def build():
+            if detailed:
+                tools = [
+                    {"name": schema.name, "description": schema.description,
+                     "parameters": [{"name": p.name, "type": p.type, "required": p.required} for p in schema.parameters]}
+                    for schema in self._schemas.values()
+                ]
+            else:
+                tools = [
+                    {"name": schema.name, "description": schema.description, "requires_param": bool(schema.parameters)}
+                    for schema in self._schemas.values()
+                ]
+            return json.dumps(tools, indent=2)
+        return self._cached(("prompt", detailed), build)
+
+    def function_declarations(self) -> list:
+        """Declarações de função nativas do Gemini (`genai.types.FunctionDeclaration`), passadas ao modelo pelo agente do LangGraph."""
+        def build():
+            import google.generativeai as genai
+            return [
+                genai.types.FunctionDeclaration(
+                    name=schema.name,
+                    description=schema.description,
+                    # A API do Gemini não aceita objetos sem propriedades nem valores padrão no schema
+                    parameters=schema.json_schema(defaults=False) if schema.parameters else None,
+                )
+                for schema in self._schemas.values()
+            ]
+        return self._cached("function_declarations", build)
+
+    def get_stats(self) -> dict:
+        return {"version": self.version, "fingerprint": self.fingerprint, "tools": len(self._schemas)}
+
+# Construído na importação: as aplicações compartilham a mesma instância
+registry = ToolRegistry()
@@ -0,0 +1,195 @@
+import html
+import json
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+class Column(NamedTuple):
+    """Campo de um resultado: chave nos itens, rótulo e formato do valor no texto."""
+    key: str
+    label: str
+    template: Union[str, Callable] = "{}"
+
+    def format(self, value) -> str:
+        if callable(self.template):
+            return self.template(value)
+        return self.template.format(value)
+
+def _truncate(value, max_length: Optional[int]):
+    if max_length and isinstance(value, str) and len(value) > max_length:
+        return value[:max_length - 1].rstrip() + "…"
+    return value
+
+class ToolResult:
+    """
+    Resultado estruturado de uma ferramenta, renderizado sob demanda.
+
+    As ferramentas montam apenas os itens (dicionários com os dados já resolvidos) e as
+    colunas que descrevem como exibi-los; o texto só é gerado quando alguém precisa dele
+    (`str(result)`, o log em nível DEBUG, o template Jinja ou a mensagem para o LLM). Cada
+    formato aceita `fields` (colunas a incluir) e `max_length` (tamanho máximo dos textos,
+    como a abertura dos filmes), para não carregar dados que não serão usados.
+
+    Formatos: `text` (o mesmo texto que as ferramentas sempre retornaram), `json`, `html`
+    (usado automaticamente pelo Jinja, via `__html__`) e `llm` (uma linha por item). Novos
+    formatos podem ser registrados com `register_renderer`.
+
+    Attributes:
+        items: Dados de cada item; um item com a chave `error` é exibido só com a mensagem.
+        columns: Colunas exibidas de cada item, na ordem.
+        message: Texto exibido quando não há itens (ex: "Nenhum personagem encontrado").
+        header: Linha exibida antes dos itens.
+        line: Formato de uma linha por item (ex: "{position}. {name}"); sem ele, cada item
+            vira um bloco "Rótulo: valor".
+        separator: Se cada item termina com "---".
+        degraded: Se alguma consulta à SWAPI falhou durante a ferramenta e foi tratada como
+            "não encontrado" (marcado pelo `MCPTools`); o resultado não deve ir para caches.
+    """
+    HTML_MAX_LENGTH = 300
+    LLM_MAX_LENGTH = 200
+
+    def __init__(self, items: Sequence[dict] = (), columns: Sequence[Column] = (), message: Optional[str] = None,
+                 header: Optional[str] = None, line: Optional[str] = None, separator: bool = True):
+        self.items = list(items)
+        self.columns = tuple(columns)
+        self.message = message
+        self.header = header
+        self.line = line
+        self.separator = separator
+        self.degraded = False
+        self._text = None
+
+    @classmethod
+    def from_message(cls, message: str) -> "ToolResult":
+        """Resultado sem itens (nada encontrado, parâmetro inválido, erro ao carregar os dados)."""
+        return cls(message=message)
+
+    def _columns(self, fields: Optional[Sequence[str]]):
+        if fields is None:
+            return self.columns
+        return tuple(column for column in self.columns if column.key in fields)
+
+    def _values(self, item: dict, columns, max_length: Optional[int]) -> List[str]:
+        values = []
+        for column in columns:
+            value = _truncate(item.get(column.key), max_length)
+            if isinstance(value, list):
+                values.append(f"{column.label} ({len(value)}): {', '.join(map(str, value)) or 'nenhum'}")
+            else:
+                values.append(f"{column.label}: {column.format(value)}")
+        return values
+
+    def _line(self, item: dict, columns, max_length: Optional[int]) -> str:
+        formatted = {column.key: column.format(_truncate(item.get(column.key), max_length)) for column in columns}
+        return self.line.format(**{**item, **formatted})
+
+    def _render_items(self, fields, max_length, block_separator: str) -> List[str]:
+        if not self.items:
+            return [self.message or ""]
+        columns = self._columns(fields)
+        suffix = "\n---" if self.separator and block_separator == "\n" else ""
+        parts = [self.header] if self.header else []
+        for item in self.items:
+            if "error" in item:
+                text = item["error"]
+            elif self.line:
+                text = self._line(item, columns, max_length).replace("\n", block_separator)
+            else:
+                text = block_separator.join(self._values(item, columns, max_length))
+            parts.append(text + suffix)
+        return parts
+
+    def to_text(self, fields: Optional[Sequence[str]] = None, max_length: Optional[int] = None) -> str:
+        """Texto completo, um bloco "Rótulo: valor" (ou uma linha) por item."""
+        return '\n'.join(self._render_items(fields, max_length, "\n"))
+
+    def to_llm(self, fields: Optional[Sequence[str]] = None, max_length: Optional[int] = LLM_MAX_LENGTH) -> str:
+        """Forma compacta para o modelo: uma linha por item e textos longos truncados."""
+        return '\n'.join(self._render_items(fields, max_length, "; "))
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None, max_length: Optional[int] = None) -> dict:
+        data = {}
+        if self.degraded:
+            data["degraded"] = True
+        if self.message and not self.items:
+            data["message"] = self.message
+        if self.header:
+            data["header"] = self.header
+        keys = None if fields is None else set(fields) | {"id", "error"}
+        data["count"] = len(self.items)
+        data["items"] = [
+            {key: _truncate(value, max_length) for key, value in item.items() if keys is None or key in keys}
+            for item in self.items
+        ]
+        return data
+
+    def to_json(self, fields: Optional[Sequence[str]] = None, max_length: Optional[int] = None) -> str:
+        return json.dumps(self.to_dict(fields, max_length), ensure_ascii=False)
+
+    def to_html(self, fields: Optional[Sequence[str]] = None, max_length: Optional[int] = HTML_MAX_LENGTH) -> str:
+        """Texto escapado para exibição dentro de um `<pre>`, com os rótulos em negrito."""
+        if not self.items or self.line:
+            return html.escape(self.to_text(fields, max_length))
+        columns = self._columns(fields)
+        parts = [html.escape(self.header)] if self.header else []
+        for item in self.items:
+            if "error" in item:
+                text = html.escape(item["error"])
+            else:
+                lines = []
+                for value in self._values(item, columns, max_length):
+                    label, sep, rest = value.partition(":")
+                    lines.append(f"<strong>{html.escape(label + sep)}</strong>{html.escape(rest)}")
+                text = '\n'.join(lines)
+            parts.append(text + ("\n---" if self.separator else ""))
+        return '\n'.join(parts)
+
+    def render(self, format: str = "text", **options) -> str:
+        """Renderiza no formato informado (ver `RENDERERS`)."""
+        try:
+            renderer = RENDERERS[format]
+        except KeyError:
+            raise ValueError(f"Formato de resultado desconhecido: {format}") from None
+        return renderer(self, **options)
+
+    def __str__(self):
+        if self._text is None:
+            self._text = self.to_text()
+        return self._text
+
+    def __html__(self):
+        return self.to_html()
+
+    def __repr__(self):
+        return f"ToolResult(items={len(self.items)}, message={self.message!r})"
+
+RENDERERS: Dict[str, Callable[..., str]] = {
+    "text": ToolResult.to_text,
+    "llm": ToolResult.to_llm,
+    "json": ToolResult.to_json,
+    "html": ToolResult.to_html,
+}
+
+def register_renderer(name: str, renderer: Callable[..., str]):
+    """Registra um formato de saída: `renderer(result, **options)` retorna o texto renderizado."""
+    RENDERERS[name] = renderer
+
+def render(result, format: str = "text", **options) -> str:
+    """Renderiza um `ToolResult`; outros valores (ex: mensagens de erro em texto) viram `str`."""
+    if isinstance(result, ToolResult):
+        return result.render(format, **options)
+    return str(result)
+
+class lazy_render:
+    """
+    Adia `render` até o texto ser necessário, para argumentos de log:
+    `log.debug("Resultado: %s", lazy_render(result, "llm"))` não renderiza nada se o nível
+    DEBUG estiver desligado, e senão renderiza na thread de escrita dos logs.
+    """
+    __slots__ = ("result", "format", "options")
+
+    def __init__(self, result, format: str = "text", **options):
+        self.result = result
+        self.format = format
+        self.options = options
+
+    def __str__(self):
+        return render(self.result, self.format, **self.options)
@@ -0,0 +1,529 @@
+"""
+Rastreamento (tracing) das requisições, do Flask até a SWAPI.
+
+Cada requisição HTTP ganha um trace ID e um span raiz; cada camada abre spans filhos
+(nós do grafo, chamadas ao LLM, ferramentas, consultas aos caches e requisições HTTP à
+SWAPI) com `tracer.span(...)`. O span ativo fica num `contextvars.ContextVar`, então o
+rastreamento acompanha a requisição através das chamadas sem precisar passar nada como
+argumento; para trabalho enviado a outras threads, use `propagate(fn)`.
+
+Fora de um trace ativo (scripts, testes), `tracer.span` não registra nada e custa só a
+leitura do ContextVar.
+
+Os traces concluídos ficam num buffer em memória (para a página `/debug/trace/<id>`) e
+podem ser exportados no formato OTLP/JSON:
+
+- `TRACE_EXPORT_FILE=logs/traces.jsonl`: um objeto `{"resourceSpans": [...]}` por linha;
+- `TRACE_OTLP_ENDPOINT=http://localhost:4318/v1/traces`: POST para um coletor OpenTelemetry.
+"""
+import contextvars
+import functools
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from logger import setup_logger
+
+log = setup_logger('tracing')
+
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "swapi-mcp")
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+def _new_id(size: int) -> str:
+    return secrets.token_hex(size)
+
+def _plain(attributes: dict) -> dict:
+    # Valores formatados sob demanda (ex: os argumentos de uma ferramenta) viram texto só aqui
+    return {key: value if value is None or isinstance(value, (str, int, float, bool)) else str(value)
+            for key, value in attributes.items()}
+
+class Span:
+    """Uma operação medida: nome, início/fim (ns), atributos, status e posição no trace."""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes", "start_ns",
+                 "end_ns", "error", "_start_perf", "_tracer", "_local_root")
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str],
+                 kind: str = "internal", attributes: Optional[dict] = None, local_root: bool = False):
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+        self._start_perf = time.perf_counter_ns()
+        self._tracer = tracer
+        self._local_root = local_root
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        # Duração pelo relógio monotônico; o início fica no relógio de parede (para exportar)
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._start_perf)
+        self._tracer._on_end(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "kind": self.kind, "start_ns": self.start_ns, "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms, "attributes": _plain(self.attributes), "error": self.error,
+        }
+
+class _NoopSpan:
+    """Span usado fora de um trace: aceita as mesmas chamadas e não registra nada."""
+    __slots__ = ()
+    trace_id = span_id = parent_id = None
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    """Spans de um trace, na ordem em que terminaram."""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def root(self) -> Optional[Span]:
+        with self._lock:
+            spans = list(self.spans)
+        ids = {span.span_id for span in spans}
+        roots = [span for span in spans if span.parent_id not in ids]
+        return min(roots, key=lambda span: span.start_ns) if roots else None
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        return {"trace_id": self.trace_id, "spans": [span.to_dict() for span in spans]}
+
+class TraceStore:
+    """Últimos `max_traces` traces, em memória (os mais antigos são descartados)."""
+
+    def __init__(self, max_traces: int = 200):
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def trace(self, trace_id: str) -> Trace:
+        """Trace com o ID informado, criado no primeiro span."""
+        with self._lock:
+            trace = self._traces.get(trace_id)
+            if trace is None:
+                trace = self._traces[trace_id] = Trace(trace_id)
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            return trace
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def recent(self, limit: int = 50) -> List[Trace]:
+        with self._lock:
+            return list(reversed(self._traces.values()))[:limit]
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+def to_otlp(spans: List[Span], service_name: str = SERVICE_NAME) -> dict:
+    """Spans no formato OTLP/JSON (`ExportTraceServiceRequest`)."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+        "scopeSpans": [{
+            "scope": {"name": "tracing"},
+            "spans": [{
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                "name": span.name,
+                "kind": _OTLP_KINDS.get(span.kind, 1),
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                # 1 = OK, 2 = ERROR
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            } for span in spans],
+        }],
+    }]}
+
+class FileExporter:
+    """Grava cada trace concluído como uma linha OTLP/JSON num arquivo."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, spans: List[Span]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(to_otlp(spans), ensure_ascii=False) + "\n")
+
+class OTLPHttpExporter:
+    """Envia cada trace concluído a um coletor OTLP/HTTP (ex: `http://localhost:4318/v1/traces`)."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        import requests
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def export(self, spans: List[Span]):
+        response = self.session.post(self.endpoint, json=to_otlp(spans), timeout=self.timeout)
+        response.raise_for_status()
+
+class Tracer:
+    """
+    Cria os spans, mantém o span ativo e entrega os traces concluídos aos exportadores.
+
+    A exportação roda numa thread própria, para que gravar o arquivo ou enviar ao coletor
+    não atrase a resposta da requisição.
+    """
+
+    def __init__(self, store: TraceStore = None, exporters: List = None):
+        self.store = store or TraceStore()
+        self.exporters = list(exporters or [])
+        self._queue = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """Tracer com os exportadores configurados por `TRACE_EXPORT_FILE` e `TRACE_OTLP_ENDPOINT`."""
+        exporters = []
+        if os.getenv("TRACE_EXPORT_FILE"):
+            exporters.append(FileExporter(os.getenv("TRACE_EXPORT_FILE")))
+        if os.getenv("TRACE_OTLP_ENDPOINT"):
+            exporters.append(OTLPHttpExporter(os.getenv("TRACE_OTLP_ENDPOINT")))
+        return cls(TraceStore(int(os.getenv("TRACE_MAX_TRACES", "200"))), exporters)
+
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+
+    def start_span(self, name: str, kind: str = "internal", trace_id: str = None, parent_id: str = None,
+                   **attributes) -> Span:
+        """
+        Cria um span (sem ativá-lo). Sem `trace_id`, é filho do span ativo ou, se não houver
+        um, a raiz de um novo trace.
+        """
+        if trace_id is None:
+            parent = _current_span.get()
+            if parent is not None:
+                return Span(self, name, parent.trace_id, parent.span_id, kind, attributes)
+            trace_id = _new_id(16)
+        return Span(self, name, trace_id, parent_id, kind, attributes, local_root=True)
+
+    @contextmanager
+    def _activate(self, span: Span):
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def start_trace(self, name: str, kind: str = "server", trace_id: str = None, parent_id: str = None, **attributes):
+        """Context manager que inicia um trace (ou continua um trace remoto, com `trace_id`)."""
+        return self._activate(self.start_span(name, kind, trace_id or _new_id(16), parent_id, **attributes))
+
+    def span(self, name: str, kind: str = "internal", **attributes):
+        """Context manager de um span filho do span ativo; fora de um trace, não registra nada."""
+        if _current_span.get() is None:
+            return NOOP_SPAN
+        return self._activate(self.start_span(name, kind, **attributes))
+
+    def traced(self, name: str = None, kind: str = "internal"):
+        """Decorador: executa a função dentro de um span (por padrão, com o nome dela)."""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, kind):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _on_end(self, span: Span):
+        trace = self.store.trace(span.trace_id)
+        trace.add(span)
+        if span._local_root:
+            log.debug("Trace %s concluído: %s em %.1fms (%d spans)", span.trace_id, span.name, span.duration_ms, len(trace.spans))
+            if self.exporters:
+                self._export_queue().put(trace)
+
+    def _export_queue(self) -> queue.SimpleQueue:
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.SimpleQueue()
+                threading.Thread(target=self._export_worker, name="trace-exporter", daemon=True).start()
+            return self._queue
+
+    def _export_worker(self):
+        while True:
+            trace = self._queue.get()
+            with trace._lock:
+                spans = list(trace.spans)
+            for exporter in self.exporters:
+                try:
+                    exporter.export(spans)
+                except Exception as e:
+                    log.warning("Falha ao exportar o trace %s com %s: %s", trace.trace_id, type(exporter).__name__, e)
+
+tracer = Tracer.from_env()
+
+def current_span():
+    """Span ativo (ou None fora de um trace)."""
+    return _current_span.get()
+
+def propagate(fn: Callable) -> Callable:
+    """
+    Faz `fn` rodar no contexto de quem a envia, mesmo em outra thread (ex: funções enviadas
+    a um `ThreadPoolExecutor`, que não herdam o contexto de quem as envia): como filha do
+    span ativo agora e com os demais ContextVars (ex: o registro de falhas da SWAPI da
+    ferramenta em execução).
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # Uma cópia por execução: a mesma função pode rodar em várias threads ao mesmo tempo
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+def propagate_coroutine(awaitable):
+    """Versão de `propagate` para corrotinas enviadas a outro event loop (ex: `run_sync`)."""
+    context = contextvars.copy_context()
+
+    async def run():
+        # A task tem uma cópia própria do contexto: não é preciso restaurar os valores anteriores
+        for var, value in context.items():
+            var.set(value)
+        return await awaitable
+    return run()
+
+def _parse_traceparent(header: Optional[str]):
+    """Trace ID e span pai de um cabeçalho W3C `traceparent` (`00-<trace>-<span>-<flags>`)."""
+    parts = (header or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None, None
+
+def waterfall(trace: Trace) -> List[dict]:
+    """Spans em ordem de árvore, com profundidade e posição (%) na linha do tempo do trace."""
+    data = trace.to_dict()["spans"]
+    if not data:
+        return []
+    start = min(span["start_ns"] for span in data)
+    end = max(span["end_ns"] for span in data)
+    total = max(end - start, 1)
+    children: Dict[Optional[str], list] = {}
+    ids = {span["span_id"] for span in data}
+    for span in data:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+
+    rows = []
+    def visit(parent, depth):
+        for span in children.get(parent, ()):
+            rows.append({
+                **span,
+                "depth": depth,
+                "offset_ms": (span["start_ns"] - start) / 1e6,
+                "left": (span["start_ns"] - start) / total * 100,
+                "width": max((span["end_ns"] - span["start_ns"]) / total * 100, 0.2),
+            })
+            visit(span["span_id"], depth + 1)
+    visit(None, 0)
+    return rows
+
+WATERFALL_TEMPLATE = """<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>Trace {{ trace_id }}</title>
+<style>
+  body { font-family: sans-serif; margin: 24px; color: #222; }
+  table { border-collapse: collapse; width: 100%; font-size: 13px; }
+  td, th { padding: 3px 6px; border-bottom: 1px solid #eee; text-align: left; white-space: nowrap; }
+  td.bar { width: 55%; position: relative; }
+  .bar div { position: absolute; top: 5px; height: 12px; background: #4a7bd0; border-radius: 2px; }
+  .bar div.client { background: #d08a4a; }
+  .bar div.error { background: #c33; }
+  .attrs { color: #777; font-size: 11px; white-space: normal; }
+</style>
+</head>
+<body>
+<h2>Trace {{ trace_id }}</h2>
+{% if rows %}
+<p>{{ rows|length }} spans, {{ '%.1f'|format(rows[0].duration_ms or 0) }} ms · <a href="?format=json">JSON</a> · <a href="{{ url_for('debug_traces') }}">traces recentes</a></p>
+<table>
+  <tr><th>Span</th><th>Início (ms)</th><th>Duração (ms)</th><th></th></tr>
+  {% for row in rows %}
+  <tr>
+    <td style="padding-left: {{ 6 + row.depth * 16 }}px">{{ row.name }}
+      {% if row.attributes or row.error %}<div class="attrs">{% for key, value in row.attributes.items() %}{{ key }}={{ value }} {% endfor %}{{ row.error or '' }}</div>{% endif %}
+    </td>
+    <td>{{ '%.1f'|format(row.offset_ms) }}</td>
+    <td>{{ '%.1f'|format(row.duration_ms) }}</td>
+    <td class="bar"><div class="{{ row.kind }}{{ ' error' if row.error }}" style="left: {{ row.left }}%; width: {{ row.width }}%"></div></td>
+  </tr>
+  {% endfor %}
+</table>
+{% else %}
+<p>Trace não encontrado (os mais antigos são descartados). <a href="{{ url_for('debug_traces') }}">Traces recentes</a></p>
+{% endif %}
+</body>
+</html>
+"""
+
+TRACES_TEMPLATE = """<!DOCTYPE html>
+<html lang="pt-br">
+<head><meta charset="utf-8"><title>Traces recentes</title>
+<style>body { font-family: sans-serif; margin: 24px; } td, th { padding: 3px 8px; text-align: left; }</style>
+</head>
+<body>
+<h2>Traces recentes</h2>
+<table>
+  <tr><th>Trace</th><th>Raiz</th><th>Duração (ms)</th><th>Spans</th></tr>
+  {% for trace, root in traces %}
+  <tr>
+    <td><a href="{{ url_for('debug_trace', trace_id=trace.trace_id) }}">{{ trace.trace_id }}</a></td>
+    <td>{{ root.name if root else '' }}</td>
+    <td>{{ '%.1f'|format(root.duration_ms or 0) if root else '' }}</td>
+    <td>{{ trace.spans|length }}</td>
+  </tr>
+  {% endfor %}
+</table>
+</body>
+</html>
+"""
+
+# Rotas que não abrem um trace (a própria página de traces e a coleta de métricas)
+UNTRACED_PREFIXES = ("/debug/trace", "/metrics", "/static/")
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "sim", "on")
+
+def setup_tracing(app, debug_view: Optional[bool] = None, trust_traceparent: Optional[bool] = None):
+    """
+    Abre um trace para cada requisição de uma aplicação Flask; a resposta informa o ID no
+    cabeçalho `X-Trace-Id`.
+
+    Args:
+        debug_view: Adiciona `/debug/traces` (os traces recentes) e `/debug/trace/<id>` (o
+            waterfall de um trace; `?format=json` para os dados). Os spans trazem argumentos
+            das ferramentas e consultas dos usuários, então o padrão é desligado
+            (`TRACE_DEBUG_VIEW=1` liga).
+        trust_traceparent: Continua o trace do chamador indicado no cabeçalho W3C
+            `traceparent`. Só faz sentido atrás de chamadores confiáveis (um cliente poderia
+            anexar spans a um trace existente), então o padrão é desligado
+            (`TRACE_TRUST_TRACEPARENT=1` liga); sem ele, cada requisição abre um trace novo e
+            o cabeçalho recebido fica só como atributo.
+    """
+    from flask import g, jsonify, render_template_string, request
+
+    if debug_view is None:
+        debug_view = _env_flag("TRACE_DEBUG_VIEW")
+    if trust_traceparent is None:
+        trust_traceparent = _env_flag("TRACE_TRUST_TRACEPARENT")
+
+    @app.before_request
+    def _start_trace():
+        if request.path.startswith(UNTRACED_PREFIXES):
+            return
+        traceparent = request.headers.get("traceparent")
+        trace_id, parent_id = _parse_traceparent(traceparent) if trust_traceparent else (None, None)
+        route = request.url_rule.rule if request.url_rule else request.path
+        span = tracer.start_span(f"{request.method} {route}", "server", trace_id or _new_id(16), parent_id,
+                                 method=request.method, path=request.path)
+        if traceparent and trace_id is None:
+            span.set_attribute("caller_traceparent", traceparent)
+        g._trace_span = span
+        g._trace_token = _current_span.set(span)
+
+    @app.after_request
+    def _trace_response(response):
+        span = g.get("_trace_span")
+        if span is not None:
+            span.set_attribute("status", response.status_code)
+            response.headers["X-Trace-Id"] = span.trace_id
+        return response
+
+    @app.teardown_request
+    def _end_trace(error=None):
+        span = g.pop("_trace_span", None)
+        if span is None:
+            return
+        if error is not None:
+            span.record_error(error)
+        token = g.pop("_trace_token", None)
+        if token is not None:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Token criado em outro contexto: só descarta o span ativo
+                _current_span.set(None)
+        span.end()
+
+    if debug_view:
+        @app.route("/debug/traces")
+        def debug_traces():
+            traces = [(trace, trace.root) for trace in tracer.store.recent()]
+            return render_template_string(TRACES_TEMPLATE, traces=traces)
+
+        @app.route("/debug/trace/<trace_id>")
+        def debug_trace(trace_id):
+            trace = tracer.store.get(trace_id)
+            if request.args.get("format") == "json":
+                if trace is None:
+                    return jsonify({"error": "Trace não encontrado"}), 404
+                return jsonify(trace.to_dict())
+            rows = waterfall(trace) if trace else []
+            return render_template_string(WATERFALL_TEMPLATE, trace_id=trace_id, rows=rows), (200 if trace else 404)
+
+    return app
@@ -1,67 +1,94 @@
 
-import traceback
-from flask import Flask, request, render_template
+from flask import Flask, make_response, request, render_template
 from mcp_tools import MCPTools
 from tools import Tools
-from swapi_client import SwapiClient
-from logger import setup_logger
+from resource_registry import RESOURCES, tool_labels, tool_names
+from swapi_mirror import create_search_index, create_swapi_client
+from logger import SAMPLED, setup_logger
+from metrics import setup_metrics
+from tracing import setup_tracing
+from json_api import setup_json_api
+from response_cache import setup_response_cache
 
 class MCPApp:
     def __init__(self):
         self.app = Flask(__name__)
         self.logger = setup_logger('app')
-        swapi_client = SwapiClient()
-        tools = Tools(swapi_client)
+        swapi_client = create_swapi_client()
+        tools = Tools(swapi_client, search_index=create_search_index(swapi_client))
         self.mcp_tools = MCPTools(tools)
+        setup_metrics(self.app, swapi_client)
+        setup_tracing(self.app)
+        self.response_cache = setup_response_cache(self.app)
+        setup_json_api(self.app, self.mcp_tools, response_cache=self.response_cache)
         self.tools = {
             "search_characters": self.mcp_tools.search_characters,
             "search_planets": self.mcp_tools.search_planets,
             "search_films": self.mcp_tools.search_films,
             "get_character_by_id": lambda param: self.mcp_tools.get_character_by_id(int(param)),
-            "list_all_films": lambda param=None: self.mcp_tools.list_all_films()
+            "get_characters_by_ids": self.mcp_tools.get_characters_by_ids,
+            "list_all_films": lambda param=None: self.mcp_tools.list_all_films(),
+            "tallest_characters": lambda param=None: self.mcp_tools.tallest_characters(param or 10),
+            "average_mass_by_species": lambda param=None: self.mcp_tools.average_mass_by_species(),
+            "planets_with_population_above": self.mcp_tools.planets_with_population_above,
+            "common_characters_in_films": self.mcp_tools.common_characters_in_films,
+            "characters_from_planets_in_film": self.mcp_tools.characters_from_planets_in_film,
+            "co_appearances": self.mcp_tools.co_appearances
         }
+        # Ferramentas dos demais recursos, geradas a partir do registro
+        self.extra_tools = []
+        for spec in RESOURCES.values():
+            list_all = tool_names(spec)["list_all"]
+            for name, label in tool_labels(spec).items():
+                if name in self.tools:
+                    continue
+                if name == list_all:
+                    self.tools[name] = lambda param=None, method=getattr(self.mcp_tools, name): method()
+                else:
+                    self.tools[name] = getattr(self.mcp_tools, name)
+                self.extra_tools.append((name, label))
         self.setup_routes()
 
     def setup_routes(self):
         @self.app.route("/", methods=["GET", "POST"])
         def index():
-            response = None
-            selected_tool = None
-            
-            # Log de requisição HTTP recebida
+            # A consulta vem do formulário (POST) ou da URL (GET /?tool=...&param=...), que
+            # navegadores e proxies podem guardar
+            tool = request.values.get("tool")
+            param = request.values.get("param")
             client_ip = request.remote_addr
-            if request.method == "POST":
-                tool = request.form.get("tool")
-                param = request.form.get("param")
-                self.logger.info(
-                    f"Requisição HTTP recebida: POST /, "
-                    f"Tool: {tool}, Param: {param}, IP: {client_ip}"
-                )
-            else:
-                self.logger.info(f"Requisição HTTP recebida: GET /, IP: {client_ip}")
-            
-            if request.method == "POST":
-                tool = request.form.get("tool")
-                param = request.form.get("param")
-                selected_tool = tool
-                tools = self.tools.get(tool)
-                if tools:
-                    try:
-                        response = tools(param)
-                    except Exception as e:
-                        # Log detalhado do erro
-                        self.logger.error(
-                            f"Erro ao executar ferramenta '{tool}': {str(e)}\n"
-                            f"Traceback: {traceback.format_exc()}"
-                        )
-                        response = "Erro ao executar a ferramenta."
-                else:
-                    self.logger.warning(f"Tool não reconhecida: {tool}")
-                    response = "Tool não reconhecida."
-            return render_template("index.html", resposta=response, selected_tool=selected_tool)
+            self.logger.info(
+                "Requisição HTTP recebida: %s /, Tool: %s, Param: %s, IP: %s",
+                request.method, tool, param, client_ip, extra=SAMPLED
+            )
+            if not tool:
+                return render_template("index.html", resposta=None, selected_tool=None, extra_tools=self.extra_tools)
+            return self.response_cache.respond(("index", tool, param), lambda: self._render_result(tool, param))
+
+    def _render_result(self, tool, param):
+        """Executa a ferramenta e renderiza a página; páginas de erro ou incompletas não vão para o cache."""
+        error = False
+        tools = self.tools.get(tool)
+        if tools:
+            try:
+                response = tools(param)
+            except Exception as e:
+                # Log detalhado do erro
+                self.logger.error("Erro ao executar ferramenta '%s': %s", tool, e, exc_info=True)
+                response = "Erro ao executar a ferramenta."
+                error = True
+        else:
+            self.logger.warning("Tool não reconhecida: %s", tool)
+            response = "Tool não reconhecida."
+            error = True
+        page = make_response(render_template("index.html", resposta=response, selected_tool=tool, extra_tools=self.extra_tools))
+        # Falhas da SWAPI viram "não encontrado": essa resposta também não vai para o cache
+        page.cache_control.no_store = error or getattr(response, "degraded", False)
+        return page
 
     def run(self):
         self.logger.info("Iniciando servidor Flask na porta 5000")
+        self.logger.info("Servidor de desenvolvimento: para produção, use `python wsgi.py`")
         self.app.run(debug=True)
 
 if __name__ == "__main__":
@@ -0,0 +1,384 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Iterable, List, Optional, Type, TypeVar
+
+import httpx
+
+from logger import SAMPLED, setup_logger
+from metrics import UPSTREAM_BYTES, UPSTREAM_DURATION, UPSTREAM_REQUESTS
+from model import parse_model
+from swapi_cache import ModelCache, SwapiResponseCache, approximate_size
+from rate_limiter import AdaptiveRateLimiter
+from resilience import Resilience
+from singleflight import SingleFlight
+from swapi_client import TRUSTED_STATUSES, BatchResult, _QueryString, record_upstream_failure
+from tracing import propagate_coroutine, tracer
+
+class AsyncSwapiClient:
+    """
+    Versão assíncrona (asyncio) do `SwapiClient`.
+
+    Mantém o mesmo contrato de `fetch_swapi` / `fetch_swapi_by_id` (incluindo o parsing
+    para os modelos pydantic e o retorno `None` em caso de erro), mas as chamadas são
+    corrotinas e compartilham um único pool de conexões do `httpx.AsyncClient`.
+
+    Uma instância deve ser usada a partir de um único event loop: ou diretamente com
+    `await` dentro do loop do chamador, ou a partir de código síncrono via `run_sync`,
+    que usa um event loop interno rodando em uma thread dedicada.
+    """
+    SWAPI_BASE_URL = "https://swapi.dev/api"
+    T = TypeVar('T')
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, max_connections: int = 100,
+                 max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0,
+                 concurrency: int = 10, timeout: float = 10.0, cache=None,
+                 model_cache=None, single_flight=None, resilience=None, rate_limiter=None):
+        """
+        Args:
+            client: `httpx.AsyncClient` já configurado (substitui o pool padrão).
+            max_connections: Máximo de conexões simultâneas no pool.
+            max_keepalive_connections: Máximo de conexões ociosas mantidas abertas.
+            keepalive_expiry: Tempo (s) que uma conexão ociosa permanece aberta.
+            concurrency: Limite padrão de corrotinas simultâneas em `gather`.
+            timeout: Timeout (s) de cada requisição.
+            cache: `SwapiResponseCache` persistente (padrão: cache em disco em `cache/`;
+                `False` desativa).
+            model_cache: `ModelCache` em memória dos objetos de `fetch_swapi_by_id`
+                (padrão: um cache novo; `False` desativa).
+            single_flight: `SingleFlight` que agrupa requisições idênticas simultâneas
+                (padrão: um novo; `False` desativa). Pode ser compartilhado com um `SwapiClient`.
+            resilience: `Resilience` com retries, circuit breaker e hedge opcional
+                (padrão: retries e circuit breaker, sem hedge; `False` desativa).
+            rate_limiter: `AdaptiveRateLimiter` que limita a taxa e a concorrência das requisições
+                (padrão: 10 req/s e concorrência adaptativa; `False` desativa). Pode ser
+                compartilhado com um `SwapiClient` para respeitar um limite único.
+        """
+        self._client = client
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.logger = setup_logger('swapi_client')
+        if cache is None:
+            cache = SwapiResponseCache()
+        self.cache = cache or None
+        if model_cache is None:
+            model_cache = ModelCache()
+        self.model_cache = model_cache or None
+        if single_flight is None:
+            single_flight = SingleFlight()
+        self.single_flight = single_flight or None
+        if resilience is None:
+            resilience = Resilience(retry_exceptions=(httpx.TransportError,))
+        self.resilience = resilience or None
+        if rate_limiter is None:
+            rate_limiter = AdaptiveRateLimiter()
+        self.rate_limiter = rate_limiter or None
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Cria o `httpx.AsyncClient` sob demanda, já dentro do event loop em uso."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self._limits, timeout=self.timeout, verify=False)
+        return self._client
+
+    async def _send(self, endpoint: str, url: str, params=None, headers=None):
+        """Envia o GET pela camada de resiliência e pelo `rate_limiter` (ver `SwapiClient._send`)."""
+        async def send():
+            with tracer.span(f"GET {endpoint}", "client", url=url, conditional=bool(headers)) as span:
+                start = time.perf_counter()
+                try:
+                    response = await self._get_client().get(url, params=params, headers=headers)
+                except Exception:
+                    UPSTREAM_REQUESTS.labels(endpoint, "error").inc()
+                    raise
+                UPSTREAM_DURATION.labels(endpoint).observe(time.perf_counter() - start)
+                UPSTREAM_REQUESTS.labels(endpoint, str(response.status_code)).inc()
+                UPSTREAM_BYTES.labels(endpoint).inc(len(response.content))
+                span.set_attribute("status", response.status_code)
+                if self.resilience and response.status_code in self.resilience.retry.retry_statuses:
+                    response.raise_for_status()
+                return response
+
+        async def attempt():
+            if not self.rate_limiter:
+                return await send()
+            async with self.rate_limiter.alimit() as permit:
+                response = await send()
+                permit.status = response.status_code
+                return response
+
+        if not self.resilience:
+            return await attempt()
+        return await self.resilience.acall(endpoint, attempt)
+
+    async def _get_json(self, endpoint: str, url: str, params=None):
+        """Executa o GET agrupando chamadas idênticas simultâneas (ver `SwapiClient._get_json`)."""
+        if not self.single_flight:
+            return await self._fetch_json(endpoint, url, params)
+        key = SwapiResponseCache.make_key(url, params)
+        return await self.single_flight.do_async(key, lambda: self._fetch_json(endpoint, url, params))
+
+    async def _fetch_json(self, endpoint: str, url: str, params=None):
+        """
+        Executa o GET passando pelo cache persistente (ver `SwapiClient._fetch_json`).
+
+        As leituras e gravações no SQLite são bloqueantes (e esperam o lock do cache), então
+        rodam em threads via `asyncio.to_thread` para não travar o event loop.
+        """
+        cached = None
+        headers = None
+        if self.cache:
+            cache_key = self.cache.make_key(url, params)
+            with tracer.span("cache disk", key=cache_key) as span:
+                cached = await asyncio.to_thread(self.cache.get, cache_key)
+                span.set_attribute("result", "miss" if cached is None else "hit" if cached.fresh else "stale")
+            if cached and cached.fresh:
+                return "cache", json.loads(cached.body)
+            if cached:
+                headers = cached.conditional_headers()
+
+        response = await self._send(endpoint, url, params, headers)
+
+        if cached and response.status_code == 304:
+            refreshed = await asyncio.to_thread(self.cache.refresh, cache_key) or cached
+            return response.status_code, json.loads(refreshed.body)
+
+        response.raise_for_status()
+        data = response.json()
+        if self.cache:
+            await asyncio.to_thread(
+                self.cache.set, cache_key, endpoint, response.content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+        return response.status_code, data
+
+    async def fetch_swapi(self, endpoint: str, params=None, model: Type[T] = None) -> T:
+        url = f"{self.SWAPI_BASE_URL}/{endpoint}/"
+        start_time = time.time()
+
+        # Log da requisição MCP
+        self.logger.info("Requisição MCP (async) → GET %s%s", url, _QueryString(params), extra=SAMPLED)
+
+        try:
+            status, data = await self._get_json(endpoint, url, params)
+            elapsed_time = time.time() - start_time
+
+            # Log da resposta MCP
+            results_count = len(data.get('results', [])) if isinstance(data, dict) else 0
+            self.logger.info(
+                "Resposta MCP (async) ← Status: %s, Tempo: %.2fs, Resultados: %s",
+                status, elapsed_time, results_count, extra=SAMPLED
+            )
+
+            if model:
+                return parse_model(model, data, trusted=status in TRUSTED_STATUSES)
+            return data
+        except Exception as e:
+            elapsed_time = time.time() - start_time
+            self.logger.error(
+                "Erro ao buscar %s: %s, "
+                "Tempo decorrido: %.2fs",
+                endpoint, e, elapsed_time
+            )
+            record_upstream_failure(endpoint, e)
+            return None
+
+    async def fetch_swapi_by_id(self, endpoint: str, id: int, model: Type[T]) -> T:
+        try:
+            return await self._fetch_by_id(endpoint, id, model)
+        except Exception:
+            return None
+
+    async def _fetch_by_id(self, endpoint: str, id: int, model: Type[T]) -> T:
+        """Busca um recurso pelo ID; registra e propaga a exceção em caso de erro."""
+        if self.model_cache:
+            cache_key = (endpoint, id, model.__name__)
+            with tracer.span("cache model", endpoint=endpoint, id=id) as span:
+                cached = self.model_cache.get(cache_key)
+                span.set_attribute("result", "miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+
+        url = f"{self.SWAPI_BASE_URL}/{endpoint}/{id}/"
+        start_time = time.time()
+
+        # Log da requisição MCP
+        self.logger.info("Requisição MCP (async) → GET %s", url, extra=SAMPLED)
+
+        try:
+            status, data = await self._get_json(endpoint, url)
+            elapsed_time = time.time() - start_time
+
+            # Log da resposta MCP
+            self.logger.info(
+                "Resposta MCP (async) ← Status: %s, Tempo: %.2fs, Endpoint: %s/%s",
+                status, elapsed_time, endpoint, id, extra=SAMPLED
+            )
+
+            result = parse_model(model, data, trusted=status in TRUSTED_STATUSES)
+            if self.model_cache:
+                self.model_cache.set(cache_key, result, size=approximate_size(result))
+            return result
+        except Exception as e:
+            elapsed_time = time.time() - start_time
+            self.logger.error(
+                "Erro ao buscar %s com ID %s: %s, "
+                "Tempo decorrido: %.2fs",
+                endpoint, id, e, elapsed_time
+            )
+            record_upstream_failure(endpoint, e)
+            raise
+
+    async def iter_pages(self, endpoint: str, params=None, max_concurrency: int = 4) -> AsyncIterator[dict]:
+        """
+        Itera (async) sobre todas as páginas de um endpoint, na ordem.
+
+        Mesma estratégia de `SwapiClient.iter_pages`: lê `count` na primeira página e
+        baixa as restantes em paralelo, com no máximo `max_concurrency` simultâneas.
+        """
+        params = dict(params or {})
+        first_page = await self.fetch_swapi(endpoint, params=params)
+        if not first_page:
+            return
+        yield first_page
+
+        page_size = len(first_page.get('results', []))
+        if not page_size or not first_page.get('next'):
+            return
+        total_pages = math.ceil(first_page.get('count', 0) / page_size)
+        if total_pages <= 1:
+            return
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _fetch_page(page):
+            async with semaphore:
+                return await self.fetch_swapi(endpoint, {**params, "page": page})
+
+        tasks = [asyncio.ensure_future(_fetch_page(page)) for page in range(2, total_pages + 1)]
+        try:
+            for task in tasks:
+                page_data = await task
+                if page_data:
+                    yield page_data
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_all_pages(self, endpoint: str, params=None, model: Type[T] = None,
+                              max_concurrency: int = 4) -> T:
+        """Busca todas as páginas de um endpoint e junta os resultados (ver `SwapiClient.fetch_all_pages`)."""
+        results = []
+        count = None
+        async for page_data in self.iter_pages(endpoint, params=params, max_concurrency=max_concurrency):
+            if count is None:
+                count = page_data.get('count', 0)
+            results.extend(page_data.get('results', []))
+        if count is None:
+            return None
+
+        if len(results) != count:
+            # Página que falhou ou veio curta: um resultado parcial passaria por completo
+            self.logger.warning(
+                "Paginação incompleta em %s: %s de %s resultados", endpoint, len(results), count
+            )
+            record_upstream_failure(endpoint, RuntimeError(f"paginação incompleta ({len(results)} de {count})"))
+            return None
+        data = {"count": count, "next": None, "previous": None, "results": results}
+        if model:
+            return parse_model(model, data)
+        return data
+
+    async def fetch_many_by_id(self, endpoint: str, ids: Iterable[int], model: Type[T],
+                               max_concurrency: int = None) -> List[BatchResult]:
+        """Busca vários recursos pelo ID de uma só vez (ver `SwapiClient.fetch_many_by_id`)."""
+        ids = list(ids)
+        resolved = {}
+        missing = []
+        for id in dict.fromkeys(ids):
+            cached = self.model_cache.get((endpoint, id, model.__name__)) if self.model_cache else None
+            if cached is not None:
+                resolved[id] = BatchResult(id, cached)
+            else:
+                missing.append(id)
+
+        async def _fetch(id):
+            try:
+                return BatchResult(id, await self._fetch_by_id(endpoint, id, model))
+            except Exception as e:
+                return BatchResult(id, error=str(e))
+
+        for batch_result in await self.gather([_fetch(id) for id in missing], limit=max_concurrency):
+            resolved[batch_result.id] = batch_result
+        return [resolved[id] for id in ids]
+
+    async def gather(self, awaitables: Iterable[Awaitable], limit: int = None,
+                     return_exceptions: bool = True) -> List:
+        """
+        Aguarda várias corrotinas com concorrência limitada.
+
+        Os resultados são devolvidos na mesma ordem de `awaitables`.
+
+        Args:
+            awaitables: Corrotinas a executar (ex: `client.fetch_swapi_by_id(...)`).
+            limit: Máximo de corrotinas em execução ao mesmo tempo (padrão: `self.concurrency`).
+            return_exceptions: Se True, exceções são devolvidas na lista em vez de propagadas.
+        """
+        semaphore = asyncio.Semaphore(limit or self.concurrency)
+
+        async def _bounded(awaitable):
+            async with semaphore:
+                return await awaitable
+
+        return await asyncio.gather(
+            *(_bounded(awaitable) for awaitable in awaitables),
+            return_exceptions=return_exceptions
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Inicia (uma única vez) o event loop interno usado por `run_sync`."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="async-swapi-client", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def run_sync(self, awaitable: Awaitable[T]) -> T:
+        """
+        Executa uma corrotina no event loop interno e aguarda o resultado.
+
+        Permite que código síncrono (ex: threads do Flask) use o cliente assíncrono:
+        todas as chamadas compartilham o mesmo loop e o mesmo pool de conexões.
+        """
+        # O span ativo acompanha a corrotina até o event loop interno
+        return asyncio.run_coroutine_threadsafe(propagate_coroutine(awaitable), self._ensure_loop()).result()
+
+    async def aclose(self):
+        """Fecha as conexões abertas do pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def close(self):
+        """Fecha o pool e encerra o event loop interno, se houver."""
+        if self._loop is None:
+            return
+        self.run_sync(self.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._loop = None
+        self._loop_thread = None
@@ -0,0 +1,78 @@
+"""
+Mede a vazão (requisições/s) e a latência de um servidor HTTP em execução.
+
+Serve para comparar o servidor de desenvolvimento do Flask (`python app.py`) com o de
+produção (`python wsgi.py`): suba um deles e rode o benchmark contra a mesma URL.
+
+Uso:
+    python benchmark_http.py http://127.0.0.1:5000/ --clients 16 --duration 10
+    python benchmark_http.py http://127.0.0.1:5000/ --data "tool=search_characters&param=luke"
+"""
+import argparse
+import threading
+import time
+from urllib.parse import parse_qsl
+
+import requests
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def run(url: str, clients: int, duration: float, data: dict = None) -> dict:
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        nonlocal errors
+        # Uma sessão (conexão keep-alive) por cliente, como um navegador
+        session = requests.Session()
+        own_latencies = []
+        own_errors = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.post(url, data=data, timeout=30) if data else session.get(url, timeout=30)
+                if response.status_code >= 400:
+                    own_errors += 1
+                else:
+                    own_latencies.append(time.perf_counter() - start)
+            except requests.RequestException:
+                own_errors += 1
+        with lock:
+            latencies.extend(own_latencies)
+            errors += own_errors
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start_time
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão de um servidor HTTP")
+    parser.add_argument("url")
+    parser.add_argument("--clients", type=int, default=16, help="Clientes simultâneos")
+    parser.add_argument("--duration", type=float, default=10, help="Duração em segundos")
+    parser.add_argument("--data", help="Formulário enviado via POST (ex: 'tool=search_characters&param=luke')")
+    args = parser.parse_args()
+
+    result = run(args.url, args.clients, args.duration, dict(parse_qsl(args.data)) if args.data else None)
+    print(f"{result['requests']} requisições ({result['errors']} erros): {result['rps']:.1f} req/s, "
+          f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+
+if __name__ == "__main__":
+    main()
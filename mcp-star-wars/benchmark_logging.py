@@ -0,0 +1,130 @@
+"""
+Compara o custo de logging por requisição antes e depois da fila assíncrona do `logger.py`.
+
+Cada "requisição" registra as mesmas linhas de uma chamada de ferramenta da interface web
+(requisição HTTP, chamada da ferramenta, requisição e resposta da SWAPI, sucesso e o
+resultado em DEBUG). Cenários:
+
+- antes: handlers síncronos de console e arquivo em cada logger e mensagens formatadas
+  com f-strings na hora (inclusive o resultado em DEBUG);
+- depois: `build_pipeline` (fila + thread de escrita) com argumentos formatados só na
+  gravação, com `LOG_LEVEL` DEBUG e INFO e com amostragem das linhas INFO.
+
+"µs/req" é o tempo gasto na thread da requisição; "µs/req total" inclui esperar a thread
+de escrita esvaziar a fila (o custo total de CPU do logging).
+
+Uso:
+    python benchmark_logging.py
+    python benchmark_logging.py --requests 20000 --threads 8
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import RotatingFileHandler
+
+from logger import SAMPLED, SamplingFilter, build_pipeline
+from tool_result import Column, ToolResult, lazy_render
+
+LOGGER_NAMES = ("benchmark_app", "benchmark_mcp_tools", "benchmark_swapi_client")
+
+def sample_result() -> ToolResult:
+    columns = (Column("name", "Nome"), Column("height", "Altura", "{}cm"), Column("mass", "Massa", "{}kg"),
+               Column("films", "Filmes"))
+    items = [{"name": f"Personagem {i}", "height": "172", "mass": "77", "films": ["A New Hope", "Return of the Jedi"]}
+             for i in range(10)]
+    return ToolResult(items, columns)
+
+def request_before(loggers, result, url: str):
+    app, tools, client = loggers
+    app.info(f"Requisição HTTP recebida: POST /, Tool: search_characters, Param: luke, IP: 127.0.0.1")
+    tools.info(f"Ferramenta MCP chamada: search_characters({'luke'})")
+    client.info(f"Requisição MCP → GET {url}?search=luke")
+    client.info(f"Resposta MCP ← Status: {200}, Tempo: {0.0123:.2f}s, Resultados: {10}")
+    tools.info(f"Ferramenta MCP executada com sucesso: search_characters, Tempo: {0.0150:.2f}s")
+    tools.debug(f"Resultado da ferramenta search_characters: {result.to_llm()}")
+
+def request_after(loggers, result, url: str):
+    app, tools, client = loggers
+    app.info("Requisição HTTP recebida: POST /, Tool: %s, Param: %s, IP: %s",
+             "search_characters", "luke", "127.0.0.1", extra=SAMPLED)
+    tools.info("Ferramenta MCP chamada: %s(%s)", "search_characters", "luke", extra=SAMPLED)
+    client.info("Requisição MCP → GET %s%s", url, "?search=luke", extra=SAMPLED)
+    client.info("Resposta MCP ← Status: %s, Tempo: %.2fs, Resultados: %s", 200, 0.0123, 10, extra=SAMPLED)
+    tools.info("Ferramenta MCP executada com sucesso: %s, Tempo: %.2fs", "search_characters", 0.0150, extra=SAMPLED)
+    tools.debug("Resultado da ferramenta %s: %s", "search_characters", lazy_render(result, "llm"))
+
+def _logger(name: str, handlers, level: int) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = list(handlers)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+def _run(request, loggers, requests: int, threads: int) -> float:
+    """Executa as requisições e retorna o tempo gasto nas threads que fazem o log."""
+    result = sample_result()
+    url = "https://swapi.dev/api/people/"
+    start_time = time.perf_counter()
+    if threads == 1:
+        for _ in range(requests):
+            request(loggers, result, url)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda _: request(loggers, result, url), range(requests)))
+    return time.perf_counter() - start_time
+
+def bench_before(directory: str, console, requests: int, threads: int) -> float:
+    formatter = logging.Formatter('[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    handlers = []
+    loggers = []
+    # Antes, cada logger tinha o seu próprio par de handlers, todos no mesmo arquivo
+    for name in LOGGER_NAMES:
+        console_handler = logging.StreamHandler(console)
+        console_handler.setLevel(logging.INFO)
+        file_handler = RotatingFileHandler(os.path.join(directory, "before.log"), maxBytes=10*1024*1024,
+                                           backupCount=5, encoding='utf-8')
+        file_handler.setLevel(logging.DEBUG)
+        for handler in (console_handler, file_handler):
+            handler.setFormatter(formatter)
+            handlers.append(handler)
+        loggers.append(_logger(name, [console_handler, file_handler], logging.DEBUG))
+    elapsed = _run(request_before, loggers, requests, threads)
+    for handler in handlers:
+        handler.close()
+    return elapsed
+
+def bench_after(directory: str, console, requests: int, threads: int,
+                level: int = logging.DEBUG, sample_rate: float = 1.0) -> float:
+    handler, listener = build_pipeline(os.path.join(directory, "after.log"), stream=console)
+    handler.filters = [SamplingFilter(sample_rate)]
+    loggers = [_logger(name, [handler], level) for name in LOGGER_NAMES]
+    elapsed = _run(request_after, loggers, requests, threads)
+    # Espera a thread de escrita gravar o que ainda está na fila
+    listener.stop()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do logging por requisição")
+    parser.add_argument("--requests", type=int, default=10000, help="Requisições simuladas por cenário")
+    parser.add_argument("--threads", type=int, default=1, help="Threads fazendo requisições em paralelo")
+    args = parser.parse_args()
+
+    scenarios = [
+        ("antes (síncrono, f-strings)", lambda d, c: bench_before(d, c, args.requests, args.threads)),
+        ("depois (fila, DEBUG)", lambda d, c: bench_after(d, c, args.requests, args.threads)),
+        ("depois (fila, INFO)", lambda d, c: bench_after(d, c, args.requests, args.threads, logging.INFO)),
+        ("depois (fila, INFO, amostra 0.1)", lambda d, c: bench_after(d, c, args.requests, args.threads, logging.INFO, 0.1)),
+    ]
+    print(f"{'cenário':<34} {'µs/req':>8} {'µs/req total':>13}")
+    for name, scenario in scenarios:
+        with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as console:
+            start_time = time.perf_counter()
+            in_request = scenario(directory, console)
+            total = time.perf_counter() - start_time
+        print(f"{name:<34} {in_request / args.requests * 1e6:>8.1f} {total / args.requests * 1e6:>13.1f}")
+
+if __name__ == "__main__":
+    main()
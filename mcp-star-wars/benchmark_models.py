@@ -0,0 +1,108 @@
+"""
+Compara o custo de conversão e o tamanho em memória dos modelos da SWAPI.
+
+Mede, para `people`, `planets` e `films`, os modelos pydantic atuais (com e sem
+validação) e os modelos compactos (`*Record`, com e sem validação).
+
+Uso:
+    python benchmark_models.py                       # registros sintéticos
+    python benchmark_models.py --snapshot data/swapi_snapshot.json.gz
+"""
+import argparse
+import time
+import tracemalloc
+
+from model import Films, FilmsRecord, People, PeopleRecord, Planets, PlanetsRecord, parse_model
+
+MODELS = {
+    "people": (People, PeopleRecord),
+    "planets": (Planets, PlanetsRecord),
+    "films": (Films, FilmsRecord),
+}
+
+def _url(endpoint: str, id: int) -> str:
+    return f"https://swapi.dev/api/{endpoint}/{id}/"
+
+def sample_records(endpoint: str, count: int = 100) -> list:
+    """Registros sintéticos no formato da SWAPI."""
+    records = []
+    for i in range(1, count + 1):
+        common = {"created": "2014-12-09T13:50:51.644000Z", "edited": "2014-12-20T21:17:56.891000Z", "url": _url(endpoint, i)}
+        if endpoint == "people":
+            records.append({
+                "name": f"Personagem {i}", "height": "172", "mass": "77", "hair_color": "blond",
+                "skin_color": "fair", "eye_color": "blue", "birth_year": "19BBY", "gender": "male",
+                "homeworld": _url("planets", i % 60 + 1), "films": [_url("films", f) for f in range(1, 5)],
+                "species": [], "vehicles": [_url("vehicles", 14)], "starships": [_url("starships", 12)], **common,
+            })
+        elif endpoint == "planets":
+            records.append({
+                "name": f"Planeta {i}", "diameter": "10465", "rotation_period": "23", "orbital_period": "304",
+                "gravity": "1 standard", "population": "200000", "climate": "arid", "terrain": "desert",
+                "surface_water": "1", "residents": [_url("people", p) for p in range(1, 11)],
+                "films": [_url("films", f) for f in range(1, 6)], **common,
+            })
+        else:
+            records.append({
+                "title": f"Filme {i}", "episode_id": i, "opening_crawl": "It is a period of civil war. " * 20,
+                "director": "George Lucas", "producer": "Gary Kurtz, Rick McCallum", "release_date": "1977-05-25",
+                "species": [_url("species", s) for s in range(1, 6)], "starships": [_url("starships", s) for s in range(2, 10)],
+                "vehicles": [_url("vehicles", v) for v in range(4, 9)], "characters": [_url("people", p) for p in range(1, 19)],
+                "planets": [_url("planets", p) for p in range(1, 4)], **common,
+            })
+    return records
+
+def time_per_object(build, records, repeat: int) -> float:
+    """Tempo médio (µs) para converter um registro."""
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for record in records:
+            build(record)
+        best = min(best, time.perf_counter() - start_time)
+    return best / len(records) * 1e6
+
+def bytes_per_object(build, records) -> float:
+    """Memória alocada por objeto (em bytes), sem contar o dicionário de origem."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [build(record) for record in records]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+    return allocated / len(records)
+
+def run(resources: dict, repeat: int):
+    print(f"{'recurso':<8} {'modelo':<34} {'µs/objeto':>10} {'bytes/objeto':>13}")
+    for endpoint, records in resources.items():
+        if not records:
+            continue
+        model, record_model = MODELS[endpoint]
+        variants = [
+            (f"{model.__name__}.model_validate", lambda r: parse_model(model, r)),
+            (f"{model.__name__}.model_construct", lambda r: parse_model(model, r, trusted=True)),
+            (f"{record_model.__name__}.model_validate", lambda r: parse_model(record_model, r)),
+            (f"{record_model.__name__}.from_trusted", lambda r: parse_model(record_model, r, trusted=True)),
+        ]
+        for name, build in variants:
+            print(f"{endpoint:<8} {name:<34} {time_per_object(build, records, repeat):>10.2f} "
+                  f"{bytes_per_object(build, records):>13.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos modelos da SWAPI")
+    parser.add_argument("--snapshot", help="Usa os registros de um snapshot do espelho local")
+    parser.add_argument("--count", type=int, default=500, help="Registros sintéticos por recurso")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições (vale o melhor tempo)")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        from swapi_mirror import SwapiSnapshot
+        snapshot = SwapiSnapshot.load(args.snapshot)
+        resources = {endpoint: snapshot.records(endpoint) for endpoint in MODELS}
+    else:
+        resources = {endpoint: sample_records(endpoint, args.count) for endpoint in MODELS}
+    run(resources, args.repeat)
+
+if __name__ == "__main__":
+    main()
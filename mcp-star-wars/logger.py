@@ -1,47 +1,189 @@
+import atexit
+import itertools
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import warnings
+from typing import Tuple
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-def setup_logger(name: str = __name__):
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOG_DIR = os.path.join(os.path.dirname(__file__), 'logs')
+LOG_FILE = os.path.join(LOG_DIR, 'app.log')
+
+# Marca linhas INFO de alto volume (uma por requisição à SWAPI, por exemplo) como amostráveis:
+#     log.info("Requisição → GET %s", url, extra=SAMPLED)
+SAMPLED = {"sampled": True}
+
+# Atributos padrão de um LogRecord; o resto veio de `extra=` e vai para os logs em JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sampled"}
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por evento, com os campos passados em `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
     """
-    Configura e retorna um logger com formatação padronizada e rotação de arquivos.
-    
-    Args:
-        name: Nome do módulo que está usando o logger
-        
+    Mantém 1 de cada `1 / rate` linhas INFO marcadas com `SAMPLED` (avisos e erros nunca
+    são descartados). A amostragem é determinística e contada por mensagem (logger e
+    template): com `rate=0.1`, de cada tipo de linha passa a 1ª, a 11ª, ...
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else None
+        self._counters = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.INFO or not getattr(record, "sampled", False) or self.every == 1:
+            return True
+        if self.every is None:
+            return False
+        counter = self._counters.get((record.name, record.msg))
+        if counter is None:
+            counter = self._counters.setdefault((record.name, record.msg), itertools.count())
+        return next(counter) % self.every == 0
+
+class _InterProcessLock:
+    """Lock exclusivo entre processos, baseado num arquivo (`flock` no POSIX, `msvcrt` no Windows)."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'a+b')
+
+    def __enter__(self):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+class ProcessSafeRotatingFileHandler(RotatingFileHandler):
+    """
+    `RotatingFileHandler` que pode ser usado por vários processos no mesmo arquivo.
+
+    Cada escrita (e a rotação) acontece sob um lock de arquivo compartilhado (`app.log.lock`);
+    o tamanho é medido no próprio arquivo, e não na posição do stream deste processo, e o
+    arquivo é reaberto quando outro processo já o rotacionou.
+    """
+
+    def __init__(self, filename: str, *args, **kwargs):
+        super().__init__(filename, *args, **kwargs)
+        self._process_lock = _InterProcessLock(self.baseFilename + '.lock')
+
+    def reopen(self):
+        """
+        Reabre o arquivo e o lock (usado no processo filho após um fork): o `flock` vale por
+        descrição de arquivo aberto, então um lock herdado do pai não excluiria o pai.
+        """
+        self._process_lock = _InterProcessLock(self.baseFilename + '.lock')
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = self._open()
+
+    def _current_size(self) -> int:
+        """Tamanho do arquivo ativo, reabrindo-o se outro processo o rotacionou (ou removeu)."""
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        if self.stream is not None:
+            opened = os.fstat(self.stream.fileno())
+            if current is not None and (current.st_ino, current.st_dev) == (opened.st_ino, opened.st_dev):
+                return current.st_size
+            self.stream.close()
+        self.stream = self._open()
+        return os.fstat(self.stream.fileno()).st_size
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = self.format(record) + self.terminator
+            with self._process_lock:
+                size = self._current_size()
+                if self.maxBytes > 0 and size and size + len(message.encode(self.encoding or 'utf-8')) >= self.maxBytes:
+                    self.doRollover()
+                self.stream.write(message)
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+class _LazyQueueHandler(QueueHandler):
+    """
+    Envia o próprio LogRecord para a fila, sem formatá-lo.
+
+    O `QueueHandler` padrão formata a mensagem na thread que fez o log (para que o registro
+    possa ser serializado entre processos); como a fila aqui é local ao processo, a
+    formatação (`msg % args`) fica para a thread de escrita.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+_pipeline_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+
+def _log_level(name: str, default: str) -> int:
+    """Nível da variável de ambiente `name`; um valor desconhecido (ex: erro de digitação) usa `default`."""
+    value = os.getenv(name, default).strip().upper()
+    levels = logging.getLevelNamesMapping()
+    level = levels.get(value)
+    if level is None:
+        warnings.warn(f"{name}={value!r} não é um nível de log válido; usando {default}", RuntimeWarning, stacklevel=2)
+        level = levels[default]
+    return level
+
+def build_pipeline(log_file: str = LOG_FILE, stream=None) -> Tuple[QueueHandler, QueueListener]:
+    """
+    Cria a fila e a thread que escreve no console (`stream`, padrão stderr) e em `log_file`.
+
     Returns:
-        Logger configurado
+        O handler que enfileira os registros e o `QueueListener` (já iniciado) que os grava
     """
-    logger = logging.getLogger(name)
-    
-    # Evitar duplicação de handlers para não registrar logs múltiplos
-    if logger.handlers:
-        return logger
-    
-    logger.setLevel(logging.DEBUG)
-    
     # Formato padrão: [timestamp] [nível] [módulo] mensagem
     formatter = logging.Formatter(
         '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
-    # --- Handler para console (saída padrão) ---
-    console_handler = logging.StreamHandler()
+
+    # --- Handler para console (saída de erro padrão) ---
+    console_handler = logging.StreamHandler(stream)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # --- Handler para arquivo com rotação ---
-    # Criar diretório de logs se não existir
-    log_dir = os.path.join(os.path.dirname(__file__), 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    log_file = os.path.join(log_dir, 'app.log')
-    
-    # Usar o handler padrão do Python com rotação de arquivo.
-    # Ele rotaciona o log quando atinge 10MB e mantém 5 arquivos de backup.
-    file_handler = RotatingFileHandler(
+
+    # --- Handler para arquivo com rotação, compartilhado por todos os loggers e processos ---
+    # Rotaciona o log quando atinge 10MB e mantém 5 arquivos de backup.
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    file_handler = ProcessSafeRotatingFileHandler(
         log_file,
         mode='a',
         maxBytes=10*1024*1024, # 10 MB
@@ -49,8 +191,82 @@ def setup_logger(name: str = __name__):
         encoding='utf-8'
     )
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
-    return logger
+    file_handler.setFormatter(JsonFormatter() if os.getenv("LOG_FORMAT", "").lower() == "json" else formatter)
+
+    handler = _LazyQueueHandler(queue.SimpleQueue())
+    handler.addFilter(SamplingFilter(float(os.getenv("LOG_INFO_SAMPLE_RATE", "1"))))
+    listener = QueueListener(handler.queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    return handler, listener
+
+def shutdown_logging():
+    """Para a thread de escrita depois de gravar o que ainda está na fila."""
+    global _listener
+    with _pipeline_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+def _stop_before_fork():
+    # A thread de escrita não existe no processo filho: esvazia a fila e a para antes do fork
+    _pipeline_lock.acquire()
+    if _listener is not None:
+        _listener.stop()
+
+def _restart_after_fork(child: bool):
+    try:
+        if _listener is not None:
+            if child:
+                for handler in _listener.handlers:
+                    if isinstance(handler, ProcessSafeRotatingFileHandler):
+                        handler.reopen()
+            _listener.start()
+    finally:
+        _pipeline_lock.release()
+
+# Ex: workers do gunicorn com `preload_app`, criados por fork depois que os loggers já existem
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_stop_before_fork,
+        after_in_parent=lambda: _restart_after_fork(child=False),
+        after_in_child=lambda: _restart_after_fork(child=True),
+    )
+
+def setup_logger(name: str = __name__):
+    """
+    Configura e retorna um logger com formatação padronizada e rotação de arquivos.
 
+    Todos os loggers compartilham uma única fila: a thread que faz o log só enfileira o
+    registro, e uma thread de escrita formata e grava no console (INFO e acima) e em
+    `logs/app.log` (a partir de `LOG_LEVEL`, padrão DEBUG). Variáveis de ambiente:
+
+    - `LOG_LEVEL`: nível mínimo registrado (mensagens abaixo dele nem são formatadas).
+    - `LOG_FORMAT=json`: grava o arquivo em JSON, uma linha por evento.
+    - `LOG_INFO_SAMPLE_RATE`: fração das linhas INFO de alto volume (marcadas com
+      `SAMPLED`) que são mantidas, ex: `0.1`.
+
+    Args:
+        name: Nome do módulo que está usando o logger
+
+    Returns:
+        Logger configurado
+    """
+    global _queue_handler, _listener
+    logger = logging.getLogger(name)
+
+    # Evitar duplicação de handlers para não registrar logs múltiplos
+    if logger.handlers:
+        return logger
+
+    with _pipeline_lock:
+        if _queue_handler is None or _listener is None:
+            _queue_handler, _listener = build_pipeline()
+            # Esvazia a fila antes de o processo terminar
+            atexit.register(shutdown_logging)
+
+    logger.setLevel(_log_level("LOG_LEVEL", "DEBUG"))
+    logger.addHandler(_queue_handler)
+    # Os registros já chegam ao arquivo pela fila; não repassa para os handlers do logger raiz
+    logger.propagate = False
+
+    return logger
@@ -0,0 +1,241 @@
+"""
+Servidor MCP (Model Context Protocol) das ferramentas da SWAPI, via JSON-RPC 2.0.
+
+Expõe todas as ferramentas do `MCPTools` com seus schemas (`tools/list`) e as executa
+(`tools/call`), sem passar pela interface web. Dois transportes:
+
+- stdio: uma mensagem JSON por linha na entrada/saída padrão (os logs vão para stderr).
+  As requisições de uma mesma conexão são executadas em paralelo e as respostas são
+  enviadas assim que ficam prontas, identificadas pelo `id`.
+- HTTP ("streamable HTTP"): `POST /mcp` com uma mensagem ou um lote; a resposta vem como
+  `application/json`.
+
+Lotes JSON-RPC (uma lista de mensagens) são aceitos nos dois transportes: as chamadas do
+lote rodam em paralelo e as respostas voltam na ordem das requisições.
+
+Uso:
+    python mcp_server.py                               # stdio
+    python mcp_server.py --http --host 127.0.0.1 --port 8000
+"""
+import argparse
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from logger import setup_logger
+from mcp_tools import MCPTools
+from metrics import setup_metrics
+from swapi_mirror import create_search_index, create_swapi_client
+from tool_registry import ToolArgumentsError, registry
+from tool_result import ToolResult, render
+from tools import Tools
+from tracing import propagate, setup_tracing, tracer
+
+log = setup_logger('mcp_server')
+
+SERVER_NAME = "swapi-mcp"
+SERVER_VERSION = "1.0.0"
+# Versões do protocolo suportadas, da mais recente para a mais antiga
+PROTOCOL_VERSIONS = ("2025-06-18", "2025-03-26", "2024-11-05")
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+class JsonRpcError(Exception):
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+def _error(id, code: int, message: str, data: Any = None) -> dict:
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": id, "error": error}
+
+class MCPServer:
+    """
+    Atende as mensagens JSON-RPC do MCP, independente do transporte.
+
+    `handle` recebe uma mensagem já decodificada (objeto ou lote) e retorna a resposta, ou
+    None para notificações. As chamadas de um lote rodam no pool `max_workers`.
+    """
+
+    def __init__(self, mcp_tools: MCPTools = None, max_workers: int = 16):
+        if mcp_tools is None:
+            swapi_client = create_swapi_client()
+            mcp_tools = MCPTools(Tools(swapi_client, search_index=create_search_index(swapi_client)))
+        self.mcp_tools = mcp_tools
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-call")
+        self._methods = {
+            "initialize": self._initialize,
+            "ping": lambda params: {},
+            "tools/list": self._list_tools,
+            "tools/call": self._call_tool,
+        }
+
+    def _tool_schemas(self):
+        return [schema for schema in registry.json_schemas() if hasattr(self.mcp_tools, schema["name"])]
+
+    def _initialize(self, params: dict) -> dict:
+        requested = params.get("protocolVersion")
+        version = requested if requested in PROTOCOL_VERSIONS else PROTOCOL_VERSIONS[0]
+        client = params.get("clientInfo") or {}
+        log.info("Cliente MCP conectado: %s %s (protocolo %s)", client.get('name', 'desconhecido'), client.get('version', ''), version)
+        return {
+            "protocolVersion": version,
+            "capabilities": {"tools": {"listChanged": False}},
+            "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION},
+        }
+
+    def _list_tools(self, params: dict) -> dict:
+        return {"tools": self._tool_schemas()}
+
+    def _call_tool(self, params: dict) -> dict:
+        name = params.get("name")
+        arguments = params.get("arguments") or {}
+        schema = registry.get(name) if isinstance(name, str) else None
+        if schema is None or not hasattr(self.mcp_tools, name):
+            raise JsonRpcError(INVALID_PARAMS, f"Ferramenta desconhecida: {name}")
+        if not isinstance(arguments, dict):
+            raise JsonRpcError(INVALID_PARAMS, "Os argumentos da ferramenta devem ser um objeto.")
+        try:
+            arguments = schema.validate(arguments)
+        except ToolArgumentsError as e:
+            raise JsonRpcError(INVALID_PARAMS, str(e), e.details())
+        try:
+            result = getattr(self.mcp_tools, name)(**arguments)
+        except Exception as e:
+            # Erros de execução voltam como resultado, para que o cliente (ou o modelo) possa reagir
+            return {"content": [{"type": "text", "text": f"Erro ao executar a ferramenta '{name}': {e}"}], "isError": True}
+        response = {"content": [{"type": "text", "text": render(result)}], "isError": False}
+        if isinstance(result, ToolResult):
+            response["structuredContent"] = result.to_dict()
+        return response
+
+    def _handle_one(self, message) -> Optional[dict]:
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" or not isinstance(message.get("method"), str):
+            return _error(message.get("id") if isinstance(message, dict) else None, INVALID_REQUEST, "Requisição inválida")
+        is_notification = "id" not in message
+        id = message.get("id")
+        method = message["method"]
+        params = message.get("params") or {}
+        if is_notification:
+            # Notificações (ex: notifications/initialized, notifications/cancelled) não têm resposta
+            log.debug("Notificação MCP recebida: %s", method)
+            return None
+        handler = self._methods.get(method)
+        if handler is None:
+            return _error(id, METHOD_NOT_FOUND, f"Método não encontrado: {method}")
+        if not isinstance(params, dict):
+            return _error(id, INVALID_PARAMS, "Os parâmetros devem ser um objeto.")
+        try:
+            with tracer.span(f"MCP {method}", id=str(id)):
+                return {"jsonrpc": "2.0", "id": id, "result": handler(params)}
+        except JsonRpcError as e:
+            return _error(id, e.code, e.message, e.data)
+        except Exception as e:
+            log.error("Erro ao processar o método MCP %s: %s", method, e, exc_info=True)
+            return _error(id, INTERNAL_ERROR, "Erro interno do servidor")
+
+    def handle(self, message):
+        """Processa uma mensagem ou um lote; retorna a resposta (lista, para lotes) ou None."""
+        if isinstance(message, list):
+            if not message:
+                return _error(None, INVALID_REQUEST, "Lote vazio")
+            responses = list(self._executor.map(propagate(self._handle_one), message))
+            return [response for response in responses if response is not None] or None
+        return self._handle_one(message)
+
+    def handle_text(self, text: str) -> Optional[str]:
+        """Versão de `handle` para mensagens em texto (JSON)."""
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return json.dumps(_error(None, PARSE_ERROR, "JSON inválido"), ensure_ascii=False)
+        response = self.handle(message)
+        return None if response is None else json.dumps(response, ensure_ascii=False)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+def serve_stdio(server: MCPServer, stdin=None, stdout=None, max_concurrency: int = 32):
+    """
+    Transporte stdio: lê uma mensagem por linha e responde em paralelo.
+
+    Cada linha é processada num pool próprio (separado do pool das chamadas em lote), então
+    uma chamada lenta não bloqueia as demais. As escritas na saída são serializadas.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    write_lock = threading.Lock()
+
+    def process(line: str):
+        # Sem requisição HTTP, cada mensagem recebida via stdio abre o seu próprio trace
+        with tracer.start_trace("MCP stdio"):
+            response = server.handle_text(line)
+        if response is not None:
+            with write_lock:
+                stdout.write(response + "\n")
+                stdout.flush()
+
+    log.info("Servidor MCP aguardando mensagens via stdio")
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="mcp-stdio") as executor:
+        for line in stdin:
+            if line.strip():
+                executor.submit(process, line)
+    server.shutdown()
+
+def create_http_app(server: MCPServer, allowed_origins=("http://localhost", "http://127.0.0.1")):
+    """
+    Transporte HTTP: `POST /mcp` recebe uma mensagem ou um lote e responde em JSON; as
+    métricas ficam em `GET /metrics` e os traces em `GET /debug/traces`.
+
+    Requisições com cabeçalho `Origin` fora de `allowed_origins` são recusadas (proteção
+    contra DNS rebinding, exigida pela especificação).
+    """
+    from flask import Flask, Response, request
+
+    app = Flask(__name__)
+    setup_metrics(app, getattr(server.mcp_tools.tools, "swapi", None))
+    setup_tracing(app)
+
+    @app.route("/mcp", methods=["POST", "GET", "DELETE"])
+    def mcp():
+        origin = request.headers.get("Origin")
+        if origin and not any(origin == allowed or origin.startswith(allowed + ":") for allowed in allowed_origins):
+            log.warning("Requisição MCP recusada da origem %s", origin)
+            return Response(status=403)
+        if request.method != "POST":
+            # Sem sessões nem stream SSE iniciado pelo servidor
+            return Response(status=405, headers={"Allow": "POST"})
+        response = server.handle_text(request.get_data(as_text=True))
+        if response is None:
+            return Response(status=202)
+        return Response(response, mimetype="application/json")
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor MCP das ferramentas da SWAPI")
+    parser.add_argument("--http", action="store_true", help="Usa o transporte HTTP em vez de stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=16, help="Chamadas de ferramentas em paralelo por lote")
+    args = parser.parse_args()
+
+    server = MCPServer(max_workers=args.workers)
+    if args.http:
+        log.info("Servidor MCP HTTP em http://%s:%s/mcp", args.host, args.port)
+        create_http_app(server).run(host=args.host, port=args.port, threaded=True)
+    else:
+        serve_stdio(server)
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -51,8 +52,211 @@ class Films(BaseModel):
     created: str
     edited: str
 
+class Species(BaseModel):
+    name: str
+    classification: str
+    designation: str
+    average_height: str
+    skin_colors: str
+    hair_colors: str
+    eye_colors: str
+    average_lifespan: str
+    homeworld: Optional[str]
+    language: str
+    people: List[str]
+    films: List[str]
+    url: str
+    created: str
+    edited: str
+
+class Vehicles(BaseModel):
+    name: str
+    model: str
+    manufacturer: str
+    cost_in_credits: str
+    length: str
+    max_atmosphering_speed: str
+    crew: str
+    passengers: str
+    cargo_capacity: str
+    consumables: str
+    vehicle_class: str
+    pilots: List[str]
+    films: List[str]
+    url: str
+    created: str
+    edited: str
+
+class Starships(BaseModel):
+    name: str
+    model: str
+    manufacturer: str
+    cost_in_credits: str
+    length: str
+    max_atmosphering_speed: str
+    crew: str
+    passengers: str
+    cargo_capacity: str
+    consumables: str
+    hyperdrive_rating: str
+    MGLT: str
+    starship_class: str
+    pilots: List[str]
+    films: List[str]
+    url: str
+    created: str
+    edited: str
+
 class SearchResponse(BaseModel):
     count: int
     next: Optional[str]
     previous: Optional[str]
-    results: List
\ No newline at end of file
+    results: List
+SWAPI_BASE_URL = "https://swapi.dev/api"
+
+# As mesmas URLs (filmes, planetas, ...) se repetem em muitos registros: a conversão é memorizada
+@lru_cache(maxsize=8192)
+def _id_from_url(url: str) -> int:
+    return int(url.rstrip('/').rsplit('/', 1)[1])
+
+def _ids_from_urls(urls) -> tuple:
+    return tuple(map(_id_from_url, urls))
+
+class CompactModel:
+    """
+    Base dos modelos compactos (`__slots__`, referências como IDs inteiros).
+
+    Cada subclasse declara `ENDPOINT`, os campos simples com seus tipos em `FIELDS` e os
+    campos de referência (URLs da SWAPI) em `REFS` (URL única) e `REF_LISTS` (lista de URLs),
+    mapeados para o endpoint referenciado. `model_validate` confere os tipos; `from_trusted`
+    é o caminho rápido, sem validação, para dados de origem confiável (cache ou espelho local).
+    """
+    __slots__ = ("id",)
+    ENDPOINT = ""
+    FIELDS = {}
+    REFS = {}
+    REF_LISTS = {}
+
+    @classmethod
+    def from_trusted(cls, data: dict):
+        obj = cls.__new__(cls)
+        for field in cls.FIELDS:
+            setattr(obj, field, data[field])
+        for field in cls.REFS:
+            url = data[field]
+            setattr(obj, field, _id_from_url(url) if url else None)
+        for field in cls.REF_LISTS:
+            setattr(obj, field, _ids_from_urls(data[field]))
+        obj.id = _id_from_url(data["url"])
+        return obj
+
+    @classmethod
+    def model_validate(cls, data: dict):
+        if not isinstance(data, dict):
+            raise ValueError(f"{cls.__name__}: esperado um dicionário, recebido {type(data).__name__}")
+        if data.get("url") is None:
+            raise ValueError(f"{cls.__name__}.url: campo obrigatório")
+        for field, field_type in cls.FIELDS.items():
+            if not isinstance(data.get(field), field_type):
+                raise ValueError(f"{cls.__name__}.{field}: esperado {field_type.__name__}, recebido {data.get(field)!r}")
+        for field in ("url", *cls.REFS):
+            value = data.get(field)
+            if value is not None and not (isinstance(value, str) and value.rstrip('/').rsplit('/', 1)[-1].isdigit()):
+                raise ValueError(f"{cls.__name__}.{field}: URL inválida {value!r}")
+        for field in cls.REF_LISTS:
+            urls = data.get(field)
+            if not isinstance(urls, list) or not all(isinstance(url, str) and url.rstrip('/').rsplit('/', 1)[-1].isdigit() for url in urls):
+                raise ValueError(f"{cls.__name__}.{field}: esperada uma lista de URLs, recebido {urls!r}")
+        return cls.from_trusted(data)
+
+    @property
+    def url(self) -> str:
+        return f"{SWAPI_BASE_URL}/{self.ENDPOINT}/{self.id}/"
+
+    def model_dump(self) -> dict:
+        """Retorna o registro no formato original da SWAPI (referências como URLs)."""
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        for field, endpoint in self.REFS.items():
+            id = getattr(self, field)
+            data[field] = f"{SWAPI_BASE_URL}/{endpoint}/{id}/" if id is not None else None
+        for field, endpoint in self.REF_LISTS.items():
+            data[field] = [f"{SWAPI_BASE_URL}/{endpoint}/{id}/" for id in getattr(self, field)]
+        data["url"] = self.url
+        return data
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(
+            getattr(self, field) == getattr(other, field) for field in ("id", *self.__slots__)
+        )
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id}, {next(iter(self.FIELDS))}={getattr(self, next(iter(self.FIELDS)))!r})"
+
+class PeopleRecord(CompactModel):
+    __slots__ = ("name", "height", "mass", "hair_color", "skin_color", "eye_color", "birth_year", "gender",
+                 "created", "edited", "homeworld", "films", "species", "vehicles", "starships")
+    ENDPOINT = "people"
+    FIELDS = {"name": str, "height": str, "mass": str, "hair_color": str, "skin_color": str, "eye_color": str,
+              "birth_year": str, "gender": str, "created": str, "edited": str}
+    REFS = {"homeworld": "planets"}
+    REF_LISTS = {"films": "films", "species": "species", "vehicles": "vehicles", "starships": "starships"}
+
+class PlanetsRecord(CompactModel):
+    __slots__ = ("name", "diameter", "rotation_period", "orbital_period", "gravity", "population", "climate",
+                 "terrain", "surface_water", "created", "edited", "residents", "films")
+    ENDPOINT = "planets"
+    FIELDS = {"name": str, "diameter": str, "rotation_period": str, "orbital_period": str, "gravity": str,
+              "population": str, "climate": str, "terrain": str, "surface_water": str, "created": str, "edited": str}
+    REF_LISTS = {"residents": "people", "films": "films"}
+
+class FilmsRecord(CompactModel):
+    __slots__ = ("title", "episode_id", "opening_crawl", "director", "producer", "release_date", "created",
+                 "edited", "species", "starships", "vehicles", "characters", "planets")
+    ENDPOINT = "films"
+    FIELDS = {"title": str, "episode_id": int, "opening_crawl": str, "director": str, "producer": str,
+              "release_date": str, "created": str, "edited": str}
+    REF_LISTS = {"species": "species", "starships": "starships", "vehicles": "vehicles",
+                 "characters": "people", "planets": "planets"}
+
+class SpeciesRecord(CompactModel):
+    __slots__ = ("name", "classification", "designation", "average_height", "skin_colors", "hair_colors",
+                 "eye_colors", "average_lifespan", "language", "created", "edited", "homeworld", "people", "films")
+    ENDPOINT = "species"
+    FIELDS = {"name": str, "classification": str, "designation": str, "average_height": str, "skin_colors": str,
+              "hair_colors": str, "eye_colors": str, "average_lifespan": str, "language": str, "created": str, "edited": str}
+    REFS = {"homeworld": "planets"}
+    REF_LISTS = {"people": "people", "films": "films"}
+
+class VehiclesRecord(CompactModel):
+    __slots__ = ("name", "model", "manufacturer", "cost_in_credits", "length", "max_atmosphering_speed", "crew",
+                 "passengers", "cargo_capacity", "consumables", "vehicle_class", "created", "edited", "pilots", "films")
+    ENDPOINT = "vehicles"
+    FIELDS = {"name": str, "model": str, "manufacturer": str, "cost_in_credits": str, "length": str,
+              "max_atmosphering_speed": str, "crew": str, "passengers": str, "cargo_capacity": str,
+              "consumables": str, "vehicle_class": str, "created": str, "edited": str}
+    REF_LISTS = {"pilots": "people", "films": "films"}
+
+class StarshipsRecord(CompactModel):
+    __slots__ = ("name", "model", "manufacturer", "cost_in_credits", "length", "max_atmosphering_speed", "crew",
+                 "passengers", "cargo_capacity", "consumables", "hyperdrive_rating", "MGLT", "starship_class",
+                 "created", "edited", "pilots", "films")
+    ENDPOINT = "starships"
+    FIELDS = {"name": str, "model": str, "manufacturer": str, "cost_in_credits": str, "length": str,
+              "max_atmosphering_speed": str, "crew": str, "passengers": str, "cargo_capacity": str,
+              "consumables": str, "hyperdrive_rating": str, "MGLT": str, "starship_class": str,
+              "created": str, "edited": str}
+    REF_LISTS = {"pilots": "people", "films": "films"}
+
+def parse_model(model, data, trusted: bool = False):
+    """
+    Converte `data` para `model`.
+
+    Com `trusted=True` (dados vindos do cache ou do espelho local, gravados a partir de
+    respostas da própria SWAPI) usa o caminho rápido sem validação: `from_trusted` nos modelos compactos e
+    `model_construct` nos modelos pydantic.
+    """
+    if not trusted:
+        return model.model_validate(data)
+    if hasattr(model, "from_trusted"):
+        return model.from_trusted(data)
+    return model.model_construct(**data)
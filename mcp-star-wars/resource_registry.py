@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from model import FilmsRecord, PeopleRecord, PlanetsRecord, SpeciesRecord, StarshipsRecord, VehiclesRecord
+from tool_result import Column
+
+@dataclass(frozen=True)
+class ResourceSpec:
+    """
+    Descrição declarativa de um recurso da SWAPI.
+
+    As ferramentas de busca, consulta por ID, consulta em lote e listagem de cada recurso
+    são geradas a partir daqui (ver `tools.py`) e usam o mesmo caminho de busca (índice
+    local, cache, pool de conexões e paginação em paralelo).
+
+    Attributes:
+        endpoint: Recurso na API (ex: "people").
+        model: Modelo usado na consulta por ID e em lote.
+        singular / plural: Nomes usados nas ferramentas (ex: `search_characters`, `get_character_by_id`).
+        label / label_plural: Nome do recurso nas mensagens (ex: "personagem").
+        feminine: Se o nome do recurso é feminino ("nenhuma espécie encontrada").
+        search_field / search_label: Campo usado na busca e seu nome nas mensagens.
+        display_fields: `(campo, rótulo, formato)` exibidos para cada registro.
+        references: `(campo, rótulo)` das referências exibidas, já resolvidas, na consulta por ID.
+        sort_field / sort_label: Ordenação da listagem completa (padrão: ordem da API).
+    """
+    endpoint: str
+    model: type
+    singular: str
+    plural: str
+    label: str
+    label_plural: str
+    search_field: str
+    search_label: str
+    display_fields: Tuple[Tuple[str, str, str], ...]
+    references: Tuple[Tuple[str, str], ...] = ()
+    feminine: bool = False
+    sort_field: Optional[str] = None
+    sort_label: Optional[str] = None
+
+    def article(self, masculine: str, feminine: str) -> str:
+        """Escolhe a palavra concordando com o gênero do recurso."""
+        return feminine if self.feminine else masculine
+
+    def columns(self, detail: bool = False) -> Tuple[Column, ...]:
+        """Colunas exibidas de cada registro; `detail` inclui as referências resolvidas."""
+        columns = tuple(Column(*field) for field in self.display_fields)
+        if detail:
+            columns += tuple(Column(field, label) for field, label in self.references)
+        return columns
+
+RESOURCES: Dict[str, ResourceSpec] = {spec.endpoint: spec for spec in (
+    ResourceSpec(
+        endpoint="people", model=PeopleRecord, singular="character", plural="characters",
+        label="personagem", label_plural="personagens", search_field="name", search_label="nome",
+        display_fields=(
+            ("name", "Nome", "{}"), ("height", "Altura", "{}cm"), ("mass", "Massa", "{}kg"),
+            ("hair_color", "Cor do Cabelo", "{}"), ("eye_color", "Cor dos Olhos", "{}"),
+            ("birth_year", "Ano de Nascimento", "{}"), ("gender", "Gênero", "{}"),
+        ),
+        references=(("homeworld", "Mundo Natal"), ("films", "Filmes")),
+    ),
+    ResourceSpec(
+        endpoint="planets", model=PlanetsRecord, singular="planet", plural="planets",
+        label="planeta", label_plural="planetas", search_field="name", search_label="nome",
+        display_fields=(
+            ("name", "Nome", "{}"), ("climate", "Clima", "{}"), ("terrain", "Terreno", "{}"),
+            ("population", "População", "{}"), ("diameter", "Diâmetro", "{}km"),
+            ("rotation_period", "Período de Rotação", "{}h"), ("orbital_period", "Período Orbital", "{} dias"),
+        ),
+        references=(("residents", "Residentes"), ("films", "Filmes")),
+    ),
+    ResourceSpec(
+        endpoint="films", model=FilmsRecord, singular="film", plural="films",
+        label="filme", label_plural="filmes", search_field="title", search_label="título",
+        display_fields=(
+            ("title", "Título", "{}"), ("episode_id", "Episódio", "{}"), ("director", "Diretor", "{}"),
+            ("producer", "Produtor", "{}"), ("release_date", "Data de Lançamento", "{}"),
+            ("opening_crawl", "Abertura", "{}"),
+        ),
+        references=(("characters", "Personagens"), ("planets", "Planetas")),
+        sort_field="episode_id", sort_label="episódio",
+    ),
+    ResourceSpec(
+        endpoint="species", model=SpeciesRecord, singular="species", plural="species",
+        label="espécie", label_plural="espécies", search_field="name", search_label="nome", feminine=True,
+        display_fields=(
+            ("name", "Nome", "{}"), ("classification", "Classificação", "{}"), ("designation", "Designação", "{}"),
+            ("average_height", "Altura Média", "{}cm"), ("average_lifespan", "Expectativa de Vida", "{} anos"),
+            ("language", "Idioma", "{}"),
+        ),
+        references=(("homeworld", "Planeta Natal"), ("people", "Personagens")),
+    ),
+    ResourceSpec(
+        endpoint="vehicles", model=VehiclesRecord, singular="vehicle", plural="vehicles",
+        label="veículo", label_plural="veículos", search_field="name", search_label="nome",
+        display_fields=(
+            ("name", "Nome", "{}"), ("model", "Modelo", "{}"), ("manufacturer", "Fabricante", "{}"),
+            ("vehicle_class", "Classe", "{}"), ("cost_in_credits", "Custo", "{} créditos"),
+            ("length", "Comprimento", "{}m"), ("crew", "Tripulação", "{}"), ("passengers", "Passageiros", "{}"),
+        ),
+        references=(("pilots", "Pilotos"), ("films", "Filmes")),
+    ),
+    ResourceSpec(
+        endpoint="starships", model=StarshipsRecord, singular="starship", plural="starships",
+        label="nave estelar", label_plural="naves estelares", search_field="name", search_label="nome", feminine=True,
+        display_fields=(
+            ("name", "Nome", "{}"), ("model", "Modelo", "{}"), ("manufacturer", "Fabricante", "{}"),
+            ("starship_class", "Classe", "{}"), ("cost_in_credits", "Custo", "{} créditos"),
+            ("length", "Comprimento", "{}m"), ("crew", "Tripulação", "{}"), ("passengers", "Passageiros", "{}"),
+            ("hyperdrive_rating", "Classe do Hiperpropulsor", "{}"), ("MGLT", "MGLT", "{}"),
+        ),
+        references=(("pilots", "Pilotos"), ("films", "Filmes")),
+    ),
+)}
+
+def tool_names(spec: ResourceSpec) -> Dict[str, str]:
+    """Nomes das ferramentas geradas para um recurso, por tipo de operação."""
+    return {
+        "search": f"search_{spec.plural}",
+        "get_by_id": f"get_{spec.singular}_by_id",
+        "get_by_ids": f"get_{spec.plural}_by_ids",
+        "list_all": f"list_all_{spec.plural}",
+    }
+
+def tool_labels(spec: ResourceSpec) -> Dict[str, str]:
+    """Descrições curtas das ferramentas geradas, usadas na interface web."""
+    names = tool_names(spec)
+    return {
+        names["search"]: f"Buscar {spec.label}",
+        names["get_by_id"]: f"Buscar {spec.label} por ID",
+        names["get_by_ids"]: f"Buscar {spec.article('vários', 'várias')} {spec.label_plural} por ID (ex: 1,2,3)",
+        names["list_all"]: f"Listar {spec.article('todos os', 'todas as')} {spec.label_plural}",
+    }
+
+def generated_tool_names():
+    """Todas as ferramentas geradas a partir do registro, na ordem dos recursos."""
+    return [name for spec in RESOURCES.values() for name in tool_names(spec).values()]
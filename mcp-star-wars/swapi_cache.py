@@ -0,0 +1,343 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+from urllib.parse import urlencode
+
+from logger import setup_logger
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), 'cache')
+
+# TTLs padrão (em segundos) por endpoint. Os dados da SWAPI praticamente não mudam.
+DEFAULT_TTLS = {
+    "films": 7 * 24 * 3600,
+    "people": 24 * 3600,
+    "planets": 24 * 3600,
+    "species": 24 * 3600,
+    "vehicles": 24 * 3600,
+    "starships": 24 * 3600,
+}
+
+# A cada quantas gravações o total em bytes é recontado no banco (outros processos também gravam)
+SIZE_RESYNC_WRITES = 100
+
+@dataclass
+class CachedResponse:
+    """Entrada do cache persistente."""
+    key: str
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    ttl: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.stored_at + self.ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Cabeçalhos para revalidar a entrada com um GET condicional."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class SwapiResponseCache:
+    """
+    Cache persistente (SQLite) das respostas da SWAPI, chaveado por URL + parâmetros.
+
+    - Cada endpoint tem seu próprio TTL (`ttls`); entradas expiradas continuam no disco
+      e são revalidadas com ETag / Last-Modified.
+    - O tamanho total é limitado por `max_bytes`, com remoção das entradas menos usadas (LRU).
+    - Seguro para uso entre threads (uma conexão protegida por lock) e entre processos
+      (locking do próprio SQLite em modo WAL).
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = 50 * 1024 * 1024,
+                 ttls: Dict[str, float] = None, default_ttl: float = 24 * 3600):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'swapi_cache.sqlite3')
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.logger = setup_logger('swapi_cache')
+
+        self._lock = threading.Lock()
+        self._inherited_conns = []
+        self._conn = self._connect()
+        _open_caches.add(self)
+        # Total em bytes mantido a cada `set`, para não somar a tabela inteira em toda gravação
+        self._total_bytes = None
+        self._writes_since_resync = 0
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "revalidated": 0,
+            "bytes_read": 0,
+            "bytes_written": 0,
+            "evictions": 0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        return conn
+
+    def _after_fork(self):
+        """
+        Abre uma conexão própria no processo filho.
+
+        Uma conexão SQLite não pode ser usada nos dois lados de um fork. A herdada não é
+        fechada (o fechamento poderia fazer checkpoint do WAL em uso pelo pai): só deixa
+        de ser usada.
+        """
+        self._lock = threading.Lock()
+        self._inherited_conns.append(self._conn)
+        self._conn = self._connect()
+        self._total_bytes = None
+
+    @staticmethod
+    def make_key(url: str, params=None) -> str:
+        """Chave do cache: URL + parâmetros em ordem canônica."""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted((str(k), str(v)) for k, v in params.items()))}"
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Retorna a entrada do cache (fresca ou expirada) ou None.
+
+        Uma entrada expirada deve ser revalidada pelo chamador (`conditional_headers`)
+        e renovada com `refresh` ou substituída com `set`.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT endpoint, body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            entry = self._to_entry(key, row)
+            if entry.fresh:
+                self._stats["hits"] += 1
+                self._stats["bytes_read"] += len(entry.body)
+            else:
+                self._stats["stale"] += 1
+            return entry
+
+    def set(self, key: str, endpoint: str, body: bytes, etag: str = None, last_modified: str = None):
+        """Grava (ou substitui) a resposta no cache e aplica o limite de tamanho."""
+        now = time.time()
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, endpoint, body, etag, last_modified, stored_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, etag, last_modified, now, now, len(body))
+            )
+            self._stats["bytes_written"] += len(body)
+            if self._total_bytes is not None:
+                self._total_bytes += len(body) - (replaced[0] if replaced else 0)
+            self._evict()
+
+    def refresh(self, key: str) -> Optional[CachedResponse]:
+        """Renova o TTL de uma entrada após um `304 Not Modified` e a retorna."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key)
+            )
+            row = self._conn.execute(
+                "SELECT endpoint, body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._stats["revalidated"] += 1
+            self._stats["bytes_read"] += len(row[1])
+            return self._to_entry(key, row)
+
+    def _to_entry(self, key: str, row) -> CachedResponse:
+        endpoint, body, etag, last_modified, stored_at = row
+        return CachedResponse(key, bytes(body), etag, last_modified, stored_at, self.ttl_for(endpoint))
+
+    def _sum_sizes(self) -> int:
+        self._writes_since_resync = 0
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        """
+        Remove as entradas menos usadas até o cache caber em `max_bytes`. Requer o lock.
+
+        Usa o total mantido por `set` e só recorre ao `SUM(size)` a cada `SIZE_RESYNC_WRITES`
+        gravações (para contar as de outros processos) ou quando o limite é ultrapassado.
+        """
+        self._writes_since_resync += 1
+        if self._total_bytes is None or self._writes_since_resync >= SIZE_RESYNC_WRITES:
+            self._total_bytes = self._sum_sizes()
+        if self._total_bytes <= self.max_bytes:
+            return
+        total = self._sum_sizes()
+        if total <= self.max_bytes:
+            self._total_bytes = total
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self._total_bytes = total
+        self._stats["evictions"] += len(evicted)
+        self.logger.debug("Cache SWAPI: %s entradas removidas (LRU)", len(evicted))
+
+    def invalidate(self, endpoint: str = None):
+        """Remove todas as entradas (ou apenas as de um endpoint)."""
+        with self._lock:
+            if endpoint:
+                self._conn.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+            else:
+                self._conn.execute("DELETE FROM responses")
+            self._total_bytes = None
+
+    def get_stats(self) -> dict:
+        """Retorna métricas de acerto/erro e bytes do cache."""
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {**self._stats, "entries": entries, "total_bytes": total_bytes}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# Caches abertos neste processo, reabertos nos processos filhos (ex: workers do gunicorn)
+_open_caches = weakref.WeakSet()
+
+def _reopen_after_fork():
+    for cache in list(_open_caches):
+        cache._after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reopen_after_fork)
+
+def approximate_size(obj) -> int:
+    """Estimativa (em bytes) do tamanho de um objeto e do que ele referencia."""
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(approximate_size(k) + approximate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(approximate_size(item) for item in obj)
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + approximate_size(vars(obj))
+    slots = [slot for cls in type(obj).__mro__ for slot in getattr(cls, "__slots__", ())]
+    return sys.getsizeof(obj) + sum(approximate_size(getattr(obj, slot, None)) for slot in slots)
+
+class ModelCache:
+    """
+    Cache em memória (LRU + TTL) de objetos já convertidos para os modelos, seguro entre threads.
+
+    Limitado pelo número de entradas (`max_entries`) e pelo tamanho aproximado em bytes
+    (`max_bytes`); as entradas menos usadas são removidas primeiro.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # chave -> (objeto, tamanho, expira_em)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o objeto em cache ou None (ausente ou expirado)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            value, size, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, size: int = None):
+        """Armazena o objeto, removendo os menos usados se os limites forem excedidos."""
+        if size is None:
+            size = approximate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats["evictions"] += 1
+
+    def _remove(self, key: Hashable):
+        """Remove uma entrada. Requer o lock."""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, endpoint: str = None, id: int = None):
+        """
+        Remove entradas do cache.
+
+        As chaves são tuplas `(endpoint, id, ...)`: sem argumentos limpa tudo; com
+        `endpoint` (e opcionalmente `id`) remove apenas as entradas correspondentes.
+        """
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for key in [k for k in self._entries if k[0] == endpoint and (id is None or k[1] == id)]:
+                self._remove(key)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes}
@@ -0,0 +1,309 @@
+import argparse
+import gzip
+import json
+import math
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Type, TypeVar
+
+from logger import setup_logger
+from model import parse_model
+from search_index import NameIndex
+from swapi_client import BatchResult, SwapiClient
+
+RESOURCES = ("people", "planets", "films", "species", "vehicles", "starships")
+SNAPSHOT_FORMAT = 1
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'swapi_snapshot.json.gz')
+PAGE_SIZE = 10
+# Idade máxima do snapshot para que o índice de nomes seja usado com a SWAPI remota
+SEARCH_INDEX_MAX_AGE = 7 * 24 * 3600
+
+log = setup_logger('swapi_mirror')
+
+def id_from_url(url: str) -> int:
+    """Extrai o ID numérico de uma URL da SWAPI (ex: .../people/1/ → 1)."""
+    return int(url.rstrip('/').rsplit('/', 1)[1])
+
+class SwapiSnapshot:
+    """
+    Cópia local de todos os recursos da SWAPI, indexada por ID.
+
+    O arquivo é um JSON compactado com gzip contendo um número de versão (incrementado a
+    cada alteração), as datas de criação/atualização e, para cada recurso, a data da
+    última coleta e a lista de registros.
+    """
+
+    def __init__(self, resources: Dict[str, Dict[int, dict]] = None, version: int = 0,
+                 created_at: str = None, updated_at: str = None, fetched_at: Dict[str, float] = None):
+        self.resources = resources or {}
+        self.version = version
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.fetched_at = fetched_at or {}
+        self._sorted_ids = {}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SNAPSHOT_PATH) -> "SwapiSnapshot":
+        """Carrega o snapshot do disco e monta os índices por ID."""
+        start_time = time.time()
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            raw = json.load(f)
+        if raw.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Formato de snapshot não suportado: {raw.get('format')}")
+
+        resources = {
+            endpoint: {id_from_url(record["url"]): record for record in records}
+            for endpoint, records in raw["resources"].items()
+        }
+        snapshot = cls(resources, raw["version"], raw["created_at"], raw["updated_at"], raw["fetched_at"])
+        log.info(
+            "Snapshot SWAPI v%s carregado de %s: "
+            "%s registros, "
+            "Tempo: %.3fs",
+            snapshot.version, path, sum(len(r) for r in resources.values()), time.time() - start_time
+        )
+        return snapshot
+
+    def save(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        """Grava o snapshot de forma atômica (arquivo temporário + rename)."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        raw = {
+            "format": SNAPSHOT_FORMAT,
+            "version": self.version,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "fetched_at": self.fetched_at,
+            "resources": {
+                endpoint: [records[id] for id in sorted(records)]
+                for endpoint, records in self.resources.items()
+            },
+        }
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(raw, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get(self, endpoint: str, id: int) -> Optional[dict]:
+        return self.resources.get(endpoint, {}).get(id)
+
+    def records(self, endpoint: str) -> List[dict]:
+        """Registros de um recurso em ordem de ID."""
+        ids = self._sorted_ids.get(endpoint)
+        if ids is None:
+            ids = self._sorted_ids[endpoint] = sorted(self.resources.get(endpoint, {}))
+        records = self.resources.get(endpoint, {})
+        return [records[id] for id in ids]
+
+    def update_resource(self, endpoint: str, records: List[dict]) -> dict:
+        """
+        Substitui os registros de um recurso e retorna o resumo das mudanças.
+
+        Registros com o mesmo ID e um campo `edited` diferente contam como atualizados.
+        """
+        old = self.resources.get(endpoint, {})
+        new = {id_from_url(record["url"]): record for record in records}
+        changes = {
+            "added": len(new.keys() - old.keys()),
+            "removed": len(old.keys() - new.keys()),
+            "updated": sum(
+                1 for id in new.keys() & old.keys() if new[id].get("edited") != old[id].get("edited")
+            ),
+        }
+        self.resources[endpoint] = new
+        self.fetched_at[endpoint] = time.time()
+        self._sorted_ids.pop(endpoint, None)
+        return changes
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+def refresh_snapshot(client=None, path: str = DEFAULT_SNAPSHOT_PATH, max_age: float = 0,
+                     resources=RESOURCES) -> SwapiSnapshot:
+    """
+    Cria ou atualiza o snapshot local coletando todos os recursos da SWAPI.
+
+    A atualização é incremental: apenas os recursos coletados há mais de `max_age`
+    segundos (ou ainda ausentes) são baixados de novo, e a versão só é incrementada
+    quando algum registro foi adicionado, removido ou editado.
+    """
+    client = client or SwapiClient(cache=False, model_cache=False)
+    snapshot = SwapiSnapshot.load(path) if os.path.exists(path) else SwapiSnapshot(created_at=_utc_now())
+
+    changed = False
+    now = time.time()
+    for endpoint in resources:
+        if endpoint in snapshot.resources and now - snapshot.fetched_at.get(endpoint, 0) < max_age:
+            log.info("Snapshot: '%s' ainda atualizado, coleta ignorada", endpoint)
+            continue
+        data = client.fetch_all_pages(endpoint)
+        if data is None:
+            log.error("Snapshot: falha ao coletar '%s', registros anteriores mantidos", endpoint)
+            continue
+        if len(data["results"]) != data["count"]:
+            # Uma coleta parcial contaria os registros que faltaram como removidos
+            log.error(
+                "Snapshot: coleta incompleta de '%s' (%s de %s registros), registros anteriores mantidos",
+                endpoint, len(data["results"]), data["count"]
+            )
+            continue
+        changes = snapshot.update_resource(endpoint, data["results"])
+        log.info("Snapshot: '%s' coletado (%s registros, mudanças: %s)", endpoint, len(data['results']), changes)
+        changed = changed or any(changes.values())
+
+    if changed or snapshot.version == 0:
+        snapshot.version += 1
+        snapshot.updated_at = _utc_now()
+    snapshot.save(path)
+    log.info("Snapshot SWAPI v%s gravado em %s", snapshot.version, path)
+    return snapshot
+
+class MirrorSwapiClient:
+    """
+    Backend do `SwapiClient` que responde `fetch_swapi` / `fetch_swapi_by_id` a partir do
+    snapshot local, sem acesso à rede (modo offline).
+
+    Suporta os parâmetros `search` (substring sem diferenciar maiúsculas, como a SWAPI,
+    respondida pelo `NameIndex`) e `page` (páginas de 10 registros, com `next` / `previous`).
+    """
+    SWAPI_BASE_URL = SwapiClient.SWAPI_BASE_URL
+    T = TypeVar('T')
+
+    def __init__(self, snapshot: SwapiSnapshot = None, path: str = DEFAULT_SNAPSHOT_PATH):
+        self.snapshot = snapshot or SwapiSnapshot.load(path)
+        self.search_index = NameIndex.from_snapshot(self.snapshot)
+        self.logger = setup_logger('swapi_client')
+
+    def _query(self, endpoint: str, params=None) -> List[dict]:
+        search = (params or {}).get("search")
+        if search:
+            return self.search_index.search(endpoint, str(search))
+        return self.snapshot.records(endpoint)
+
+    def fetch_swapi(self, endpoint: str, params=None, model: Type[T] = None) -> T:
+        if endpoint not in self.snapshot.resources:
+            self.logger.error("Erro ao buscar %s: recurso ausente no snapshot", endpoint)
+            return None
+        params = dict(params or {})
+        records = self._query(endpoint, params)
+        try:
+            page = int(params.pop("page", 1))
+        except (TypeError, ValueError):
+            self.logger.error("Erro ao buscar %s: página inválida", endpoint)
+            return None
+        total_pages = max(math.ceil(len(records) / PAGE_SIZE), 1)
+        if page < 1 or page > total_pages:
+            self.logger.error("Erro ao buscar %s: página %s inexistente", endpoint, page)
+            return None
+
+        def page_url(number):
+            query = "&".join([f"{k}={v}" for k, v in params.items()] + [f"page={number}"])
+            return f"{self.SWAPI_BASE_URL}/{endpoint}/?{query}"
+
+        data = {
+            "count": len(records),
+            "next": page_url(page + 1) if page < total_pages else None,
+            "previous": page_url(page - 1) if page > 1 else None,
+            "results": records[(page - 1) * PAGE_SIZE: page * PAGE_SIZE],
+        }
+        if model:
+            return parse_model(model, data, trusted=True)
+        return data
+
+    def fetch_swapi_by_id(self, endpoint: str, id: int, model: Type[T]) -> T:
+        record = self.snapshot.get(endpoint, int(id))
+        if record is None:
+            self.logger.error("Erro ao buscar %s com ID %s: não encontrado no snapshot", endpoint, id)
+            return None
+        return parse_model(model, record, trusted=True)
+
+    def fetch_many_by_id(self, endpoint: str, ids: Iterable[int], model: Type[T],
+                         max_concurrency: int = 8) -> List[BatchResult]:
+        results = []
+        for id in ids:
+            record = self.snapshot.get(endpoint, int(id))
+            if record is None:
+                results.append(BatchResult(id, error=f"{endpoint} com ID {id} não encontrado no snapshot"))
+            else:
+                results.append(BatchResult(id, parse_model(model, record, trusted=True)))
+        return results
+
+    def iter_pages(self, endpoint: str, params=None, max_concurrency: int = 4) -> Iterator[dict]:
+        data = self.fetch_all_pages(endpoint, params)
+        if data is not None:
+            yield data
+
+    def fetch_all_pages(self, endpoint: str, params=None, model: Type[T] = None,
+                        max_concurrency: int = 4) -> T:
+        if endpoint not in self.snapshot.resources:
+            self.logger.error("Erro ao buscar %s: recurso ausente no snapshot", endpoint)
+            return None
+        records = self._query(endpoint, params)
+        data = {"count": len(records), "next": None, "previous": None, "results": records}
+        if model:
+            return parse_model(model, data, trusted=True)
+        return data
+
+    def close(self):
+        pass
+
+def create_swapi_client():
+    """
+    Cria o cliente SWAPI da aplicação.
+
+    Se a variável de ambiente `SWAPI_SNAPSHOT` apontar para um snapshot existente, usa o
+    modo offline (`MirrorSwapiClient`); caso contrário, o `SwapiClient` com acesso à rede.
+    """
+    path = os.getenv("SWAPI_SNAPSHOT")
+    if path:
+        if os.path.exists(path):
+            return MirrorSwapiClient(path=path)
+        log.warning("SWAPI_SNAPSHOT aponta para um arquivo inexistente (%s); usando a SWAPI remota", path)
+    return SwapiClient()
+
+def create_search_index(swapi_client=None) -> Optional[NameIndex]:
+    """
+    Retorna o índice local de nomes para as buscas das ferramentas.
+
+    No modo offline reutiliza o índice do `MirrorSwapiClient`; com a SWAPI remota, monta
+    o índice a partir do snapshot padrão, se existir (considerado desatualizado após
+    `SEARCH_INDEX_MAX_AGE`). Sem snapshot, retorna None e as buscas vão para a API.
+    """
+    search_index = getattr(swapi_client, "search_index", None)
+    if search_index is not None:
+        return search_index
+    if not os.path.exists(DEFAULT_SNAPSHOT_PATH):
+        return None
+    try:
+        return NameIndex.from_snapshot(SwapiSnapshot.load(DEFAULT_SNAPSHOT_PATH), max_age=SEARCH_INDEX_MAX_AGE)
+    except Exception as e:
+        log.error("Erro ao montar o índice de nomes a partir do snapshot: %s", e)
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Espelho local da SWAPI")
+    subparsers = parser.add_subparsers(dest="command")
+
+    parser_build = subparsers.add_parser("build", help="Baixa todos os recursos e grava o snapshot")
+    parser_build.add_argument("--output", default=DEFAULT_SNAPSHOT_PATH, help="Caminho do snapshot")
+
+    parser_refresh = subparsers.add_parser("refresh", help="Atualiza o snapshot existente de forma incremental")
+    parser_refresh.add_argument("--output", default=DEFAULT_SNAPSHOT_PATH, help="Caminho do snapshot")
+    parser_refresh.add_argument("--max-age", type=float, default=24, help="Idade máxima (em horas) de cada recurso")
+
+    parser_info = subparsers.add_parser("info", help="Mostra a versão e o conteúdo do snapshot")
+    parser_info.add_argument("--output", default=DEFAULT_SNAPSHOT_PATH, help="Caminho do snapshot")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        refresh_snapshot(path=args.output)
+    elif args.command == "refresh":
+        refresh_snapshot(path=args.output, max_age=args.max_age * 3600)
+    elif args.command == "info":
+        snapshot = SwapiSnapshot.load(args.output)
+        print(f"Versão: {snapshot.version} (criado em {snapshot.created_at}, atualizado em {snapshot.updated_at})")
+        for endpoint, records in snapshot.resources.items():
+            print(f"- {endpoint}: {len(records)} registros")
+    else:
+        parser.print_help()
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+from async_swapi_client import AsyncSwapiClient
+from model import People, SearchResponse
+from swapi_cache import SwapiResponseCache
+
+PEOPLE = {"count": 1, "next": None, "previous": None, "results": [{"name": "Luke Skywalker"}]}
+
+def _client(fake_swapi, **kwargs) -> AsyncSwapiClient:
+    kwargs.setdefault("cache", False)
+    client = AsyncSwapiClient(**kwargs)
+    client.SWAPI_BASE_URL = fake_swapi.base_url
+    return client
+
+def test_run_sync_fetches_and_parses(fake_swapi):
+    fake_swapi.routes["/api/people/?search=luke"] = PEOPLE
+    client = _client(fake_swapi)
+    try:
+        response = client.run_sync(client.fetch_swapi("people", params={"search": "luke"}, model=SearchResponse))
+        assert response.count == 1
+        assert client.run_sync(client.fetch_swapi("people", params={"search": "luke"})) == PEOPLE
+        assert client.run_sync(client.fetch_swapi("planets")) is None
+    finally:
+        client.close()
+
+class ThreadRecordingCache(SwapiResponseCache):
+    """`SwapiResponseCache` que anota em qual thread cada leitura/gravação rodou."""
+
+    def __init__(self, path):
+        super().__init__(path=path)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def set(self, *args, **kwargs):
+        self.threads.append(threading.get_ident())
+        return super().set(*args, **kwargs)
+
+def test_disk_cache_calls_run_off_the_event_loop(fake_swapi, tmp_path):
+    fake_swapi.routes["/api/people/?search=luke"] = PEOPLE
+    cache = ThreadRecordingCache(str(tmp_path / "swapi_cache.sqlite3"))
+    client = _client(fake_swapi, cache=cache)
+    try:
+        for _ in range(2):
+            assert client.run_sync(client.fetch_swapi("people", params={"search": "luke"})) == PEOPLE
+        loop_thread = client._loop_thread.ident
+    finally:
+        client.close()
+    assert fake_swapi.requests == ["/api/people/?search=luke"]
+    assert len(cache.threads) == 3
+    assert loop_thread not in cache.threads
+
+def test_run_sync_from_several_threads_shares_one_loop(fake_swapi):
+    fake_swapi.routes["/api/people/?search=luke"] = PEOPLE
+    client = _client(fake_swapi)
+    results = []
+
+    def worker():
+        results.append(client.run_sync(client.fetch_swapi("people", params={"search": "luke"})))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert results == [PEOPLE] * 4
+        # Um único pool: as requisições reaproveitam as conexões abertas
+        assert fake_swapi.connections <= 4
+    finally:
+        client.close()
+    assert client._loop is None
+
+def test_gather_keeps_order_and_bounds_concurrency():
+    client = AsyncSwapiClient(concurrency=2, cache=False)
+    running = 0
+    peak = 0
+
+    async def job(value, delay):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(delay)
+        running -= 1
+        if value == "erro":
+            raise ValueError(value)
+        return value
+
+    async def main():
+        return await client.gather([job("a", 0.03), job("erro", 0.01), job("c", 0), job("d", 0.01)])
+
+    results = asyncio.run(main())
+    assert results[0] == "a" and results[2:] == ["c", "d"]
+    assert isinstance(results[1], ValueError)
+    assert peak == 2
+
+def test_fetch_all_pages_joins_every_page_in_order(fake_swapi):
+    fake_swapi.paginate("/api/people/", [{"name": name} for name in ("Luke", "Leia", "Han")], page_size=2)
+    client = _client(fake_swapi)
+    try:
+        data = client.run_sync(client.fetch_all_pages("people"))
+        assert [item["name"] for item in data["results"]] == ["Luke", "Leia", "Han"]
+    finally:
+        client.close()
+
+def test_fetch_all_pages_rejects_a_short_page(fake_swapi):
+    fake_swapi.paginate("/api/people/", [{"name": name} for name in ("Luke", "Leia", "Han")], page_size=2)
+    fake_swapi.routes["/api/people/?page=2"]["results"] = []
+    client = _client(fake_swapi)
+    try:
+        assert client.run_sync(client.fetch_all_pages("people")) is None
+    finally:
+        client.close()
+
+def test_fetch_many_by_id_keeps_order_and_reports_failures(fake_swapi):
+    fake_swapi.routes["/api/people/1/"] = {
+        "name": "Luke Skywalker", "height": "172", "mass": "77", "hair_color": "blond", "skin_color": "fair",
+        "eye_color": "blue", "birth_year": "19BBY", "gender": "male", "homeworld": "", "films": [], "species": [],
+        "vehicles": [], "starships": [], "created": "", "edited": "", "url": "https://swapi.dev/api/people/1/",
+    }
+    client = _client(fake_swapi)
+    try:
+        results = client.run_sync(client.fetch_many_by_id("people", [99, 1, 1], People))
+    finally:
+        client.close()
+    assert [(result.id, result.ok) for result in results] == [(99, False), (1, True), (1, True)]
+    assert results[1].result is results[2].result
+    assert sorted(fake_swapi.requests) == ["/api/people/1/", "/api/people/99/"]
@@ -0,0 +1,71 @@
+import io
+import json
+
+import pytest
+
+from mcp_server import INVALID_PARAMS, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR, MCPServer, create_http_app, serve_stdio
+from tool_result import Column, ToolResult
+
+class FakeTools:
+    """Ferramentas do `MCPTools` sem acesso à SWAPI."""
+    tools = None
+
+    def search_characters(self, search):
+        return ToolResult(items=[{"id": 1, "name": search.title()}], columns=(Column("name", "Nome"),))
+
+    def get_character_by_id(self, id):
+        raise RuntimeError("SWAPI fora do ar")
+
+@pytest.fixture
+def server():
+    server = MCPServer(FakeTools(), max_workers=2)
+    yield server
+    server.shutdown()
+
+def _call(request_id, name, **arguments):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": {"name": name, "arguments": arguments}}
+
+def test_initialize_and_list_only_available_tools(server):
+    response = server.handle({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"protocolVersion": "2024-11-05"}})
+    assert response["result"]["protocolVersion"] == "2024-11-05"
+    tools = server.handle({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})["result"]["tools"]
+    assert sorted(tool["name"] for tool in tools) == ["get_character_by_id", "search_characters"]
+
+def test_call_returns_text_and_structured_content(server):
+    result = server.handle(_call(1, "search_characters", search="luke"))["result"]
+    assert result["isError"] is False
+    assert result["content"][0]["text"] == "Nome: Luke\n---"
+    assert result["structuredContent"]["items"] == [{"id": 1, "name": "Luke"}]
+
+def test_tool_failures_and_invalid_calls(server):
+    assert server.handle(_call(1, "get_character_by_id", id="1"))["result"]["isError"] is True
+    assert server.handle(_call(2, "get_character_by_id", id="luke"))["error"]["code"] == INVALID_PARAMS
+    assert server.handle(_call(3, "list_all_films"))["error"]["code"] == INVALID_PARAMS
+    assert server.handle({"jsonrpc": "2.0", "id": 4, "method": "resources/list"})["error"]["code"] == METHOD_NOT_FOUND
+    assert server.handle({"id": 5, "method": "ping"})["error"]["code"] == INVALID_REQUEST
+
+def test_batch_keeps_order_and_skips_notifications(server):
+    responses = server.handle([
+        _call(1, "search_characters", search="leia"),
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        {"jsonrpc": "2.0", "id": 2, "method": "ping"},
+    ])
+    assert [response["id"] for response in responses] == [1, 2]
+    assert server.handle([])["error"]["code"] == INVALID_REQUEST
+    assert server.handle({"jsonrpc": "2.0", "method": "notifications/initialized"}) is None
+
+def test_stdio_transport(server):
+    stdin = io.StringIO('{"jsonrpc": "2.0", "id": 1, "method": "ping"}\nnot json\n')
+    stdout = io.StringIO()
+    serve_stdio(server, stdin=stdin, stdout=stdout)
+    responses = sorted((json.loads(line) for line in stdout.getvalue().splitlines()), key=lambda r: str(r["id"]))
+    assert responses[0] == {"jsonrpc": "2.0", "id": 1, "result": {}}
+    assert responses[1]["error"]["code"] == PARSE_ERROR
+
+def test_http_transport(server):
+    client = create_http_app(server).test_client()
+    response = client.post("/mcp", json=_call(1, "search_characters", search="han"))
+    assert response.get_json()["result"]["structuredContent"]["count"] == 1
+    assert client.post("/mcp", json={"jsonrpc": "2.0", "method": "notifications/initialized"}).status_code == 202
+    assert client.get("/mcp").status_code == 405
+    assert client.post("/mcp", json={}, headers={"Origin": "http://evil.example"}).status_code == 403
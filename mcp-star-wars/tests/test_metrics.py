@@ -0,0 +1,60 @@
+import pytest
+from flask import Flask
+
+from metrics import CONTENT_TYPE, MetricsRegistry, setup_metrics
+
+def test_counter_and_histogram_text_format():
+    registry = MetricsRegistry()
+    calls = registry.counter("tool_calls_total", "Chamadas", ("tool",))
+    duration = registry.histogram("tool_duration_seconds", "Duração", ("tool",), buckets=(0.1, 1.0))
+    calls.labels("search_characters").inc()
+    calls.labels("search_characters").inc(2)
+    duration.labels("search_characters").observe(0.05)
+    duration.labels("search_characters").observe(0.5)
+    duration.labels("search_characters").observe(5)
+
+    assert registry.render().splitlines() == [
+        "# HELP tool_calls_total Chamadas",
+        "# TYPE tool_calls_total counter",
+        'tool_calls_total{tool="search_characters"} 3',
+        "# HELP tool_duration_seconds Duração",
+        "# TYPE tool_duration_seconds histogram",
+        'tool_duration_seconds_bucket{tool="search_characters",le="0.1"} 1',
+        'tool_duration_seconds_bucket{tool="search_characters",le="1.0"} 2',
+        'tool_duration_seconds_bucket{tool="search_characters",le="+Inf"} 3',
+        'tool_duration_seconds_sum{tool="search_characters"} 5.55',
+        'tool_duration_seconds_count{tool="search_characters"} 3',
+    ]
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requisições", ("path",)).labels('a"b\\c\nd').inc()
+    assert 'requests_total{path="a\\"b\\\\c\\nd"} 1' in registry.render()
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Requisições", ("path",)).labels("a", "b")
+
+def test_collectors_are_read_at_scrape_time():
+    registry = MetricsRegistry()
+    stats = {"entries": 1}
+    registry.register_collector("cache", lambda: [
+        ("cache_entries", "gauge", "Entradas", {"cache": "disk"}, stats["entries"]),
+        ("cache_bytes", "gauge", "Bytes", {}, None),
+    ])
+    stats["entries"] = 7
+    text = registry.render()
+    assert "# TYPE cache_entries gauge\ncache_entries{cache=\"disk\"} 7" in text
+    assert "cache_bytes" not in text
+
+def test_setup_metrics_exposes_the_route_and_times_requests():
+    app = Flask(__name__)
+
+    @app.route("/personagens/<id>")
+    def character(id):
+        return id
+
+    client = setup_metrics(app).test_client()
+    client.get("/personagens/1")
+    client.get("/personagens/2")
+    response = client.get("/metrics")
+    assert response.content_type == CONTENT_TYPE
+    assert 'http_requests_total{method="GET",endpoint="/personagens/<id>",status="200"} 2' in response.get_data(as_text=True)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from rate_limiter import AdaptiveRateLimiter, TokenBucket
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+def test_limit_increases_while_saturated():
+    limiter = AdaptiveRateLimiter(rate=None, initial_limit=1, max_limit=4)
+    for _ in range(3):
+        with limiter.limit() as permit:
+            permit.status = 200
+    # Só cresce enquanto o limite está em uso: com limite 2, chamadas em sequência não o ocupam
+    stats = limiter.get_stats()
+    assert stats["limit"] == 2
+    assert stats["increases"] == 1
+
+def test_limit_backs_off_on_overload():
+    limiter = AdaptiveRateLimiter(rate=None, initial_limit=8)
+    with limiter.limit() as permit:
+        permit.status = 503
+    assert limiter.get_stats()["limit"] == 4
+
+    response = requests.Response()
+    response.status_code = 429
+    limiter._last_decrease = 0.0
+    with pytest.raises(requests.HTTPError):
+        with limiter.limit():
+            raise requests.HTTPError(response=response)
+    assert limiter.get_stats()["limit"] == 2
+    assert limiter.get_stats()["throttled"] == 2
+
+def test_waiters_queue_until_a_slot_is_free():
+    limiter = AdaptiveRateLimiter(rate=None, initial_limit=1, max_limit=1)
+    order = []
+
+    def request(name):
+        with limiter.limit() as permit:
+            order.append(name)
+            time.sleep(0.05)
+            permit.status = 200
+
+    first = threading.Thread(target=request, args=("first",))
+    first.start()
+    while limiter.get_stats()["in_flight"] == 0:
+        time.sleep(0.01)
+    second = threading.Thread(target=request, args=("second",))
+    second.start()
+    while limiter.get_stats()["queue_depth"] == 0:
+        time.sleep(0.01)
+    first.join()
+    second.join()
+
+    assert order == ["first", "second"]
+    assert limiter.get_stats()["queued"] == 1
+
+def test_permit_released_early_is_not_released_again():
+    limiter = AdaptiveRateLimiter(rate=None, initial_limit=1)
+    with limiter.limit() as permit:
+        permit.release()
+        assert limiter.get_stats()["in_flight"] == 0
+        with limiter.limit() as other:
+            other.status = 200
+            assert limiter.get_stats()["in_flight"] == 1
+        permit.status = 200
+    stats = limiter.get_stats()
+    assert stats["in_flight"] == 0
+    assert stats["latency"] is not None
@@ -0,0 +1,106 @@
+import requests
+
+from swapi_cache import SwapiResponseCache
+from model import People
+from swapi_client import SwapiClient, track_upstream_failures
+
+LUKE = {"name": "Luke Skywalker", "height": "172"}
+PEOPLE_1 = {
+    "name": "Luke Skywalker", "height": "172", "mass": "77", "hair_color": "blond", "skin_color": "fair",
+    "eye_color": "blue", "birth_year": "19BBY", "gender": "male", "homeworld": "https://swapi.dev/api/planets/1/",
+    "films": [], "species": [], "vehicles": [], "starships": [], "created": "", "edited": "",
+    "url": "https://swapi.dev/api/people/1/",
+}
+
+def _client(fake_swapi, **kwargs) -> SwapiClient:
+    kwargs.setdefault("cache", False)
+    client = SwapiClient(**kwargs)
+    client.SWAPI_BASE_URL = fake_swapi.base_url
+    return client
+
+def test_requests_reuse_the_pooled_connection(fake_swapi):
+    fake_swapi.routes["/api/people/1/"] = LUKE
+    client = _client(fake_swapi)
+    for _ in range(3):
+        assert client.fetch_swapi("people/1") == LUKE
+    stats = client.get_pool_stats()
+    assert (stats["hosts"], stats["requests"]) == (1, 3)
+    assert (stats["new_connections"], stats["reused_connections"]) == (1, 2)
+    assert fake_swapi.connections == 1
+    client.close()
+
+def test_keep_alive_can_be_disabled(fake_swapi):
+    fake_swapi.routes["/api/people/1/"] = LUKE
+    client = _client(fake_swapi, keep_alive=False)
+    for _ in range(2):
+        assert client.fetch_swapi("people/1") == LUKE
+    assert fake_swapi.connections == 2
+    client.close()
+
+def test_uses_the_given_session(fake_swapi):
+    fake_swapi.routes["/api/people/1/"] = LUKE
+    session = requests.Session()
+    client = _client(fake_swapi, session=session)
+    assert client.session is session
+    assert client.fetch_swapi("people/1") == LUKE
+    assert client.fetch_swapi("people/99") is None
+
+def test_fetch_all_pages_joins_every_page_in_order(fake_swapi):
+    names = [f"Personagem {i}" for i in range(7)]
+    fake_swapi.paginate("/api/people/", [{"name": name} for name in names], page_size=2)
+    client = _client(fake_swapi)
+    data = client.fetch_all_pages("people")
+    assert data["count"] == 7
+    assert [item["name"] for item in data["results"]] == names
+    assert client.fetch_all_pages("planets") is None
+
+def test_fetch_all_pages_rejects_short_or_missing_pages(fake_swapi):
+    fake_swapi.paginate("/api/people/", [{"name": f"Personagem {i}"} for i in range(5)], page_size=2)
+    fake_swapi.routes["/api/people/?page=2"]["results"].pop()
+    client = _client(fake_swapi)
+    with track_upstream_failures() as failures:
+        assert client.fetch_all_pages("people") is None
+    assert len(failures) == 1
+
+    fake_swapi.paginate("/api/people/", [{"name": f"Personagem {i}"} for i in range(5)], page_size=2)
+    fake_swapi.routes["/api/people/?page=3"] = (500, {"detail": "erro"})
+    assert client.fetch_all_pages("people") is None
+
+def test_fresh_responses_are_served_from_the_persistent_cache(fake_swapi, tmp_path):
+    fake_swapi.routes["/api/people/1/"] = LUKE
+    cache = SwapiResponseCache(path=str(tmp_path / "swapi_cache.sqlite3"))
+    client = _client(fake_swapi, cache=cache)
+    try:
+        assert client.fetch_swapi("people/1") == LUKE
+        assert client.fetch_swapi("people/1") == LUKE
+        assert fake_swapi.requests == ["/api/people/1/"]
+        assert cache.get_stats()["hits"] == 1
+    finally:
+        client.close()
+        cache.close()
+
+def test_fetch_by_id_reuses_the_parsed_model(fake_swapi):
+    fake_swapi.routes["/api/people/1/"] = PEOPLE_1
+    client = _client(fake_swapi)
+    first = client.fetch_swapi_by_id("people", 1, People)
+    assert client.fetch_swapi_by_id("people", 1, People) is first
+    assert fake_swapi.requests == ["/api/people/1/"]
+    client.model_cache.invalidate("people", 1)
+    assert client.fetch_swapi_by_id("people", 1, People).name == "Luke Skywalker"
+    assert len(fake_swapi.requests) == 2
+
+def test_fetch_many_by_id_keeps_order_and_reports_failures(fake_swapi):
+    for id in (1, 2):
+        fake_swapi.routes[f"/api/people/{id}/"] = {**PEOPLE_1, "name": f"Personagem {id}"}
+    fake_swapi.routes["/api/people/3/"] = (500, {"detail": "Erro interno"})
+    client = _client(fake_swapi)
+    client.fetch_swapi_by_id("people", 2, People)
+
+    results = client.fetch_many_by_id("people", [3, 1, 2, 1, 99], People)
+    assert [result.id for result in results] == [3, 1, 2, 1, 99]
+    assert [result.ok for result in results] == [False, True, True, True, False]
+    assert results[1].result.name == results[3].result.name == "Personagem 1"
+    # IDs repetidos são buscados uma vez e os do cache de objetos não vão à rede
+    assert fake_swapi.requests.count("/api/people/1/") == 1
+    assert fake_swapi.requests.count("/api/people/2/") == 1
+    assert client.fetch_many_by_id("people", [], People) == []
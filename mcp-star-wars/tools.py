@@ -1,49 +1,250 @@
+import inspect
+from columnar_store import ColumnarStoreProvider
+from expansion import Expander, parse_resource_url
+from relationship_index import RelationshipIndexProvider, iter_bits
 from swapi_client import SwapiClient
-from model import People, SearchResponse
+from model import SearchResponse
+from resource_registry import RESOURCES, ResourceSpec, tool_names
+from tool_result import Column, ToolResult
+
+def _display_name(value):
+    """Nome/título de uma referência expandida (ou a própria URL, se não foi resolvida)."""
+    if isinstance(value, dict):
+        return value.get("name") or value.get("title") or value.get("url", "")
+    return "desconhecido" if value is None else str(value)
+
+def _resource_item(spec: ResourceSpec, record: dict, detail: bool = False) -> dict:
+    """Campos exibidos de um registro; com `detail`, inclui os nomes das referências já expandidas."""
+    parsed = parse_resource_url(record.get("url"))
+    item = {"id": parsed[1] if parsed else None}
+    item.update((field, record.get(field)) for field, _, _ in spec.display_fields)
+    if detail:
+        for field, _ in spec.references:
+            value = record.get(field)
+            item[field] = [_display_name(v) for v in value] if isinstance(value, list) else _display_name(value)
+    return item
 
 class Tools:
-    def __init__(self, swapi_client=None):
+    def __init__(self, swapi_client=None, search_index=None):
+        """
+        Args:
+            swapi_client: `SwapiClient` (síncrono) ou `AsyncSwapiClient`. Com o cliente
+                assíncrono, as chamadas são executadas no event loop interno dele.
+            search_index: `NameIndex` local usado nas buscas por nome/título (padrão: o
+                índice do cliente, se houver). Sem ele, as buscas vão para a API.
+        """
         self.swapi = swapi_client or SwapiClient()
+        self.search_index = search_index or getattr(self.swapi, "search_index", None)
+        self.expander = Expander(self.swapi)
+        self.columnar = ColumnarStoreProvider(self._fetch_all, snapshot=getattr(self.swapi, "snapshot", None))
+        self.relationships = RelationshipIndexProvider(self._fetch_all, snapshot=getattr(self.swapi, "snapshot", None))
 
-    def search_characters(self, search: str):
-        resp = self.swapi.fetch_swapi("people", params={"search": search}, model=SearchResponse)
-        if not resp or not resp.results:
-            return f'Nenhum personagem encontrado com o nome "{search}".'
-        resultado = []
-        for char in resp.results:
-            resultado.append(f"Nome: {char['name']}\nAltura: {char['height']}cm\nMassa: {char['mass']}kg\nCor do Cabelo: {char['hair_color']}\nCor dos Olhos: {char['eye_color']}\nAno de Nascimento: {char['birth_year']}\nGênero: {char['gender']}\n---")
-        return '\n'.join(resultado)
-
-    def search_planets(self, search: str):
-        resp = self.swapi.fetch_swapi("planets", params={"search": search}, model=SearchResponse)
-        if not resp or not resp.results:
-            return f'Nenhum planeta encontrado com o nome "{search}".'
-        resultado = []
-        for planet in resp.results:
-            resultado.append(f"Nome: {planet['name']}\nClima: {planet['climate']}\nTerreno: {planet['terrain']}\nPopulação: {planet['population']}\nDiâmetro: {planet['diameter']}km\nPeríodo de Rotação: {planet['rotation_period']}h\nPeríodo Orbital: {planet['orbital_period']} dias\n---")
-        return '\n'.join(resultado)
-
-    def search_films(self, search: str):
-        resp = self.swapi.fetch_swapi("films", params={"search": search}, model=SearchResponse)
+    def _resolve(self, result):
+        """Aguarda o resultado quando o cliente SWAPI é assíncrono."""
+        if inspect.isawaitable(result):
+            return self.swapi.run_sync(result)
+        return result
+
+    def _fetch_all(self, endpoint: str, params=None, model=None):
+        return self._resolve(self.swapi.fetch_all_pages(endpoint, params=params, model=model))
+
+    def _search(self, endpoint: str, search: str):
+        """Busca pelo índice local e só consulta a API se não houver resultados locais ou o índice estiver desatualizado."""
+        if self.search_index:
+            results = self.search_index.search(endpoint, search)
+            if results:
+                return SearchResponse(count=len(results), next=None, previous=None, results=results)
+        return self._fetch_all(endpoint, params={"search": search}, model=SearchResponse)
+
+    def _fetch_by_id(self, endpoint: str, id: int, model):
+        return self._resolve(self.swapi.fetch_swapi_by_id(endpoint, id, model))
+
+    def _search_resource(self, spec: ResourceSpec, search: str):
+        resp = self._search(spec.endpoint, search)
         if not resp or not resp.results:
-            return f'Nenhum filme encontrado com o título "{search}".'
-        resultado = []
-        for film in resp.results:
-            resultado.append(f"Título: {film['title']}\nEpisódio: {film['episode_id']}\nDiretor: {film['director']}\nProdutor: {film['producer']}\nData de Lançamento: {film['release_date']}\nAbertura: {film['opening_crawl']}\n---")
-        return '\n'.join(resultado)
-
-    def get_character_by_id(self, id: int):
-        char = self.swapi.fetch_swapi_by_id("people", id, People)
-        if not char:
-            return f'Personagem com ID {id} não encontrado.'
-        return f"Nome: {char.name}\nAltura: {char.height}cm\nMassa: {char.mass}kg\nCor do Cabelo: {char.hair_color}\nCor dos Olhos: {char.eye_color}\nAno de Nascimento: {char.birth_year}\nGênero: {char.gender}\nURL do Mundo Natal: {char.homeworld}\nNúmero de Filmes: {len(char.films)}"
-
-    def list_all_films(self):
-        resp = self.swapi.fetch_swapi("films", model=SearchResponse)
+            return ToolResult.from_message(f'{spec.article("Nenhum", "Nenhuma")} {spec.label} {spec.article("encontrado", "encontrada")} com o {spec.search_label} "{search}".')
+        return ToolResult([_resource_item(spec, record) for record in resp.results], spec.columns())
+
+    def _list_resource(self, spec: ResourceSpec):
+        resp = self._fetch_all(spec.endpoint, model=SearchResponse)
         if not resp or not resp.results:
-            return 'Nenhum filme encontrado.'
-        films = sorted(resp.results, key=lambda f: f['episode_id'])
-        resultado = []
-        for film in films:
-            resultado.append(f"Título: {film['title']}\nEpisódio: {film['episode_id']}\nDiretor: {film['director']}\nProdutor: {film['producer']}\nData de Lançamento: {film['release_date']}\nAbertura: {film['opening_crawl']}\n---")
-        return '\n'.join(resultado)
+            return ToolResult.from_message(f'{spec.article("Nenhum", "Nenhuma")} {spec.label} {spec.article("encontrado", "encontrada")}.')
+        records = resp.results
+        if spec.sort_field:
+            records = sorted(records, key=lambda record: record[spec.sort_field])
+        return ToolResult([_resource_item(spec, record) for record in records], spec.columns())
+
+    def _get_resource_by_id(self, spec: ResourceSpec, id):
+        not_found = f'{spec.label.capitalize()} com ID {id} {spec.article("não encontrado", "não encontrada")}.'
+        if not str(id).strip().isdigit():
+            return ToolResult.from_message(f'ID inválido: "{id}".')
+        record = self._fetch_by_id(spec.endpoint, int(id), spec.model)
+        if not record:
+            return ToolResult.from_message(not_found)
+        record = self._expand(spec, [record])[0]
+        return ToolResult([_resource_item(spec, record, detail=True)], spec.columns(detail=True), separator=False)
+
+    def _get_resources_by_ids(self, spec: ResourceSpec, ids):
+        if isinstance(ids, str):
+            ids = [item.strip() for item in ids.replace(';', ',').split(',') if item.strip()]
+        ids = list(ids)
+        if not ids:
+            return ToolResult.from_message(f'Nenhum ID de {spec.label} informado.')
+        valid_ids = [int(item) for item in ids if str(item).isdigit()]
+
+        results = {r.id: r for r in self._resolve(self.swapi.fetch_many_by_id(spec.endpoint, valid_ids, spec.model))}
+        found = [r.result for r in results.values() if r.ok and r.result]
+        # As referências de todos os registros são resolvidas numa única rodada
+        expanded = dict(zip((record.url for record in found), self._expand(spec, found)))
+        items = []
+        for item in ids:
+            batch_result = results.get(int(item)) if str(item).isdigit() else None
+            if batch_result is None:
+                items.append({"id": item, "error": f'ID inválido: "{item}".'})
+            elif not batch_result.ok or not batch_result.result:
+                items.append({"id": int(item), "error": f'{spec.label.capitalize()} com ID {item} {spec.article("não encontrado", "não encontrada")}.'})
+            else:
+                items.append(_resource_item(spec, expanded[batch_result.result.url], detail=True))
+        return ToolResult(items, spec.columns(detail=True))
+
+    def _expand(self, spec: ResourceSpec, records):
+        return self.expander.expand(records, [field for field, _ in spec.references])
+
+    def _format_number(self, value: float) -> str:
+        return f"{value:,.0f}".replace(",", ".") if value >= 1000 else f"{value:g}"
+
+    def tallest_characters(self, limit: int = 10):
+        """Lista os personagens mais altos do universo Star Wars (padrão: os 10 mais altos)."""
+        if not str(limit).strip().isdigit() or int(limit) < 1:
+            return ToolResult.from_message(f'Limite inválido: "{limit}". Informe um número inteiro maior ou igual a 1.')
+        limit = int(limit)
+        store = self.columnar.get()
+        if store is None:
+            return ToolResult.from_message('Não foi possível carregar os dados dos personagens.')
+        chars = store.tallest(limit)
+        if not chars:
+            return ToolResult.from_message('Nenhum personagem com altura conhecida.')
+        items = [{"position": position, "id": char["id"], "name": char["name"], "height": char["height"]}
+                 for position, char in enumerate(chars, 1)]
+        columns = (Column("name", "Nome"), Column("height", "Altura", lambda value: f"{self._format_number(value)}cm"))
+        return ToolResult(items, columns, line="{position}. {name} (ID {id}) - Altura: {height}", separator=False)
+
+    def average_mass_by_species(self):
+        """Calcula a massa média dos personagens de cada espécie do universo Star Wars."""
+        store = self.columnar.get()
+        if store is None:
+            return ToolResult.from_message('Não foi possível carregar os dados dos personagens.')
+        rows = store.average_mass_by_species()
+        if not rows:
+            return ToolResult.from_message('Nenhum personagem com espécie e massa conhecidas.')
+        columns = (Column("species", "Espécie"), Column("average_mass", "Massa média", "{:.1f}kg"), Column("count", "Personagens"))
+        return ToolResult(rows, columns, line="{species}: {average_mass} (média de {count} personagem(ns))", separator=False)
+
+    def planets_with_population_above(self, min_population: float):
+        """Lista os planetas do universo Star Wars com população maior que o valor informado (ex: 1000000000)."""
+        try:
+            threshold = float(str(min_population).replace('_', '').replace(',', ''))
+        except ValueError:
+            return ToolResult.from_message(f'Valor de população inválido: "{min_population}".')
+        store = self.columnar.get()
+        if store is None:
+            return ToolResult.from_message('Não foi possível carregar os dados dos planetas.')
+        planets = store.planets_with_population_above(threshold)
+        if not planets:
+            return ToolResult.from_message(f'Nenhum planeta com população maior que {self._format_number(threshold)}.')
+        columns = (Column("name", "Nome"), Column("population", "População", self._format_number), Column("climate", "Clima"))
+        return ToolResult(planets, columns, line="Nome: {name} (ID {id})\nPopulação: {population}\nClima: {climate}")
+
+    def _split_terms(self, text: str):
+        return [item.strip() for item in str(text).replace(';', ',').split(',') if item.strip()]
+
+    def _names_result(self, index, endpoint: str, bits: int, header: str):
+        items = [{"id": id, "name": index.name(endpoint, id)} for id in iter_bits(bits)]
+        return ToolResult(items, (Column("name", "Nome"),), header=header, line="- {name} (ID {id})", separator=False)
+
+    def common_characters_in_films(self, films: str):
+        """Lista os personagens que aparecem em todos os filmes informados (IDs ou títulos separados por vírgula, ex: "Empire, Jedi")."""
+        index = self.relationships.get()
+        if index is None:
+            return ToolResult.from_message('Não foi possível carregar os relacionamentos entre filmes e personagens.')
+        terms = self._split_terms(films)
+        if not terms:
+            return ToolResult.from_message('Nenhum filme informado.')
+        film_ids = []
+        for term in terms:
+            film_id = index.find("films", term)
+            if film_id is None:
+                return ToolResult.from_message(f'Nenhum filme encontrado com o título ou ID "{term}".')
+            film_ids.append(film_id)
+        bits = index.related_to_all("films", film_ids, "people")
+        titles = ', '.join(index.name("films", id) for id in film_ids)
+        if not bits:
+            return ToolResult.from_message(f'Nenhum personagem aparece em todos estes filmes: {titles}.')
+        return self._names_result(index, "people", bits, f"Personagens em {titles} ({bits.bit_count()}):")
+
+    def characters_from_planets_in_film(self, film: str):
+        """Lista os personagens nascidos em planetas que aparecem em um filme (ID ou título do filme)."""
+        index = self.relationships.get()
+        if index is None:
+            return ToolResult.from_message('Não foi possível carregar os relacionamentos entre filmes, planetas e personagens.')
+        film_id = index.find("films", film)
+        if film_id is None:
+            return ToolResult.from_message(f'Nenhum filme encontrado com o título ou ID "{film}".')
+        planets = index.related("films", film_id, "planets")
+        bits = index.related_to_any("planets", planets, "people")
+        title = index.name("films", film_id)
+        if not bits:
+            return ToolResult.from_message(f'Nenhum personagem nasceu nos planetas de {title}.')
+        return self._names_result(index, "people", bits, f"Personagens nascidos em planetas de {title} ({bits.bit_count()}):")
+
+    def co_appearances(self, character: str):
+        """Lista os personagens que mais aparecem nos mesmos filmes que um personagem (ID ou nome)."""
+        index = self.relationships.get()
+        if index is None:
+            return ToolResult.from_message('Não foi possível carregar os relacionamentos entre filmes e personagens.')
+        char_id = index.find("people", character)
+        if char_id is None:
+            return ToolResult.from_message(f'Nenhum personagem encontrado com o nome ou ID "{character}".')
+        name = index.name("people", char_id)
+        rows = index.co_occurrences("people", char_id, "films")
+        if not rows:
+            return ToolResult.from_message(f'Nenhum personagem aparece nos mesmos filmes que {name}.')
+        items = [{"id": id, "name": index.name("people", id), "films": count} for id, count in rows[:20]]
+        columns = (Column("name", "Nome"), Column("films", "Filmes em comum"))
+        return ToolResult(items, columns, header=f"Personagens que aparecem com {name}:",
+                          line="- {name} (ID {id}): {films} filme(s) em comum", separator=False)
+
+def _resource_tools(spec: ResourceSpec):
+    """Cria os métodos de busca, consulta por ID, consulta em lote e listagem de um recurso."""
+    um, o, os_, todos = spec.article("um", "uma"), spec.article("o", "a"), spec.article("os", "as"), spec.article("todos", "todas")
+    names = tool_names(spec)
+
+    def search(self, search: str):
+        return self._search_resource(spec, search)
+    search.__doc__ = f"Busca {spec.label_plural} no universo Star Wars pelo {spec.search_label}."
+
+    def get_by_id(self, id: int):
+        return self._get_resource_by_id(spec, id)
+    get_by_id.__doc__ = f"Obtém os detalhes de {um} {spec.label} específic{o} pelo seu ID numérico."
+
+    def get_by_ids(self, ids: str):
+        return self._get_resources_by_ids(spec, ids)
+    get_by_ids.__doc__ = (
+        f"Obtém os detalhes de vári{os_} {spec.label_plural} de uma só vez a partir de uma lista de "
+        f'IDs numéricos separados por vírgula (ex: "1,2,3").'
+    )
+
+    def list_all(self):
+        return self._list_resource(spec)
+    order = f", ordenad{os_} por {spec.sort_label}" if spec.sort_field else ""
+    list_all.__doc__ = f"Lista {todos} {os_} {spec.label_plural} de Star Wars{order}."
+
+    methods = {names["search"]: search, names["get_by_id"]: get_by_id, names["get_by_ids"]: get_by_ids, names["list_all"]: list_all}
+    for name, method in methods.items():
+        method.__name__ = method.__qualname__ = name
+    return methods
+
+# As ferramentas de cada recurso são geradas a partir do registro (`resource_registry.RESOURCES`)
+for _spec in RESOURCES.values():
+    for _name, _method in _resource_tools(_spec).items():
+        setattr(Tools, _name, _method)
@@ -0,0 +1,16 @@
+"""
+Ponto de entrada de produção da interface web, via `wsgi_server.py`.
+
+Uso:
+    python wsgi.py --workers 4 --threads 8
+    gunicorn --preload -k gthread -w 4 --threads 8 -b 0.0.0.0:5000 "wsgi:create_app()"
+"""
+from app import MCPApp
+from wsgi_server import run
+
+def create_app():
+    """Cria a aplicação Flask (uma vez por servidor; com gunicorn, antes do fork dos workers)."""
+    return MCPApp().app
+
+if __name__ == "__main__":
+    run(create_app, description="Interface web da SWAPI (produção)")